@@ -163,42 +163,81 @@ function initializeSearch() {
             clearTimeout(searchTimeout);
             searchTimeout = setTimeout(() => {
                 performSearch(this.value);
-            }, 500);
+            }, 250);
         });
     }
 }
 
+// The in-flight live search, aborted when a newer one starts
+let searchController = null;
+
 function performSearch(query) {
     const currentUrl = new URL(window.location);
     currentUrl.searchParams.set('search', query);
     currentUrl.searchParams.delete('page'); // Reset to first page
+    currentUrl.searchParams.delete('cursor');
     
-    window.location.href = currentUrl.toString();
+    const results = document.getElementById('studentListResults');
+    if (!results) {
+        window.location.href = currentUrl.toString();
+        return;
+    }
+    
+    // Only the results are fetched: the first page of rows, without a count
+    if (searchController) {
+        searchController.abort();
+    }
+    const controller = new AbortController();
+    searchController = controller;
+    const fragmentUrl = new URL(currentUrl);
+    fragmentUrl.searchParams.set('fragment', 'results');
+    
+    fetch(fragmentUrl, {signal: controller.signal})
+    .then(response => {
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.text();
+    })
+    .then(html => {
+        results.outerHTML = html;
+        history.replaceState(null, '', currentUrl);
+        document.dispatchEvent(new CustomEvent('students:results-loaded'));
+    })
+    .catch(error => {
+        if (error.name !== 'AbortError') {
+            window.location.href = currentUrl.toString();
+        }
+    })
+    .finally(() => {
+        if (searchController === controller) {
+            searchController = null;
+        }
+    });
 }
 
 // Table Sorting
 function initializeTableSorting() {
-    const tableHeaders = document.querySelectorAll('th[data-sort]');
-    
-    tableHeaders.forEach(header => {
-        header.addEventListener('click', function() {
-            const sortField = this.getAttribute('data-sort');
-            const currentOrder = this.getAttribute('data-order') || 'asc';
-            const newOrder = currentOrder === 'asc' ? 'desc' : 'asc';
-            
-            // Update all headers
-            tableHeaders.forEach(h => h.setAttribute('data-order', ''));
-            this.setAttribute('data-order', newOrder);
-            
-            // Update sort indicators
-            tableHeaders.forEach(h => {
-                h.classList.remove('sort-asc', 'sort-desc');
-            });
-            this.classList.add(`sort-${newOrder}`);
-            
-            // Perform sort
-            sortTable(sortField, newOrder);
+    // Delegated, so headers swapped in by live search keep working
+    document.addEventListener('click', function(e) {
+        const header = e.target.closest('th[data-sort]');
+        if (!header) {
+            return;
+        }
+        const sortField = header.getAttribute('data-sort');
+        const currentOrder = header.getAttribute('data-order') || 'asc';
+        const newOrder = currentOrder === 'asc' ? 'desc' : 'asc';
+        
+        // Update all headers
+        document.querySelectorAll('th[data-sort]').forEach(h => {
+            h.setAttribute('data-order', '');
+            h.classList.remove('sort-asc', 'sort-desc');
         });
+        header.setAttribute('data-order', newOrder);
+        header.classList.add(`sort-${newOrder}`);
+        
+        // Perform sort
+        sortTable(sortField, newOrder);
     });
 }
 
@@ -207,11 +246,17 @@ function sortTable(field, order) {
     currentUrl.searchParams.set('sort', field);
     currentUrl.searchParams.set('order', order);
     currentUrl.searchParams.delete('page'); // Reset to first page
+    currentUrl.searchParams.delete('cursor');
     
     window.location.href = currentUrl.toString();
 }
 
 // Export Functionality
+// How long a queued export waits for a worker before it is streamed from
+// this request instead, and how long a running export is polled at most
+const EXPORT_QUEUE_TIMEOUT = 30 * 1000;
+const EXPORT_POLL_TIMEOUT = 30 * 60 * 1000;
+
 function initializeExport() {
     const exportBtn = document.querySelector('.export-btn');
     if (exportBtn) {
@@ -222,36 +267,121 @@ function initializeExport() {
     }
 }
 
-function exportData() {
-    const currentUrl = new URL(window.location);
-    currentUrl.searchParams.set('export', 'true');
-    
-    // Show loading state
+function exportData(options) {
     const btn = document.querySelector('.export-btn');
+    const params = exportParams(btn, options);
+    
+    if (btn && btn.dataset.exportJobUrl) {
+        // Large exports run in the background worker; poll until the file is ready
+        startExportJob(btn, params);
+    } else {
+        const streamUrl = (btn && btn.dataset.exportUrl) || '/export/download/';
+        downloadFile(`${streamUrl}?${params.toString()}`);
+    }
+}
+
+function exportParams(btn, options) {
+    // Use the export form when there is one, otherwise the current list filters
+    const form = btn ? btn.closest('form') : null;
+    let params;
+    
+    if (form) {
+        params = new URLSearchParams(new FormData(form));
+        params.delete('csrfmiddlewaretoken');
+    } else {
+        params = new URLSearchParams();
+        const currentParams = new URL(window.location).searchParams;
+        [
+            'search', 'department', 'year', 'gender', 'min_cgpa', 'max_cgpa',
+            'min_age', 'max_age', 'min_semester', 'max_semester', 'city'
+        ].forEach(name => {
+            const value = currentParams.get(name);
+            if (value) {
+                params.set(name, value);
+            }
+        });
+    }
+    Object.entries(options || {}).forEach(([name, value]) => {
+        [].concat(value).forEach(item => params.append(name, item));
+    });
+    return params;
+}
+
+function startExportJob(btn, params) {
     const originalText = btn.innerHTML;
-    btn.innerHTML = '<span class="loading"></span> Exporting...';
+    btn.innerHTML = '<span class="loading"></span> Queued...';
     btn.disabled = true;
     
-    fetch(currentUrl.toString())
-        .then(response => response.blob())
-        .then(blob => {
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'students_export.csv';
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            document.body.removeChild(a);
-        })
-        .catch(error => {
-            console.error('Export failed:', error);
-            showValidationMessage('Export failed. Please try again.', 'danger');
-        })
-        .finally(() => {
-            btn.innerHTML = originalText;
-            btn.disabled = false;
-        });
+    fetch(btn.dataset.exportJobUrl, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+        },
+        body: params,
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Invalid export options.');
+        }
+        return response.json();
+    })
+    .then(job => pollExportJob(job.status_url, btn))
+    .then(job => {
+        if (job === null) {
+            // No worker picked the job up
+            downloadFile(`${btn.dataset.exportUrl}?${params.toString()}`);
+            return;
+        }
+        downloadFile(job.download_url);
+        showValidationMessage('Export completed successfully!', 'success');
+    })
+    .catch(error => {
+        console.error('Export failed:', error);
+        showValidationMessage('Export failed. Please try again.', 'danger');
+    })
+    .finally(() => {
+        btn.innerHTML = originalText;
+        btn.disabled = false;
+    });
+}
+
+function pollExportJob(statusUrl, btn) {
+    // Resolves with the finished job, or null if it is still queued after EXPORT_QUEUE_TIMEOUT
+    const started = Date.now();
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(job => {
+                    const waited = Date.now() - started;
+                    if (job.status === 'completed') {
+                        resolve(job);
+                    } else if (job.status === 'failed') {
+                        reject(new Error(job.error));
+                    } else if (job.status === 'pending' && waited > EXPORT_QUEUE_TIMEOUT) {
+                        resolve(null);
+                    } else if (waited > EXPORT_POLL_TIMEOUT) {
+                        reject(new Error('The export did not finish in time.'));
+                    } else {
+                        btn.innerHTML = `<span class="loading"></span> Exporting... ${job.progress}%`;
+                        setTimeout(poll, 1000);
+                    }
+                })
+                .catch(reject);
+        };
+        poll();
+    });
+}
+
+function downloadFile(url) {
+    // Following an attachment link lets the browser stream the file to
+    // disk instead of buffering it in memory
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = '';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
 }
 
 // Utility Functions
@@ -342,56 +472,64 @@ function getCookie(name) {
 }
 
 // Chart Functions (if Chart.js is loaded)
-function initializeCharts() {
-    if (typeof Chart !== 'undefined') {
-        // Department Chart
-        const deptCtx = document.getElementById('departmentChart');
-        if (deptCtx) {
-            new Chart(deptCtx, {
-                type: 'doughnut',
-                data: {
-                    labels: ['Computer Science', 'Information Technology', 'Electrical Engineering'],
-                    datasets: [{
-                        data: [30, 25, 20],
-                        backgroundColor: ['#4e73df', '#1cc88a', '#36b9cc']
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'bottom'
-                        }
-                    }
-                }
-            });
-        }
-        
-        // Year Chart
-        const yearCtx = document.getElementById('yearChart');
-        if (yearCtx) {
-            new Chart(yearCtx, {
-                type: 'doughnut',
-                data: {
-                    labels: ['First Year', 'Second Year', 'Third Year', 'Fourth Year'],
-                    datasets: [{
-                        data: [35, 30, 25, 10],
-                        backgroundColor: ['#1cc88a', '#36b9cc', '#f6c23e', '#e74a3b']
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'bottom'
-                        }
-                    }
+const CHART_COLORS = [
+    '#4e73df', '#1cc88a', '#36b9cc', '#f6c23e', '#e74a3b', '#858796',
+    '#5a5c69', '#2e59d9', '#17a673', '#2c9faf', '#6f42c1', '#fd7e14'
+];
+
+function renderChart(canvasId, type, series) {
+    const canvas = document.getElementById(canvasId);
+    if (!canvas || !series || series.length === 0) {
+        return;
+    }
+    const doughnut = type === 'doughnut';
+    new Chart(canvas, {
+        type: type,
+        data: {
+            labels: series.map(point => point.label),
+            datasets: [{
+                label: 'Students',
+                data: series.map(point => point.count),
+                backgroundColor: doughnut ? CHART_COLORS : CHART_COLORS[0],
+                borderColor: doughnut ? '#fff' : CHART_COLORS[0],
+                fill: false
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: doughnut,
+                    position: 'bottom'
                 }
-            });
+            }
         }
+    });
+}
+
+// The dashboard's charts are drawn from one request to its data-chart-url
+function initializeCharts() {
+    const container = document.querySelector('[data-chart-url]');
+    if (typeof Chart === 'undefined' || !container) {
+        return;
     }
+    fetch(container.dataset.chartUrl, {headers: {'Accept': 'application/json'}})
+    .then(response => {
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.json();
+    })
+    .then(data => {
+        renderChart('departmentChart', 'doughnut', data.department);
+        renderChart('yearChart', 'doughnut', data.year);
+        renderChart('enrollmentChart', 'line', data.enrollment);
+        renderChart('cgpaChart', 'bar', data.cgpa);
+    })
+    .catch(error => {
+        console.error('Error loading chart data:', error);
+    });
 }
 
 // Initialize charts when DOM is loaded
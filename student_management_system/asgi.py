@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_management_system.settings')
+# Serve the read views through the async ORM instead of a thread per request
+os.environ.setdefault('STUDENT_ASYNC_VIEWS', 'True')
+# Persistent connections are per thread and outlive ASGI requests'
+# threads, so they would only pile up
+os.environ.setdefault('CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import Csv, config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,7 +43,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack; off unless
+    # STUDENT_INSTRUMENTATION is set
+    'students.instrumentation.StudentInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Off unless DATABASE_REPLICAS is set; see students/routers.py
+    'students.routers.ReplicaPinningMiddleware',
+    # Compresses HTML and JSON (list pages and live search fragments are
+    # mostly indentation); pads responses against BREACH
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,13 +84,93 @@ WSGI_APPLICATION = 'student_management_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# CONN_MAX_AGE keeps each thread's connection open for that many seconds
+# (0 closes it after every request; asgi.py defaults to 0), and
+# CONN_HEALTH_CHECKS tests a reused connection before a request uses it.
+# DATABASE_REPLICAS is a comma separated list of read-only copies of the
+# primary (SQLite files here) that serve the students app's reads; tests
+# run them against the primary's test database.
+
+DATABASE_OPTIONS = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+    'CONN_HEALTH_CHECKS': config('CONN_HEALTH_CHECKS', default=True, cast=bool),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        **DATABASE_OPTIONS,
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
     }
 }
 
+STUDENT_DATABASE_REPLICAS = []
+for number, name in enumerate(config('DATABASE_REPLICAS', default='', cast=Csv()), 1):
+    DATABASES[f'replica{number}'] = {**DATABASE_OPTIONS, 'NAME': name, 'TEST': {'MIRROR': 'default'}}
+    STUDENT_DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['students.routers.StudentReplicaRouter']
+
+# student_list_idx carries INCLUDE columns for the backends that support
+# them; SQLite creates it without them, as intended
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+# Seconds a client's student reads stay on the primary after it POSTs
+STUDENT_REPLICA_PIN_SECONDS = config('STUDENT_REPLICA_PIN_SECONDS', default=5, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_BACKEND picks locmem (one cache per process), file (shared by the
+# processes on one host) or redis (a local Redis server, needs redis-py)
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'students',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_LOCATION', default='redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[config('CACHE_BACKEND', default='locmem')],
+}
+
+# Cache alias and timeout (seconds) for cached student details and dashboard data
+STUDENT_CACHE_ALIAS = 'default'
+STUDENT_CACHE_TIMEOUT = 300
+
+# Route the list, detail, dashboard and AJAX delete views to their async
+# variants (students/async_views.py); asgi.py turns this on
+STUDENT_ASYNC_VIEWS = config('STUDENT_ASYNC_VIEWS', default=False, cast=bool)
+
+# A running export job that writes nothing for this many seconds is put
+# back in the queue by the next worker poll, up to this many attempts
+STUDENT_EXPORT_JOB_TIMEOUT = 300
+STUDENT_EXPORT_JOB_ATTEMPTS = 3
+
+# Threads that re-encode uploaded profile pictures and write their
+# thumbnails; 0 processes them inline when the saving transaction commits
+STUDENT_IMAGE_WORKERS = 2
+
+# Per-view query count, SQL time and template time with Server-Timing
+# headers; staff can read the rolling per-URL figures at /metrics/
+STUDENT_INSTRUMENTATION = config('STUDENT_INSTRUMENTATION', default=False, cast=bool)
+STUDENT_INSTRUMENTATION_WINDOW = 1000  # requests kept per URL name
+STUDENT_INSTRUMENTATION_SLOW_QUERIES = 5
+
+# The admin's student list counts filtered results up to this many rows
+# (department, year, gender and status filters are read from the
+# StudentStats counters instead)
+STUDENT_ADMIN_COUNT_LIMIT = 10000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -120,6 +210,22 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = config('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# build_static_assets writes minified, hashed and precompressed copies to
+# STATIC_ROOT; with DEBUG off, {% static %} links the hashed names, which
+# students.staticfiles.serve_static sends with immutable caching
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'students.staticfiles.PrecompressedManifestStorage'
+        ),
+    },
+}
 
 # Media files
 MEDIA_URL = '/media/'
@@ -129,3 +235,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Student search
+# Dotted path to a search backend class in students.search; None picks
+# one for the database engine (FTS5 on SQLite, tsvector/trigram on PostgreSQL)
+STUDENT_SEARCH_BACKEND = None
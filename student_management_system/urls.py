@@ -14,14 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from students.staticfiles import serve_static
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('students.urls')),
+    # Built assets from STATIC_ROOT; runserver serves the sources before this in DEBUG
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static),
 ]
 
 # Serve media files during development
@@ -1,20 +1,124 @@
-from django.contrib import admin
-from .models import Student
+import json
+import re
+from datetime import timedelta
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.views.main import (
+    ALL_VAR, ERROR_FLAG, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, TO_FIELD_VAR,
+)
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.http import HttpResponseRedirect
+from django.utils import timezone
+from django.template.defaultfilters import pluralize
+from django.contrib.admin.helpers import ActionForm
+from .bulk import deactivate_students, promote_students, reactivate_students, set_year_semester
+from .forms import SEMESTER_CHOICES
+from .models import Student, StudentQuerySet
+from .search import search_students
+from .stats import BUCKET_FIELDS, count_students
+
+# Changelist parameters that do not narrow the rows
+UNFILTERED_PARAMS = {ALL_VAR, ERROR_FLAG, IS_POPUP_VAR, ORDER_VAR, PAGE_VAR, TO_FIELD_VAR}
+
+
+class YearSemesterForm(forms.Form):
+    new_year = forms.TypedChoiceField(
+        choices=[('', 'Keep year')] + Student.YEAR_CHOICES,
+        coerce=int, empty_value=None, required=False, label='Year'
+    )
+    new_semester = forms.TypedChoiceField(
+        choices=[('', 'Keep semester')] + SEMESTER_CHOICES,
+        coerce=int, empty_value=None, required=False, label='Semester'
+    )
+
+
+class StudentActionForm(ActionForm, YearSemesterForm):
+    """Admin action bar with the target year and semester for the change_year_semester action"""
+
+
+def _period_start(value, kind):
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if kind == 'day':
+        return value
+    if kind == 'month':
+        return value.replace(day=1)
+    return value.replace(month=1, day=1)
+
+
+def _next_period(start, kind):
+    if kind == 'day':
+        return start + timedelta(days=1)
+    if kind == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start.replace(year=start.year + 1)
+
+
+class ChangeListQuerySet(StudentQuerySet):
+    """Students for the admin, whose date hierarchy reads created_at by index seeks
+    
+    The hierarchy asks for the earliest and latest dates and then the
+    distinct years, months or days, which would otherwise read every
+    matching row. Here each is a MIN or MAX of its own, so the
+    student_created_idx index answers them.
+    """
+    def aggregate(self, *args, **kwargs):
+        if args or len(kwargs) < 2 or not all(isinstance(value, (Min, Max)) for value in kwargs.values()):
+            return super().aggregate(*args, **kwargs)
+        return {name: super(ChangeListQuerySet, self.order_by()).aggregate(**{name: value})[name] for name, value in kwargs.items()}
+    
+    def datetimes(self, field_name, kind, order='ASC', **kwargs):
+        if kind not in ('year', 'month', 'day') or kwargs:
+            return super().datetimes(field_name, kind, order, **kwargs)
+        # One seek per period found, jumping from each to the next
+        periods = []
+        queryset = self.order_by()
+        first = queryset.aggregate(first=Min(field_name))['first']
+        while first is not None:
+            periods.append(_period_start(first, kind))
+            later = queryset.filter(**{f'{field_name}__gte': _next_period(periods[-1], kind)})
+            first = later.aggregate(first=Min(field_name))['first']
+        return periods[::-1] if order == 'DESC' else periods
+
+
+class SemesterListFilter(admin.SimpleListFilter):
+    """Semester filter with fixed choices, instead of a DISTINCT over every student"""
+    title = 'semester'
+    parameter_name = 'semester'
+    
+    def lookups(self, request, model_admin):
+        return SEMESTER_CHOICES
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(semester=self.value())
+        return queryset
+
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
+    action_form = StudentActionForm
+    actions = ['deactivate', 'reactivate', 'change_year_semester', 'promote']
     list_display = [
         'student_id', 'full_name', 'email', 'department', 'year', 
         'semester', 'cgpa', 'is_active', 'created_at'
     ]
-    list_filter = [
-        'department', 'year', 'semester', 'gender', 'is_active', 
-        'created_at', 'updated_at'
-    ]
-    search_fields = [
-        'student_id', 'first_name', 'last_name', 'email', 'phone'
-    ]
+    # Sized for hundreds of thousands of students: filters that need no
+    # query to list their choices, created_at browsed through the date
+    # hierarchy, indexed search, estimated page counts and list_editable
+    # changes saved with one UPDATE
+    list_filter = ['department', 'year', SemesterListFilter, 'gender', 'is_active']
+    date_hierarchy = 'created_at'
+    search_fields = ['student_id', 'first_name', 'last_name', 'email']
+    search_help_text = 'Part of the student ID or email, or the start of a name'
     list_editable = ['is_active']
+    show_full_result_count = False
     readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
@@ -48,9 +152,124 @@ class StudentAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related()
+        queryset = super().get_queryset(request)
+        return ChangeListQuerySet(self.model, query=queryset.query, using=queryset._db)
+    
+    def get_search_results(self, request, queryset, search_term):
+        # The list page's full-text search rather than icontains per column
+        if not search_term.strip():
+            return queryset, False
+        return search_students(queryset, search_term), False
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        paginator.count = self.estimated_count(request, queryset)
+        return paginator
+    
+    def estimated_count(self, request, queryset):
+        """Row count for the changelist without counting every matching student
+
+        Filters on the StudentStats bucket fields alone are answered from
+        the counters; anything else is counted up to
+        STUDENT_ADMIN_COUNT_LIMIT rows, past which the pages stop.
+        """
+        params = {
+            name: value for name, value in request.GET.items()
+            if value and name not in UNFILTERED_PARAMS
+        }
+        lookups = {name.removesuffix('__exact'): value for name, value in params.items()}
+        if all(name.endswith('__exact') for name in params) and set(lookups) <= set(BUCKET_FIELDS):
+            return count_students(**lookups)
+        limit = getattr(settings, 'STUDENT_ADMIN_COUNT_LIMIT', 10000)
+        return queryset.order_by()[:limit].count()
+    
+    def changelist_view(self, request, extra_context=None):
+        if request.method == 'POST' and '_save' in request.POST and self.has_change_permission(request):
+            response = self.save_list_edits(request)
+            if response is not None:
+                return response
+        return super().changelist_view(request, extra_context)
+    
+    def edited_students(self, request, prefix):
+        """The students whose rows were posted by the changelist formset, or None for invalid keys"""
+        pk_name = self.opts.pk.name
+        key = re.compile(rf'{re.escape(prefix)}-\d+-{re.escape(pk_name)}$')
+        pks = [value for name, value in request.POST.items() if key.match(name)]
+        try:
+            pks = [self.opts.pk.to_python(pk) for pk in pks]
+        except ValidationError:
+            return None
+        return self.get_queryset(request).filter(pk__in=pks)
+    
+    def save_list_edits(self, request):
+        """Save list_editable changes with one UPDATE per is_active value
+        
+        Replaces a save() and a log entry INSERT per row. Returns None,
+        leaving the changelist to save the rows one by one or show the
+        errors, if the forms are invalid or list_editable holds anything
+        but is_active.
+        """
+        if list(self.list_editable) != ['is_active']:
+            return None
+        FormSet = self.get_changelist_formset(request)
+        students = self.edited_students(request, FormSet.get_default_prefix())
+        if students is None:
+            return None
+        formset = FormSet(request.POST, request.FILES, queryset=students)
+        if not formset.is_valid():
+            return None
+        
+        changed = [form for form in formset.forms if form.has_changed()]
+        activated = [form.instance.pk for form in changed if form.cleaned_data['is_active']]
+        deactivated = [form.instance.pk for form in changed if not form.cleaned_data['is_active']]
+        content_type = ContentType.objects.get_for_model(Student)
+        with transaction.atomic():
+            reactivate_students(Student.objects.filter(pk__in=activated))
+            deactivate_students(Student.objects.filter(pk__in=deactivated))
+            LogEntry.objects.bulk_create([
+                LogEntry(
+                    user_id=request.user.pk,
+                    content_type_id=content_type.pk,
+                    object_id=str(form.instance.pk),
+                    object_repr=str(form.instance)[:200],
+                    action_flag=CHANGE,
+                    change_message=json.dumps(self.construct_change_message(request, form, None)),
+                )
+                for form in changed
+            ])
+        
+        if changed:
+            count = len(changed)
+            self.message_user(request, f'{count} student{pluralize(count)} changed successfully.', messages.SUCCESS)
+        return HttpResponseRedirect(request.get_full_path())
     
     def full_name(self, obj):
         return obj.full_name
     full_name.short_description = 'Full Name'
     full_name.admin_order_field = 'first_name'
+    
+    # Bulk actions run as one UPDATE over the selection (or every row
+    # matching the filters) and keep the dashboard counters current
+    @admin.action(description='Deactivate selected students')
+    def deactivate(self, request, queryset):
+        count = deactivate_students(queryset)
+        self.message_user(request, f'{count} student{pluralize(count)} deactivated.', messages.SUCCESS)
+    
+    @admin.action(description='Reactivate selected students')
+    def reactivate(self, request, queryset):
+        count = reactivate_students(queryset)
+        self.message_user(request, f'{count} student{pluralize(count)} reactivated.', messages.SUCCESS)
+    
+    @admin.action(description='Change year / semester of selected students')
+    def change_year_semester(self, request, queryset):
+        form = YearSemesterForm(request.POST)
+        if not form.is_valid() or (form.cleaned_data['new_year'] is None and form.cleaned_data['new_semester'] is None):
+            self.message_user(request, 'Choose a year or semester to move the students to.', messages.ERROR)
+            return
+        count = set_year_semester(queryset, form.cleaned_data['new_year'], form.cleaned_data['new_semester'])
+        self.message_user(request, f'{count} student{pluralize(count)} moved.', messages.SUCCESS)
+    
+    @admin.action(description='Promote selected students to the next semester')
+    def promote(self, request, queryset):
+        count = promote_students(queryset)
+        self.message_user(request, f'{count} student{pluralize(count)} promoted.', messages.SUCCESS)
@@ -0,0 +1,213 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.forms.models import model_to_dict
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .bulk import deactivate_students, soft_delete_students, update_students
+from .forms import StudentForm, StudentSearchForm
+from .imports import create_students, field_defaults
+from .models import Student
+from .pagination import CursorPaginator
+from .search import filter_students, page_ordering
+
+# Fields a client can read and request with ?fields=
+API_FIELDS = [
+    'id', 'student_id', 'first_name', 'last_name', 'email', 'phone',
+    'date_of_birth', 'gender', 'department', 'year', 'semester', 'cgpa',
+    'address', 'city', 'state', 'postal_code', 'country', 'profile_picture',
+    'emergency_contact', 'emergency_contact_name', 'created_at', 'updated_at',
+    'is_active',
+]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Fields an update keeps from the stored student when the request leaves them out
+EDITABLE_FIELDS = [name for name in StudentForm.Meta.fields if name != 'profile_picture']
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _error(message, status=400, errors=None):
+    payload = {'success': False, 'message': message}
+    if errors:
+        payload['errors'] = errors
+    return JsonResponse(payload, status=status)
+
+
+def _not_found():
+    return _error('Student not found.', status=404)
+
+
+def _requested_fields(request):
+    """Parse ?fields=a,b,c into a list of API fields; all of them by default"""
+    value = request.GET.get('fields')
+    if not value:
+        return API_FIELDS
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(unknown)}')
+    return fields
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('page_size must be a number.')
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _json_body(request, expected):
+    try:
+        body = json.loads(request.body or b'null')
+    except ValueError:
+        raise BadRequest('Request body is not valid JSON.')
+    if not isinstance(body, expected):
+        raise BadRequest(f'Request body must be a JSON {"array" if expected is list else "object"}.')
+    return body
+
+
+def _picture_url(value):
+    name = getattr(value, 'name', value)
+    return default_storage.url(name) if name else None
+
+
+def _serialize(student, fields):
+    """Dict of ``fields`` from a values() row or a model instance"""
+    get = student.get if isinstance(student, dict) else lambda name: getattr(student, name)
+    data = {name: get(name) for name in fields}
+    if 'profile_picture' in data:
+        data['profile_picture'] = _picture_url(data['profile_picture'])
+    return data
+
+
+def _bulk_errors(errors):
+    errors = sorted(errors, key=lambda error: error[0])
+    return [{'index': index, 'errors': row_errors} for index, row_errors in errors]
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def _list(request):
+    fields = _requested_fields(request)
+    search_form = StudentSearchForm(request.GET)
+    if not search_form.is_valid():
+        return _error('Invalid filters.', errors=search_form.errors)
+
+    students = filter_students(Student.objects.filter(is_active=True), search_form.cleaned_data)
+    # Only the requested columns (and the cursor's ordering columns) are fetched
+    ordering = page_ordering(search_form.cleaned_data)
+    paginator = CursorPaginator(students, _page_size(request), ordering).values(*fields)
+    page = paginator.get_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [_serialize(row, fields) for row in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+def _create(request):
+    fields = _requested_fields(request)
+    form = StudentForm({**field_defaults(), **_json_body(request, dict)})
+    if not form.is_valid():
+        return _error('Please correct the errors.', errors=form.errors)
+    return JsonResponse(_serialize(form.save(), fields), status=201)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def student_collection(request):
+    """List students (filtered, cursor-paginated, with sparse fields) or create one"""
+    try:
+        if request.method == 'POST':
+            return _create(request)
+        return _list(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'PUT', 'PATCH', 'DELETE'])
+def student_resource(request, pk):
+    """Read, update or soft delete one student"""
+    try:
+        fields = _requested_fields(request)
+        if request.method == 'GET':
+            student = Student.objects.filter(pk=pk, is_active=True).values(*fields).first()
+            if student is None:
+                return _not_found()
+            return JsonResponse(_serialize(student, fields))
+
+        student = Student.objects.filter(pk=pk, is_active=True).first()
+        if student is None:
+            return _not_found()
+
+        if request.method == 'DELETE':
+            deactivate_students(Student.objects.filter(pk=student.pk))
+            return JsonResponse({'success': True, 'message': f'Student {student.full_name} deleted successfully!'})
+
+        # PATCH changes only the given fields; PUT replaces them all
+        changes = _json_body(request, dict)
+        data = model_to_dict(student, fields=EDITABLE_FIELDS) if request.method == 'PATCH' else field_defaults()
+        data.update(changes)
+        form = StudentForm(data, instance=student)
+        if not form.is_valid():
+            return _error('Please correct the errors.', errors=form.errors)
+        return JsonResponse(_serialize(form.save(), fields))
+    except BadRequest as exc:
+        return _error(str(exc))
+
+
+@csrf_exempt
+@require_http_methods(['POST', 'PATCH', 'DELETE'])
+def student_bulk(request):
+    """Bulk create (POST a list), update (PATCH a list with ids) or soft delete (DELETE {"ids": [...]})
+
+    Each runs as batched statements: bulk_create, bulk_update or a single
+    UPDATE per batch, rather than one save per student.
+    """
+    try:
+        if request.method == 'DELETE':
+            ids = _json_body(request, dict).get('ids')
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                raise BadRequest('"ids" must be a list of student ids.')
+            return JsonResponse({'success': True, 'deleted': soft_delete_students(ids)})
+
+        rows = _json_body(request, list)
+        if not all(isinstance(row, dict) for row in rows):
+            raise BadRequest('Each item must be a JSON object.')
+
+        if request.method == 'PATCH':
+            result = update_students(rows)
+            return JsonResponse({
+                'success': not result.failed,
+                'updated': result.updated,
+                'failed': result.failed,
+                'errors': _bulk_errors(result.errors),
+            })
+
+        defaults = field_defaults()
+        result = create_students((index, {**defaults, **row}) for index, row in enumerate(rows))
+        return JsonResponse({
+            'success': not result.failed,
+            'created': result.created,
+            'failed': result.failed,
+            'errors': _bulk_errors(result.errors),
+        }, status=201 if result.created else 400)
+    except BadRequest as exc:
+        return _error(str(exc))
@@ -0,0 +1,203 @@
+"""Async variants of the read views and the AJAX delete, for ASGI deployments
+
+urls.py routes to these instead of the views in views.py when
+STUDENT_ASYNC_VIEWS is on, which asgi.py turns on by default. They run
+the same queries through the async ORM and share the caching and
+conditional GET rules, so responses (and their ETags) are identical.
+"""
+import asyncio
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import caching
+from .bulk import deactivate_students
+from .forms import StudentSearchForm
+from .models import Student
+from .pagination import CursorPaginator
+from .search import get_search_backend
+from .stats import aget_dashboard_stats, astudents_freshness, build_chart_data
+from .views import (
+    _dashboard_context, _detail_context, _etag, _filtered_students, _has_messages, _is_cursor_page,
+    _is_fragment, _list_context, _list_page_students, _list_template, _recent_students,
+    _student_detail_fragment, _top_students,
+)
+
+PER_PAGE = 10
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _conditional(request, etag, last_modified, respond):
+    """What the condition decorator does, which cannot wrap a coroutine in this Django version
+
+    Returns 304/412 when the request's validators match, otherwise the
+    response of ``respond()`` with ETag and Last-Modified set.
+    """
+    etag = quote_etag(etag) if etag is not None else None
+    last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await respond()
+    if request.method in ('GET', 'HEAD'):
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+    return response
+
+
+async def _afreshness(request, queryset):
+    if not hasattr(request, '_student_freshness'):
+        request._student_freshness = await queryset.order_by().aaggregate(
+            last_modified=Max('updated_at'), count=Count('pk')
+        )
+    return request._student_freshness
+
+
+async def _afiltered_students(data):
+    search_form = StudentSearchForm(data)
+    if search_form.is_valid() and search_form.cleaned_data['search']:
+        # Picking the search backend may look the FTS table up once per process
+        await sync_to_async(get_search_backend)(Student.objects.db)
+    return _filtered_students(data)
+
+
+async def _aoffset_page(queryset, count, number):
+    """Paginator.get_page() for a queryset whose total is already known"""
+    paginator = Paginator(queryset, PER_PAGE)
+    paginator.count = count
+    try:
+        number = paginator.validate_number(number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+    bottom = (number - 1) * PER_PAGE
+    return Page(await _alist(queryset[bottom:bottom + PER_PAGE]), number, paginator)
+
+
+async def student_list(request):
+    """Async student_list: the same filters, pagination and ETag"""
+    students, search_form = await _afiltered_students(request.GET)
+    fragment = _is_fragment(request)
+    cursor_pagination = _is_cursor_page(request)
+    fresh = not fragment and not _has_messages(request)
+    # Live search fragments are neither counted nor validated, and cursor
+    # pages are validated by the active students as a whole
+    freshness = {'last_modified': None, 'count': None}
+    etag = None
+    if fresh:
+        if cursor_pagination:
+            freshness = await astudents_freshness()
+        else:
+            freshness = await _afreshness(request, students)
+        etag = _etag(freshness['last_modified'], freshness['count'], request.get_full_path())
+
+    async def respond():
+        # What ensure_csrf_cookie does, for the delete buttons' AJAX posts
+        get_token(request)
+        page_students, ordering = _list_page_students(students, search_form)
+        if cursor_pagination:
+            paginator = CursorPaginator(page_students, PER_PAGE, ordering)
+            page_obj = await paginator.aget_page(request.GET.get('cursor'))
+            total_students = None if fragment else await paginator.acount()
+        else:
+            total_students = (await _afreshness(request, students))['count']
+            page_obj = await _aoffset_page(page_students, total_students, request.GET.get('page'))
+        context = _list_context(request, page_obj, search_form, total_students, cursor_pagination)
+        return render(request, _list_template(request), context)
+
+    return await _conditional(request, etag, freshness['last_modified'], respond)
+
+
+async def _aget_active_student(pk):
+    """get_object_or_404() for an active student"""
+    try:
+        return await Student.objects.aget(pk=pk, is_active=True)
+    except Student.DoesNotExist:
+        raise Http404('No Student matches the given query.')
+
+
+async def _arender_student_detail(pk):
+    return _student_detail_fragment(await _aget_active_student(pk))
+
+
+async def student_detail(request, pk):
+    """Async student_detail, sharing the cached fragment with the sync view"""
+    last_modified = None
+    if not _has_messages(request):
+        last_modified = await (
+            Student.objects.filter(pk=pk, is_active=True)
+            .order_by('pk').values_list('updated_at', flat=True).afirst()
+        )
+    etag = None if last_modified is None else _etag(pk, last_modified)
+
+    async def respond():
+        fragment = await caching.aget_or_set(
+            f'student_detail:{pk}',
+            [caching.student_version(pk), caching.DETAILS],
+            lambda: _arender_student_detail(pk),
+        )
+        return render(request, 'students/student_detail.html', _detail_context(fragment))
+
+    return await _conditional(request, etag, last_modified, respond)
+
+
+async def dashboard(request):
+    """Async dashboard; the stats and the two student lists are fetched concurrently"""
+    etag = last_modified = None
+    if not _has_messages(request):
+        freshness = await astudents_freshness()
+        etag = _etag('dashboard', freshness['last_modified'], freshness['count'])
+        last_modified = freshness['last_modified']
+
+    async def respond():
+        stats, recent_students, top_students = await asyncio.gather(
+            caching.aget_or_set('dashboard_stats', [caching.LISTS], aget_dashboard_stats),
+            caching.aget_or_set('recent_students', [caching.LISTS], lambda: _alist(_recent_students())),
+            caching.aget_or_set('top_students', [caching.LISTS], lambda: _alist(_top_students())),
+        )
+        return render(request, 'students/dashboard.html', _dashboard_context(stats, recent_students, top_students))
+
+    return await _conditional(request, etag, last_modified, respond)
+
+
+async def chart_data(request):
+    """Async chart data; a cache miss runs the grouped queries in a worker thread"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    data = await caching.aget_or_set('chart_data', [caching.LISTS], sync_to_async(build_chart_data))
+    return JsonResponse(data)
+
+
+async def student_delete_ajax(request, pk):
+    """Async AJAX delete"""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        student = await _aget_active_student(pk)
+        # Async code cannot open transactions yet, so the set-based update runs in a thread
+        await sync_to_async(deactivate_students)(Student.objects.filter(pk=student.pk))
+        return JsonResponse({
+            'success': True,
+            'message': f'Student {student.full_name} deleted successfully!'
+        })
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+
+
+# csrf_exempt only wraps sync views in this Django version
+student_delete_ajax.csrf_exempt = True
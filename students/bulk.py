@@ -0,0 +1,242 @@
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, When
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from .caching import LISTS, bump_versions, invalidate_all_students, student_version
+from .forms import StudentImportForm
+from .imports import BATCH_SIZE, MAX_REPORTED_ERRORS, RowValidator, form_errors
+from .models import Student
+from .stats import STATS_FIELDS, apply_bucket_delta, apply_bulk_stats_delta, bucket_totals
+
+UPDATE_FIELDS = StudentImportForm.Meta.fields
+
+# Set-based updates of up to this many students invalidate each one's
+# cached fragments; larger or open-ended ones drop every student's
+MAX_TRACKED_UPDATES = 100
+
+
+@dataclass
+class UpdateResult:
+    rows: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_key, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_key, errors))
+
+
+def _stats_values(values):
+    return SimpleNamespace(**dict(zip(STATS_FIELDS, values)))
+
+
+def _invalidate(pks):
+    bump_versions(*(student_version(pk) for pk in pks), LISTS)
+
+
+def _unique_conflicts(students):
+    """Map each student to the unique values another student already uses"""
+    student_ids = {student.student_id for student in students}
+    emails = {student.email for student in students}
+    batch_pks = {student.pk for student in students}
+    taken_ids, taken_emails = {}, {}
+    # Rows outside the batch keep their stored values; rows in it take the new ones
+    stored = Student.objects.filter(
+        Q(student_id__in=student_ids) | Q(email__in=emails)
+    ).exclude(pk__in=batch_pks).values_list('pk', 'student_id', 'email')
+    for pk, student_id, email in stored:
+        taken_ids.setdefault(student_id, pk)
+        taken_emails.setdefault(email, pk)
+
+    conflicts = {}
+    for student in students:
+        errors = {}
+        if taken_ids.setdefault(student.student_id, student.pk) != student.pk:
+            errors['student_id'] = ['Student ID already exists.']
+        if taken_emails.setdefault(student.email, student.pk) != student.pk:
+            errors['email'] = ['Email already exists.']
+        if errors:
+            conflicts[student.pk] = errors
+    return conflicts
+
+
+def _update_batch(batch, result, validator):
+    ids = [row.get('id') for _, row in batch]
+    students = Student.objects.filter(is_active=True).in_bulk(
+        [pk for pk in ids if isinstance(pk, int)]
+    )
+
+    valid, previous, fields = [], [], {'updated_at'}
+    for row_key, row in batch:
+        student = students.pop(row.get('id'), None)
+        if student is None:
+            result.add_error(row_key, {'id': ['No active student with this id.']})
+            continue
+        changes = {name: value for name, value in row.items() if name != 'id'}
+        unknown = [name for name in changes if name not in UPDATE_FIELDS]
+        if unknown:
+            result.add_error(row_key, {name: ['Unknown field.'] for name in unknown})
+            continue
+        snapshot = tuple(getattr(student, name) for name in STATS_FIELDS)
+        data = model_to_dict(student, fields=UPDATE_FIELDS)
+        data.update(changes)
+        form = validator.validate(data, instance=student)
+        if not form.is_valid():
+            result.add_error(row_key, form_errors(form))
+            continue
+        fields.update(changes)
+        valid.append((row_key, student))
+        previous.append(snapshot)
+
+    conflicts = _unique_conflicts([student for _, student in valid])
+    now = timezone.now()
+    saved, saved_previous = [], []
+    for (row_key, student), snapshot in zip(valid, previous):
+        if student.pk in conflicts:
+            result.add_error(row_key, conflicts[student.pk])
+            continue
+        student.updated_at = now
+        saved.append((row_key, student))
+        saved_previous.append(_stats_values(snapshot))
+    if not saved:
+        return
+
+    students = [student for _, student in saved]
+    try:
+        with transaction.atomic():
+            Student.objects.bulk_update(students, sorted(fields))
+            apply_bulk_stats_delta(saved_previous, sign=-1)
+            apply_bulk_stats_delta(students)
+    except IntegrityError as exc:
+        for row_key, _ in saved:
+            result.add_error(row_key, {'__all__': [f'Could not be saved: {exc}']})
+        return
+    _invalidate(student.pk for student in students)
+    result.updated += len(students)
+
+
+def update_students(rows, batch_size=BATCH_SIZE):
+    """Apply per-student changes, ``batch_size`` students per statement
+
+    ``rows`` is a list of dicts holding an ``id`` and the fields to change.
+    Each batch loads its students with one query, validates the merged
+    values with the StudentForm rules, checks student_id and email
+    uniqueness with one query and writes every change with one
+    bulk_update. Errors are keyed by the row's position in ``rows``.
+    """
+    result = UpdateResult()
+    validator = RowValidator()
+    rows = list(enumerate(rows))
+    result.rows = len(rows)
+    for start in range(0, len(rows), batch_size):
+        _update_batch(rows[start:start + batch_size], result, validator)
+    return result
+
+
+def _updatable(queryset):
+    """``queryset`` in a form update() and GROUP BY accept
+
+    Full-text search adds a joined table and a rank column; those are
+    swapped for a primary key subquery.
+    """
+    if queryset.query.extra_tables or queryset.query.extra:
+        return Student.objects.filter(pk__in=queryset.values('pk'))
+    return queryset.order_by()
+
+
+def _set_based_update(queryset, changes, moved_bucket, extra_fields=()):
+    """Run ``queryset.update(**changes)`` as one statement, keeping the counters and cache current
+
+    ``moved_bucket`` maps a bucket_totals() row, grouped by ``extra_fields``
+    too, to the row's values after the update. Returns the number of
+    students updated.
+
+    Only the updated students' fragments are invalidated, unless there are
+    more than MAX_TRACKED_UPDATES of them.
+    """
+    queryset = _updatable(queryset)
+    with transaction.atomic():
+        pks = list(queryset.values_list('pk', flat=True)[:MAX_TRACKED_UPDATES + 1])
+        before = list(bucket_totals(queryset, *extra_fields))
+        updated = queryset.update(**changes, updated_at=timezone.now())
+        apply_bucket_delta(before, sign=-1)
+        apply_bucket_delta(moved_bucket(dict(row)) for row in before)
+    if updated and len(pks) > MAX_TRACKED_UPDATES:
+        invalidate_all_students()
+    elif updated:
+        _invalidate(pks)
+    return updated
+
+
+def _with(**values):
+    def moved_bucket(row):
+        row.update(values)
+        return row
+    return moved_bucket
+
+
+def deactivate_students(queryset):
+    """Soft delete every active student in ``queryset`` with one UPDATE"""
+    return _set_based_update(queryset.filter(is_active=True), {'is_active': False}, _with(is_active=False))
+
+
+def reactivate_students(queryset):
+    """Restore every soft-deleted student in ``queryset`` with one UPDATE"""
+    return _set_based_update(queryset.filter(is_active=False), {'is_active': True}, _with(is_active=True))
+
+
+def set_year_semester(queryset, year=None, semester=None):
+    """Move every student in ``queryset`` to ``year`` and/or ``semester`` with one UPDATE"""
+    changes = {name: value for name, value in (('year', year), ('semester', semester)) if value is not None}
+    if not changes:
+        return 0
+    # Only the year decides a student's bucket
+    moved = {'year': year} if year is not None else {}
+    return _set_based_update(queryset, changes, _with(**moved))
+
+
+# Semesters after which a promotion also moves a student up a year
+YEAR_END_SEMESTERS = [2, 4, 6]
+LAST_SEMESTER = 8
+LAST_YEAR = 4
+
+
+def _promoted_bucket(row):
+    if row['semester'] in YEAR_END_SEMESTERS and row['year'] < LAST_YEAR:
+        row['year'] += 1
+    return row
+
+
+def promote_students(queryset):
+    """Move every student in ``queryset`` to the next semester with one UPDATE
+
+    Finishing an even semester also starts the next year. Students in the
+    last semester are left as they are.
+    """
+    return _set_based_update(
+        queryset.filter(semester__lt=LAST_SEMESTER),
+        {
+            'semester': F('semester') + 1,
+            'year': Case(
+                When(semester__in=YEAR_END_SEMESTERS, year__lt=LAST_YEAR, then=F('year') + 1),
+                default=F('year'),
+            ),
+        },
+        _promoted_bucket,
+        extra_fields=['semester'],
+    )
+
+
+def soft_delete_students(ids, batch_size=BATCH_SIZE):
+    """Deactivate the given students with one UPDATE per batch; returns how many were active"""
+    ids = list(ids)
+    return sum(
+        deactivate_students(Student.objects.filter(pk__in=ids[start:start + batch_size]))
+        for start in range(0, len(ids), batch_size)
+    )
@@ -0,0 +1,180 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+KEY_PREFIX = 'students'
+
+# Version of everything that lists or counts students (dashboard stats and
+# charts, recent and top students); bumped by any student write
+LISTS = 'lists'
+
+# Version shared by every student's cached fragments, for set-based
+# updates that change an unknown number of students at once
+DETAILS = 'details'
+
+# Names of the cached values, as reported by cache_counters()
+CACHED_VALUES = ('student_detail', 'dashboard_stats', 'recent_students', 'top_students', 'chart_data')
+
+COUNTER_KINDS = ('hits', 'misses')
+
+
+def get_cache():
+    return caches[getattr(settings, 'STUDENT_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'STUDENT_CACHE_TIMEOUT', 300)
+
+
+def _version_key(name):
+    return f'{KEY_PREFIX}:version:{name}'
+
+
+def _counter_key(name, kind):
+    return f'{KEY_PREFIX}:counter:{name}:{kind}'
+
+
+def student_version(pk):
+    """Version name of one student's cached fragments"""
+    return f'student:{pk}'
+
+
+def _initial_version():
+    # Starting from the clock means a version key that was evicted never
+    # comes back at a value that old entries were stored under
+    return int(time.time() * 1000)
+
+
+def _get_versions(cache, names):
+    keys = [_version_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def _bump(names):
+    cache = get_cache()
+    for name in names:
+        key = _version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_versions(*names):
+    """Invalidate every entry stored under the named versions
+
+    The bump is repeated when the surrounding transaction commits, so a
+    request that re-cached the old rows in between does not keep them.
+    """
+    _bump(names)
+    transaction.on_commit(lambda: _bump(names))
+
+
+def invalidate_student(pk):
+    bump_versions(student_version(pk), LISTS)
+
+
+def invalidate_all_students():
+    bump_versions(DETAILS, LISTS)
+
+
+def invalidate_student_lists():
+    """For writes that bypass the model signals (bulk_create, queryset.update)"""
+    bump_versions(LISTS)
+
+
+def _count(cache, name, kind):
+    key = _counter_key(name, kind)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_or_set(name, versions, build, timeout=None):
+    """Return the cached value for ``name``, calling ``build`` on a miss
+
+    The key includes the current value of each version counter, so bumping
+    any of them makes the entry unreachable; it then expires on its own.
+    Hits and misses are counted per ``name``, up to the first colon.
+    """
+    cache = get_cache()
+    version_values = _get_versions(cache, versions)
+    key = ':'.join([KEY_PREFIX, name, *map(str, version_values)])
+    value = cache.get(key)
+    if value is not None:
+        _count(cache, name.split(':')[0], 'hits')
+        return value
+    _count(cache, name.split(':')[0], 'misses')
+    value = build()
+    cache.set(key, value, _timeout() if timeout is None else timeout)
+    return value
+
+
+async def _aget_versions(cache, names):
+    keys = [_version_key(name) for name in names]
+    found = await cache.aget_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            await cache.aadd(key, _initial_version(), timeout=None)
+            version = await cache.aget(key)
+        versions.append(version)
+    return versions
+
+
+async def _acount(cache, name, kind):
+    key = _counter_key(name, kind)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+async def aget_or_set(name, versions, build, timeout=None):
+    """get_or_set() for async views, through the cache's async API; ``build`` is a coroutine function"""
+    cache = get_cache()
+    version_values = await _aget_versions(cache, versions)
+    key = ':'.join([KEY_PREFIX, name, *map(str, version_values)])
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount(cache, name.split(':')[0], 'hits')
+        return value
+    await _acount(cache, name.split(':')[0], 'misses')
+    value = await build()
+    await cache.aset(key, value, _timeout() if timeout is None else timeout)
+    return value
+
+
+def cache_counters(names=CACHED_VALUES):
+    """Hit and miss counts for each cached value name, with the hit ratio"""
+    cache = get_cache()
+    keys = [_counter_key(name, kind) for name in names for kind in COUNTER_KINDS]
+    found = cache.get_many(keys)
+    counters = {}
+    for name in names:
+        hits, misses = (found.get(_counter_key(name, kind), 0) for kind in COUNTER_KINDS)
+        total = hits + misses
+        counters[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
+    return counters
+
+
+def reset_cache_counters(names=CACHED_VALUES):
+    get_cache().delete_many([_counter_key(name, kind) for name in names for kind in COUNTER_KINDS])
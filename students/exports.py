@@ -0,0 +1,246 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+
+from .models import Student
+from .search import filter_students
+
+# Columns exported for each field group on the export form
+FIELD_GROUPS = {
+    'basic': ['student_id', 'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'gender'],
+    'academic': ['department', 'year', 'semester', 'cgpa'],
+    'address': ['address', 'city', 'state', 'postal_code', 'country'],
+    'emergency': ['emergency_contact_name', 'emergency_contact'],
+    'system': ['created_at', 'updated_at', 'is_active'],
+}
+
+FIELD_GROUP_CHOICES = [
+    ('basic', 'Basic Information'),
+    ('academic', 'Academic Information'),
+    ('address', 'Address Information'),
+    ('emergency', 'Emergency Contact'),
+    ('system', 'System Information'),
+]
+
+# Rows fetched per database round trip and written per response chunk
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+}
+
+_CHOICE_LABELS = {
+    'gender': dict(Student.GENDER_CHOICES),
+    'department': dict(Student.DEPARTMENT_CHOICES),
+    'year': dict(Student.YEAR_CHOICES),
+}
+
+
+def export_columns(groups):
+    """Model field names for the selected field groups, in form order"""
+    columns = []
+    for group, _ in FIELD_GROUP_CHOICES:
+        if group in groups:
+            columns.extend(FIELD_GROUPS[group])
+    return columns
+
+
+def export_headers(columns):
+    return [str(Student._meta.get_field(name).verbose_name) for name in columns]
+
+
+def export_queryset(cleaned_data):
+    """Filter students the way the export form asks"""
+    status = cleaned_data.get('status') or 'active'
+    students = Student.objects.all()
+    if status == 'active':
+        students = students.filter(is_active=True)
+    elif status == 'inactive':
+        students = students.filter(is_active=False)
+    return filter_students(students, cleaned_data)
+
+
+def _labelled(columns, rows):
+    labels = [_CHOICE_LABELS.get(name) for name in columns]
+    for row in rows:
+        yield tuple(
+            mapping.get(value, value) if mapping else value
+            for mapping, value in zip(labels, row)
+        )
+
+
+def export_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Yield display-ready tuples, fetching only ``columns`` a chunk at a time"""
+    return _labelled(columns, queryset.values_list(*columns).iterator(chunk_size=chunk_size))
+
+
+def _pk_batches(queryset, columns, batch_size):
+    queryset = queryset.order_by('pk').values_list('pk', *columns)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        for row in batch:
+            yield row[1:]
+
+
+def export_rows_in_batches(queryset, columns, batch_size=CHUNK_SIZE):
+    """Like export_rows, but each chunk is a separate keyset query ordered by pk
+
+    No cursor stays open between chunks, so the caller can write to the
+    database (e.g. progress updates) while exporting; on SQLite an open
+    read cursor would make those writes fail with "database is locked".
+    """
+    return _labelled(columns, _pk_batches(queryset, columns, batch_size))
+
+
+def _display(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Active' if value else 'Inactive'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(headers, rows, chunk_size=CHUNK_SIZE):
+    """Yield CSV text ``chunk_size`` rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_display(value) for value in row])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _ChunkSink:
+    """Write-only file object that collects zip output until it is drained"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Students" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Control characters that are not allowed in XML text
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    value = _display(value)
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def stream_xlsx(headers, rows, chunk_size=CHUNK_SIZE):
+    """Yield an .xlsx workbook as compressed bytes, ``chunk_size`` rows at a time"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+        yield sink.drain()
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(headers).encode())
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode())
+                if count % chunk_size == 0:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+async def async_chunks(chunks):
+    """Iterate a sync chunk generator from async code, one chunk per thread hop
+
+    The queries behind the chunks stay in the request's sync thread, and
+    each chunk can be sent before the next one is produced.
+    """
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'excel': stream_xlsx,
+}
@@ -1,7 +1,14 @@
 from django import forms
+from django.db.models import Q
 from .models import Student
 from django.core.exceptions import ValidationError
 from datetime import date
+from .exports import FIELD_GROUP_CHOICES
+
+UNIQUE_MESSAGES = {
+    'student_id': "Student ID already exists.",
+    'email': "Email already exists.",
+}
 
 class StudentForm(forms.ModelForm):
     class Meta:
@@ -106,25 +113,80 @@ class StudentForm(forms.ModelForm):
             raise ValidationError("Phone number must contain only digits, spaces, hyphens, or plus sign.")
         return phone
     
-    def clean_student_id(self):
-        student_id = self.cleaned_data.get('student_id')
-        if student_id:
-            # Check if student_id already exists (for updates, exclude current instance)
-            instance = getattr(self, 'instance', None)
-            if Student.objects.filter(student_id=student_id).exclude(pk=instance.pk if instance else None).exists():
-                raise ValidationError("Student ID already exists.")
-        return student_id
+    def validate_unique(self):
+        """Check student_id and email against other students in one query"""
+        values = {name: self.cleaned_data[name] for name in UNIQUE_MESSAGES if self.cleaned_data.get(name)}
+        if values:
+            conditions = Q()
+            for name, value in values.items():
+                conditions |= Q(**{name: value})
+            # An edited student does not conflict with itself
+            taken = Student.objects.filter(conditions).exclude(pk=self.instance.pk).values_list(*values)
+            for row in taken:
+                for (name, value), stored in zip(values.items(), row):
+                    if stored == value and name not in self._errors:
+                        self.add_error(name, UNIQUE_MESSAGES[name])
+        # Any other unique constraints are left to the model
+        exclude = self._get_validation_exclusions() | set(UNIQUE_MESSAGES)
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+# (minimum field, maximum field, label) of the range filters
+RANGE_FIELDS = [
+    ('min_cgpa', 'max_cgpa', 'CGPA'),
+    ('min_age', 'max_age', 'Age'),
+    ('min_semester', 'max_semester', 'Semester'),
+]
+
+def _range_input(placeholder, **attrs):
+    return forms.NumberInput(attrs={'class': 'form-control', 'placeholder': placeholder, **attrs})
+
+class StudentRangeFilterForm(forms.Form):
+    """Range and city filters shared by the search and export forms; see search.filter_students"""
+    min_cgpa = forms.DecimalField(
+        required=False, min_value=0, max_value=4, decimal_places=2,
+        widget=_range_input('Min', step='0.01', min='0', max='4')
+    )
+    max_cgpa = forms.DecimalField(
+        required=False, min_value=0, max_value=4, decimal_places=2,
+        widget=_range_input('Max', step='0.01', min='0', max='4')
+    )
+    min_age = forms.IntegerField(
+        required=False, min_value=0, max_value=150,
+        widget=_range_input('Min', min='0')
+    )
+    max_age = forms.IntegerField(
+        required=False, min_value=0, max_value=150,
+        widget=_range_input('Max', min='0')
+    )
+    min_semester = forms.IntegerField(
+        required=False, min_value=1, max_value=8,
+        widget=_range_input('Min', min='1', max='8')
+    )
+    max_semester = forms.IntegerField(
+        required=False, min_value=1, max_value=8,
+        widget=_range_input('Max', min='1', max='8')
+    )
+    city = forms.CharField(
+        required=False,
+        max_length=50,
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Any city'
+        })
+    )
     
-    def clean_email(self):
-        email = self.cleaned_data.get('email')
-        if email:
-            # Check if email already exists (for updates, exclude current instance)
-            instance = getattr(self, 'instance', None)
-            if Student.objects.filter(email=email).exclude(pk=instance.pk if instance else None).exists():
-                raise ValidationError("Email already exists.")
-        return email
-
-class StudentSearchForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        for low, high, label in RANGE_FIELDS:
+            minimum, maximum = cleaned_data.get(low), cleaned_data.get(high)
+            if minimum is not None and maximum is not None and minimum > maximum:
+                self.add_error(high, f"Maximum {label.lower()} must not be below the minimum.")
+        return cleaned_data
+
+class StudentSearchForm(StudentRangeFilterForm):
     search = forms.CharField(
         required=False,
         widget=forms.TextInput(attrs={
@@ -146,4 +208,152 @@ class StudentSearchForm(forms.Form):
         choices=[('', 'All Genders')] + Student.GENDER_CHOICES,
         required=False,
         widget=forms.Select(attrs={'class': 'form-select'})
-    )
\ No newline at end of file
+    )
+    # Set by the sortable table headers; keys of search.SORT_ORDERINGS
+    sort = forms.ChoiceField(
+        choices=[
+            ('name', 'Name'),
+            ('cgpa', 'CGPA'),
+            ('year', 'Year'),
+            ('department', 'Department'),
+            ('created_at', 'Date Added'),
+        ],
+        required=False,
+        widget=forms.HiddenInput
+    )
+    order = forms.ChoiceField(
+        choices=[('asc', 'Ascending'), ('desc', 'Descending')],
+        required=False,
+        widget=forms.HiddenInput
+    )
+
+class StudentExportForm(StudentRangeFilterForm):
+    FORMAT_CHOICES = [
+        ('csv', 'CSV Format'),
+        ('excel', 'Excel Format'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('active', 'Active Only'),
+        ('all', 'All Students'),
+        ('inactive', 'Inactive Only'),
+    ]
+    
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+    fields = forms.MultipleChoiceField(choices=FIELD_GROUP_CHOICES, required=False)
+    department = forms.ChoiceField(
+        choices=[('', 'All Departments')] + Student.DEPARTMENT_CHOICES,
+        required=False
+    )
+    year = forms.ChoiceField(
+        choices=[('', 'All Years')] + Student.YEAR_CHOICES,
+        required=False
+    )
+    gender = forms.ChoiceField(
+        choices=[('', 'All Genders')] + Student.GENDER_CHOICES,
+        required=False
+    )
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    search = forms.CharField(required=False)
+    
+    def clean_format(self):
+        return self.cleaned_data.get('format') or 'csv'
+    
+    def clean_fields(self):
+        return self.cleaned_data.get('fields') or ['basic', 'academic']
+
+
+SEMESTER_CHOICES = [(number, f'Semester {number}') for number in range(1, 9)]
+
+
+class StudentIdListField(forms.Field):
+    """The ``ids`` checkboxes of the student list, as a list of primary keys"""
+    widget = forms.MultipleHiddenInput
+    
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(pk) for pk in value]
+        except (TypeError, ValueError):
+            raise ValidationError("Select students from the list.")
+
+
+class StudentBulkActionForm(forms.Form):
+    # The list shows active students only; reactivating is an admin action
+    ACTION_CHOICES = [
+        ('deactivate', 'Deactivate'),
+        ('set_year_semester', 'Change year / semester'),
+        ('promote', 'Promote to next semester'),
+    ]
+    
+    action = forms.ChoiceField(
+        choices=ACTION_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    ids = StudentIdListField(required=False)
+    select_all = forms.BooleanField(
+        required=False,
+        label='All students matching the filters',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    new_year = forms.TypedChoiceField(
+        choices=[('', 'Keep year')] + Student.YEAR_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    new_semester = forms.TypedChoiceField(
+        choices=[('', 'Keep semester')] + SEMESTER_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('select_all') and not cleaned_data.get('ids'):
+            raise ValidationError("Select at least one student.")
+        if (cleaned_data.get('action') == 'set_year_semester'
+                and cleaned_data.get('new_year') is None and cleaned_data.get('new_semester') is None):
+            raise ValidationError("Choose a year or semester to move the students to.")
+        return cleaned_data
+
+
+class SharedFields(dict):
+    """Form fields that each form uses as they are instead of deep-copying them
+
+    Only for forms that never change their fields after construction.
+    """
+    def __deepcopy__(self, memo):
+        return SharedFields(self)
+
+
+class StudentImportForm(StudentForm):
+    """StudentForm rules for one CSV row
+
+    Uniqueness of student_id and email is checked by the importer with one
+    query per batch, so the per-row checks are skipped here.
+    """
+    class Meta(StudentForm.Meta):
+        fields = [name for name in StudentForm.Meta.fields if name != 'profile_picture']
+    
+    def validate_unique(self):
+        pass
+
+
+# The importer builds a form per row; copying the fields and their choices
+# and widgets for each would take as long as validating it
+StudentImportForm.base_fields = SharedFields(StudentImportForm.base_fields)
+
+
+class StudentImportUploadForm(forms.Form):
+    file = forms.FileField(
+        label='CSV File',
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,text/csv'
+        })
+    )
@@ -0,0 +1,156 @@
+"""Profile picture pipeline: re-encoded without metadata, plus square thumbnails
+
+A new upload is processed once the saving transaction commits, on a
+small thread pool so student_create and student_update do not wait for
+Pillow. Until then templates show the upload as it is.
+"""
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .caching import invalidate_student
+from .models import Student
+from .routers import use_primary
+
+# Square thumbnail widths offered in srcset, covering 1x and 2x screens
+# at the sizes the templates display (32 to 150 CSS pixels)
+VARIANT_WIDTHS = (64, 128, 256, 512)
+
+# Longest side of the re-encoded original
+MAX_ORIGINAL_SIZE = 1024
+
+IMAGE_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+QUALITY = 80
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _workers():
+    return getattr(settings, 'STUDENT_IMAGE_WORKERS', 2)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(_workers(), thread_name_prefix='student-images')
+        return _executor
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _encode(image):
+    # Saving without exif= drops the camera, GPS and other metadata
+    output = BytesIO()
+    image.save(output, IMAGE_FORMAT, quality=QUALITY)
+    return ContentFile(output.getvalue())
+
+
+def render_variants(file):
+    """Encode an image file as a resized original and square thumbnails
+
+    Returns ``(original, {width: thumbnail})`` as ContentFiles.
+    """
+    with Image.open(file) as image:
+        # Apply the EXIF orientation before the EXIF is dropped
+        image = ImageOps.exif_transpose(image)
+    keep_alpha = IMAGE_FORMAT == 'WEBP' and _has_alpha(image)
+    image = image.convert('RGBA' if keep_alpha else 'RGB')
+
+    thumbnails = {
+        width: _encode(ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS))
+        for width in VARIANT_WIDTHS
+    }
+    image.thumbnail((MAX_ORIGINAL_SIZE, MAX_ORIGINAL_SIZE), Image.Resampling.LANCZOS)
+    return _encode(image), thumbnails
+
+
+def has_current_variants(student):
+    """Whether picture_variants were made from the student's current picture"""
+    return bool(student.profile_picture) and student.picture_variants.get('source') == student.profile_picture.name
+
+
+def process_profile_picture(pk, name):
+    """Replace one student's uploaded picture ``name`` with its processed files
+
+    Nothing is kept if the student's picture changed while this ran.
+    Returns whether the student was updated.
+    """
+    storage = Student._meta.get_field('profile_picture').storage
+    with storage.open(name, 'rb') as file:
+        original, thumbnails = render_variants(file)
+
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    extension = EXTENSIONS[IMAGE_FORMAT]
+    source = storage.save(posixpath.join(directory, f'{stem}.{extension}'), original)
+    widths = {
+        str(width): storage.save(posixpath.join(directory, 'thumbs', f'{stem}_{width}.{extension}'), thumbnail)
+        for width, thumbnail in thumbnails.items()
+    }
+
+    previous = Student.objects.filter(pk=pk).values_list('picture_variants', flat=True).first() or {}
+    # A queryset update: the stats and cache signals have nothing to do here
+    updated = Student.objects.filter(pk=pk, profile_picture=name).update(
+        profile_picture=source,
+        picture_variants={'source': source, 'widths': widths},
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        for created in [source, *widths.values()]:
+            storage.delete(created)
+        return False
+
+    # The upload still carries its metadata, and earlier variants are unused now
+    kept = {source, *widths.values()}
+    for stale in [name, previous.get('source'), *previous.get('widths', {}).values()]:
+        if stale and stale not in kept:
+            storage.delete(stale)
+    invalidate_student(pk)
+    return True
+
+
+def _run(pk, name):
+    try:
+        # The picture was just saved; a replica may not have it yet
+        with use_primary():
+            process_profile_picture(pk, name)
+    except Exception:
+        logger.exception('Could not process the profile picture of student %s', pk)
+
+
+def _run_in_thread(pk, name):
+    try:
+        _run(pk, name)
+    finally:
+        connections.close_all()
+
+
+def schedule_picture_processing(student):
+    """Process the student's picture once the current transaction commits
+
+    Runs on the thread pool, or inline when STUDENT_IMAGE_WORKERS is 0.
+    """
+    pk, name = student.pk, student.profile_picture.name
+
+    def submit():
+        if _workers() <= 0:
+            _run(pk, name)
+        else:
+            _get_executor().submit(_run_in_thread, pk, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,189 @@
+import csv
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .caching import invalidate_student_lists
+from .forms import StudentImportForm
+from .models import Student
+from .stats import apply_bulk_stats_delta
+
+# Rows validated, uniqueness-checked and inserted together
+BATCH_SIZE = 1000
+
+# Errors kept in memory for the report; the counts stay exact beyond this
+MAX_REPORTED_ERRORS = 1000
+
+_CHOICE_CODES = {
+    'gender': {label.lower(): code for code, label in Student.GENDER_CHOICES},
+    'department': {label.lower(): code for code, label in Student.DEPARTMENT_CHOICES},
+    'year': {label.lower(): str(code) for code, label in Student.YEAR_CHOICES},
+}
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, errors))
+
+
+def _normalize_header(header):
+    return header.strip().lower().replace(' ', '_')
+
+
+def _header_aliases():
+    """Accept both field names and verbose names, so exported files import cleanly"""
+    aliases = {}
+    for name in StudentImportForm.Meta.fields:
+        verbose_name = str(Student._meta.get_field(name).verbose_name)
+        aliases[name] = name
+        aliases[_normalize_header(verbose_name)] = name
+    return aliases
+
+
+def field_defaults():
+    """Model defaults of the import fields that have one"""
+    fields = [Student._meta.get_field(name) for name in StudentImportForm.Meta.fields]
+    return {field.name: field.get_default() for field in fields if field.has_default()}
+
+
+def _row_data(columns, values, defaults):
+    data = dict(defaults)
+    for name, value in zip(columns, values):
+        if name is None:
+            continue
+        value = value.strip()
+        codes = _CHOICE_CODES.get(name)
+        if codes:
+            value = codes.get(value.lower(), value)
+        data[name] = value
+    return data
+
+
+class RowValidator:
+    """Runs StudentImportForm validation on one row at a time
+
+    Each row gets a form of its own. What is costly to repeat per row is
+    done once instead: the forms share their fields (see SharedFields) and
+    uniqueness is checked per batch by _flush().
+    """
+
+    def validate(self, data, instance=None):
+        return StudentImportForm(data=data, instance=instance)
+
+
+def form_errors(form):
+    return {name: [str(message) for message in messages] for name, messages in form.errors.items()}
+
+
+def _flush(batch, result, dry_run):
+    """Check a batch against the database in one query, then insert it in one transaction"""
+    student_ids = [student.student_id for _, student in batch]
+    emails = [student.email for _, student in batch]
+    taken = Student.objects.filter(
+        Q(student_id__in=student_ids) | Q(email__in=emails)
+    ).values_list('student_id', 'email')
+    taken_ids, taken_emails = set(), set()
+    for student_id, email in taken:
+        taken_ids.add(student_id)
+        taken_emails.add(email)
+
+    valid = []
+    for row_number, student in batch:
+        errors = {}
+        if student.student_id in taken_ids:
+            errors['student_id'] = ['Student ID already exists.']
+        if student.email in taken_emails:
+            errors['email'] = ['Email already exists.']
+        if errors:
+            result.add_error(row_number, errors)
+            continue
+        # Later rows in the same batch may not reuse these values either
+        taken_ids.add(student.student_id)
+        taken_emails.add(student.email)
+        valid.append(student)
+
+    if dry_run or not valid:
+        result.created += len(valid) if dry_run else 0
+        return
+    try:
+        with transaction.atomic():
+            Student.objects.bulk_create(valid)
+            apply_bulk_stats_delta(valid)
+            invalidate_student_lists()
+    except IntegrityError as exc:
+        # A concurrent insert took one of the values after the check above
+        inserted = {id(student) for student in valid}
+        for row_number, student in batch:
+            if id(student) in inserted:
+                result.add_error(row_number, {'__all__': [f'Could not be saved: {exc}']})
+        return
+    result.created += len(valid)
+
+
+def import_students(csv_file, batch_size=BATCH_SIZE, dry_run=False):
+    """Validate and insert students from a CSV text stream, ``batch_size`` rows at a time
+
+    Rows are validated with the StudentForm rules. Uniqueness of
+    student_id and email is checked with one query per batch, and valid
+    rows are written with bulk_create. Returns an ImportResult with
+    per-row errors keyed by CSV line number.
+    """
+    result = ImportResult()
+    reader = csv.reader(csv_file)
+    headers = next(reader, None)
+    if not headers:
+        result.add_error(1, {'__all__': ['The file is empty.']})
+        return result
+
+    aliases = _header_aliases()
+    columns = [aliases.get(_normalize_header(header)) for header in headers]
+    missing = [name for name in StudentImportForm.Meta.fields if name not in columns]
+    # Columns left out of the file fall back to the model default
+    defaults = {name: value for name, value in field_defaults().items() if name in missing}
+    required_missing = [
+        name for name in missing
+        if name not in defaults and StudentImportForm.base_fields[name].required
+    ]
+    if required_missing:
+        result.add_error(1, {'__all__': [f'Missing columns: {", ".join(required_missing)}']})
+        return result
+
+    rows = (
+        (row_number, _row_data(columns, values, defaults))
+        for row_number, values in enumerate(reader, start=2)
+        if any(value.strip() for value in values)
+    )
+    return create_students(rows, batch_size=batch_size, dry_run=dry_run, result=result)
+
+
+def create_students(rows, batch_size=BATCH_SIZE, dry_run=False, result=None):
+    """Validate and insert ``(row_key, data)`` pairs, ``batch_size`` rows at a time
+
+    The batched pipeline behind import_students, also used for JSON bulk
+    creates. Errors are reported against each row's key.
+    """
+    result = result or ImportResult()
+    validator = RowValidator()
+    batch = []
+    for row_number, data in rows:
+        result.rows += 1
+        form = validator.validate(data)
+        if not form.is_valid():
+            result.add_error(row_number, form_errors(form))
+            continue
+        batch.append((row_number, form.instance))
+        if len(batch) >= batch_size:
+            _flush(batch, result, dry_run)
+            batch = []
+    if batch:
+        _flush(batch, result, dry_run)
+    return result
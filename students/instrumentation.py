@@ -0,0 +1,310 @@
+"""Per-request query count, SQL time and template time for the students URLs
+
+StudentInstrumentationMiddleware is switched on with STUDENT_INSTRUMENTATION.
+Each request's numbers are sent back in a Server-Timing header and kept in
+a rolling window per URL name, which metrics_snapshot() summarises for the
+instrumentation_stats view. The windows live in process memory, so each
+worker reports its own requests.
+
+Only requests routed to a students view are measured; queries and
+templates of other apps run untimed. A streaming response is recorded
+once its body has been sent, with the queries that produced it, while its
+Server-Timing header covers the view alone.
+"""
+import contextvars
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+# Upper bounds, in milliseconds, of the latency histogram's buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# SQL text beyond this many characters is cut from the slow query report
+MAX_SQL_LENGTH = 500
+
+# Views under the students namespace that are not recorded
+UNRECORDED_VIEWS = {'instrumentation_stats'}
+
+_current = contextvars.ContextVar('student_request_metrics', default=None)
+
+_lock = threading.Lock()
+_samples = defaultdict(deque)
+_totals = defaultdict(int)
+_slowest = defaultdict(list)
+
+
+def _window():
+    return getattr(settings, 'STUDENT_INSTRUMENTATION_WINDOW', 1000)
+
+
+def _slow_query_count():
+    return getattr(settings, 'STUDENT_INSTRUMENTATION_SLOW_QUERIES', 5)
+
+
+def _keep_slowest(heap, item, size):
+    if len(heap) < size:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.slow_queries = []
+        # Set once the request is routed to a measured view
+        self.active = False
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.sql_time += duration
+        _keep_slowest(self.slow_queries, (duration, sql[:MAX_SQL_LENGTH]), _slow_query_count())
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None or not metrics.active:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def _install_query_recorder(connection, **kwargs):
+    # First in the list, so connection.execute_wrapper() blocks pop their own wrapper
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _timed_render(render):
+    def timed(self, context):
+        metrics = _current.get()
+        # Included templates are part of the outermost render
+        if metrics is None or not metrics.active or metrics.rendering:
+            return render(self, context)
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.rendering = False
+            metrics.template_time += time.perf_counter() - started
+    timed.student_timed = True
+    return timed
+
+
+def _install_on_connections(**kwargs):
+    for connection in connections.all():
+        _install_query_recorder(connection)
+
+
+def install():
+    """Record queries on database connections and time template rendering
+
+    Connections get the recorder when they connect, and already open ones
+    when a request starts: the handlers send request_started from the
+    thread that runs the request's queries, including the async ORM's.
+    Both only measure while a students view is being served (see
+    RequestMetrics.active); elsewhere they call straight through.
+    """
+    connection_created.connect(_install_query_recorder, dispatch_uid='student_instrumentation')
+    request_started.connect(_install_on_connections, dispatch_uid='student_instrumentation')
+    if not getattr(Template.render, 'student_timed', False):
+        Template.render = _timed_render(Template.render)
+
+
+# Marks the end of a wrapped response body
+_END = object()
+
+
+def _measured_chunks(chunks, metrics, finish):
+    """Yield ``chunks`` with their queries recorded in ``metrics``, then call ``finish``
+
+    finish also runs if the response is closed before the body is sent.
+    """
+    try:
+        chunks = iter(chunks)
+        while True:
+            token = _current.set(metrics)
+            try:
+                chunk = next(chunks, _END)
+            finally:
+                _current.reset(token)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        finish()
+
+
+async def _ameasured_chunks(chunks, metrics, finish):
+    """_measured_chunks() for an async response body"""
+    try:
+        chunks = aiter(chunks)
+        while True:
+            token = _current.set(metrics)
+            try:
+                chunk = await anext(chunks, _END)
+            finally:
+                _current.reset(token)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        finish()
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+def record_request(name, duration, metrics):
+    sample = (duration, metrics.queries, metrics.sql_time, metrics.template_time)
+    with _lock:
+        samples = _samples[name]
+        samples.append(sample)
+        while len(samples) > _window():
+            samples.popleft()
+        _totals[name] += 1
+        for query in metrics.slow_queries:
+            _keep_slowest(_slowest[name], query, _slow_query_count())
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of sorted ``values``"""
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def _distribution(seconds):
+    values = sorted(seconds)
+    return {
+        'p50': _milliseconds(_percentile(values, 50)),
+        'p95': _milliseconds(_percentile(values, 95)),
+        'p99': _milliseconds(_percentile(values, 99)),
+        'max': _milliseconds(values[-1]),
+    }
+
+
+def _histogram(seconds):
+    counts = dict.fromkeys([f'le_{bound}' for bound in LATENCY_BUCKETS_MS] + ['inf'], 0)
+    for value in seconds:
+        milliseconds = value * 1000
+        bound = next((bound for bound in LATENCY_BUCKETS_MS if milliseconds <= bound), None)
+        counts['inf' if bound is None else f'le_{bound}'] += 1
+    return counts
+
+
+def metrics_snapshot():
+    """Summary of the recorded window of each URL name"""
+    with _lock:
+        windows = {name: list(samples) for name, samples in _samples.items()}
+        totals = dict(_totals)
+        slowest = {name: sorted(heap, reverse=True) for name, heap in _slowest.items()}
+
+    snapshot = {}
+    for name, samples in sorted(windows.items()):
+        durations, queries, sql_times, template_times = zip(*samples)
+        latency = _distribution(durations)
+        latency['histogram'] = _histogram(durations)
+        snapshot[name] = {
+            'requests': totals[name],
+            'window': len(samples),
+            'latency_ms': latency,
+            'queries': {'mean': round(sum(queries) / len(queries), 2), 'max': max(queries)},
+            'sql_ms': _distribution(sql_times),
+            'template_ms': _distribution(template_times),
+            'slowest_queries': [
+                {'duration_ms': _milliseconds(duration), 'sql': sql} for duration, sql in slowest.get(name, [])
+            ],
+        }
+    return snapshot
+
+
+def reset_metrics():
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _slowest.clear()
+
+
+def _server_timing(metrics, duration):
+    return ', '.join([
+        f'db;dur={_milliseconds(metrics.sql_time)};desc="{metrics.queries} queries"',
+        f'tpl;dur={_milliseconds(metrics.template_time)};desc="Templates"',
+        f'app;dur={_milliseconds(duration)};desc="Total"',
+    ])
+
+
+class StudentInstrumentationMiddleware:
+    """Measure each request to a students URL; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'STUDENT_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        # Context variables follow the async ORM into its worker threads
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        match = request.resolver_match
+        if metrics is not None and match.namespace == 'students' and match.url_name not in UNRECORDED_VIEWS:
+            metrics.active = True
+
+    def finish(self, request, response, metrics):
+        if not metrics.active:
+            return response
+        name = request.resolver_match.url_name
+        duration = time.perf_counter() - metrics.started
+        response['Server-Timing'] = _server_timing(metrics, duration)
+        if not response.streaming:
+            record_request(name, duration, metrics)
+            return response
+
+        # The body's queries run while it is sent, after this returns
+        def record():
+            record_request(name, time.perf_counter() - metrics.started, metrics)
+        measure = _ameasured_chunks if response.is_async else _measured_chunks
+        response.streaming_content = measure(response.streaming_content, metrics, record)
+        return response
@@ -0,0 +1,116 @@
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from . import exports
+from .models import ExportJob
+
+
+def _job_timeout():
+    """Seconds a running job may go without writing a chunk before it is presumed dead"""
+    return getattr(settings, 'STUDENT_EXPORT_JOB_TIMEOUT', 300)
+
+
+def _max_attempts():
+    return getattr(settings, 'STUDENT_EXPORT_JOB_ATTEMPTS', 3)
+
+
+def requeue_stale_jobs():
+    """Put running jobs whose worker stopped responding back in the queue
+
+    A job that has already been tried STUDENT_EXPORT_JOB_ATTEMPTS times
+    is failed instead, so an export that kills its worker is not retried
+    forever. Returns the number of jobs requeued.
+    """
+    stale = ExportJob.objects.filter(
+        status=ExportJob.STATUS_RUNNING,
+        heartbeat_at__lt=timezone.now() - timedelta(seconds=_job_timeout()),
+    )
+    stale.filter(attempts__gte=_max_attempts()).update(
+        status=ExportJob.STATUS_FAILED, error='The export worker stopped responding.', finished_at=timezone.now()
+    )
+    return stale.update(status=ExportJob.STATUS_PENDING, started_at=None, heartbeat_at=None, processed_rows=0)
+
+
+def claim_next_job():
+    """Mark the oldest pending export job as running and return its id, or None
+
+    Stale running jobs are requeued first (see requeue_stale_jobs).
+    """
+    requeue_stale_jobs()
+    while True:
+        job_id = (
+            ExportJob.objects.filter(status=ExportJob.STATUS_PENDING)
+            .order_by('created_at')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        # Another worker may have claimed it between the two queries
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_PENDING).update(
+            status=ExportJob.STATUS_RUNNING, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return job_id
+
+
+class _RowCounter:
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def run_export_job(job_id):
+    """Write one export job's file under MEDIA_ROOT, recording progress as chunks are written"""
+    close_old_connections()
+    job = ExportJob.objects.get(pk=job_id)
+    # Once the job is requeued and claimed again, this attempt's updates are dropped
+    progress = ExportJob.objects.filter(pk=job_id, attempts=job.attempts)
+    try:
+        columns = exports.export_columns(job.options.get('fields', []))
+        queryset = exports.export_queryset(job.options)
+        progress.update(total_rows=queryset.count(), heartbeat_at=timezone.now())
+
+        name = f'exports/students_export_{job.token}.{exports.EXTENSIONS[job.format]}'
+        path = Path(settings.MEDIA_ROOT) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(f'{path.suffix}.{job.attempts}.part')
+
+        rows = _RowCounter(exports.export_rows_in_batches(queryset, columns))
+        with open(partial, 'wb') as output:
+            for chunk in exports.STREAMERS[job.format](exports.export_headers(columns), rows):
+                output.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                progress.update(processed_rows=rows.count, heartbeat_at=timezone.now())
+        os.replace(partial, path)
+
+        progress.update(
+            status=ExportJob.STATUS_COMPLETED,
+            file=name,
+            processed_rows=rows.count,
+            finished_at=timezone.now(),
+        )
+    except Exception as exc:
+        progress.update(status=ExportJob.STATUS_FAILED, error=str(exc), finished_at=timezone.now())
+        raise
+    finally:
+        close_old_connections()
+    return job_id
+
+
+def mark_job_failed(job_id, error):
+    """Fail a job whose worker died before it could record the error itself"""
+    ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_RUNNING).update(
+        status=ExportJob.STATUS_FAILED, error=str(error), finished_at=timezone.now()
+    )
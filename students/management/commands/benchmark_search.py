@@ -0,0 +1,80 @@
+import json
+import statistics
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from students.models import Student
+from students.search import (
+    IcontainsSearchBackend,
+    PostgresSearchBackend,
+    SQLiteFTSSearchBackend,
+    fts_tokenizer,
+)
+from students.synthetic import generate_students
+
+DEFAULT_QUERIES = ['sharma', 'priya kap', 'S0000042', 'rohan.mehta', 'nonexistent']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time each student search backend at increasing table sizes. '
+        'Synthetic rows are inserted in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def backends(self):
+        backends = {'icontains': IcontainsSearchBackend()}
+        tokenizer = fts_tokenizer(connection) if connection.vendor == 'sqlite' else None
+        if tokenizer:
+            backends['sqlite_fts'] = SQLiteFTSSearchBackend(trigram=tokenizer == 'trigram')
+        if connection.vendor == 'postgresql':
+            backends['postgres'] = PostgresSearchBackend()
+        return backends
+
+    def time_query(self, backend, query, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = backend.search(Student.objects.filter(is_active=True), query)
+            list(queryset.order_by('-search_rank', 'student_id')[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        return round(statistics.median(timings), 3)
+
+    def handle(self, *args, **options):
+        backends = self.backends()
+        offset = Student.objects.count()
+        results = []
+        try:
+            with transaction.atomic():
+                inserted = 0
+                for size in sorted(options['sizes']):
+                    rows = generate_students(size - inserted, seed=options['seed'], start=offset + inserted)
+                    while batch := list(islice(rows, options['batch_size'])):
+                        Student.objects.bulk_create(batch)
+                    inserted = size
+                    for name, backend in backends.items():
+                        for query in options['queries']:
+                            results.append({
+                                'rows': size,
+                                'backend': name,
+                                'query': query,
+                                'median_ms': self.time_query(backend, query, options['repeat']),
+                            })
+                    self.stderr.write(f'Measured {size} rows')
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,157 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from students.instrumentation import _percentile
+from students.models import ExportJob, Student
+from students.synthetic import seed_students
+
+# Views that change data; requesting them repeatedly would measure a
+# different table each time
+MUTATING_VIEWS = {
+    'student_delete_ajax': 'POST only; deletes a student',
+    'student_bulk_action': 'POST only; updates students',
+    'export_job_create': 'POST only; queues an export job',
+    'api_student_bulk': 'POST/PATCH/DELETE only; writes students',
+    'export_job_download': 'needs a finished export file',
+}
+
+# Views that read every row once per request
+FULL_SCAN_VIEWS = {'export_download'}
+
+
+# Private in-memory cache behind the default and students aliases while
+# the views are measured, so clearing it never touches a shared backend
+BENCHMARK_CACHE = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-views'}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every students view at increasing table sizes and report latency, '
+        'query counts and peak Python memory as JSON. Generated rows are inserted '
+        'in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per view and size.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--views', nargs='+', help='Only these URL names.')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def cases(self, student_pk, job_token):
+        """(URL name, path) pairs covering every view that only reads"""
+        list_url = reverse('students:student_list')
+        api_url = reverse('students:api_student_list')
+        return [
+            ('dashboard', reverse('students:dashboard')),
+            ('chart_data', reverse('students:chart_data')),
+            ('student_list', list_url),
+            ('student_list', f'{list_url}?page=50'),
+            ('student_list', f'{list_url}?paginate=cursor'),
+            ('student_list', f'{list_url}?department=CS&year=2'),
+            ('student_list', f'{list_url}?search=sharma'),
+            ('student_create', reverse('students:student_create')),
+            ('student_detail', reverse('students:student_detail', args=[student_pk])),
+            ('student_update', reverse('students:student_update', args=[student_pk])),
+            ('student_delete', reverse('students:student_delete', args=[student_pk])),
+            ('student_import', reverse('students:student_import')),
+            ('export_students', reverse('students:export_students')),
+            ('export_download', f'{reverse("students:export_download")}?format=csv&department=CS'),
+            ('export_job_status', reverse('students:export_job_status', args=[job_token])),
+            ('instrumentation_stats', reverse('students:instrumentation_stats')),
+            ('api_student_list', api_url),
+            ('api_student_list', f'{api_url}?fields=id,student_id,first_name&page_size=500'),
+            ('api_student_detail', reverse('students:api_student_detail', args=[student_pk])),
+        ]
+
+    def host(self):
+        hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+        return hosts[0] if hosts else 'localhost'
+
+    def request(self, client, path):
+        started = time.perf_counter()
+        response = client.get(path)
+        # The test client closes streamed responses once they are consumed
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed
+
+    def measure(self, client, path, repeat):
+        # The first request runs with empty caches (BENCHMARK_CACHE)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            status, first = self.request(client, path)
+        query_count = len(queries)
+
+        tracemalloc.start()
+        try:
+            self.request(client, path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        timings = [self.request(client, path)[1] for _ in range(repeat)]
+        return {
+            'status': status,
+            'first_ms': round(first * 1000, 2),
+            'p50_ms': round(statistics.median(timings) * 1000, 2),
+            'p95_ms': round(_percentile(sorted(timings), 95) * 1000, 2),
+            'queries': query_count,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=self.host())
+        results = []
+        skipped = [{'view': name, 'reason': reason} for name, reason in MUTATING_VIEWS.items()]
+        caches = {
+            **settings.CACHES,
+            'default': BENCHMARK_CACHE,
+            getattr(settings, 'STUDENT_CACHE_ALIAS', 'default'): BENCHMARK_CACHE,
+        }
+        try:
+            with override_settings(CACHES=caches), transaction.atomic():
+                # Staff, so the metrics view answers instead of redirecting
+                client.force_login(User.objects.create_user('benchmark-views', is_staff=True))
+                job = ExportJob.objects.create(format='csv', options={})
+                inserted = 0
+                for size in sorted(options['sizes']):
+                    seed_students(size - inserted, seed=options['seed'], batch_size=options['batch_size'])
+                    inserted = size
+                    student_pk = Student.objects.filter(is_active=True).order_by('-pk').values_list('pk', flat=True).first()
+                    for name, path in self.cases(student_pk, job.token):
+                        if options['views'] and name not in options['views']:
+                            continue
+                        repeat = 1 if name in FULL_SCAN_VIEWS else options['repeat']
+                        results.append({'rows': size, 'view': name, 'path': path, **self.measure(client, path, repeat)})
+                    self.stderr.write(f'Measured {size} rows')
+                raise Rollback
+        except Rollback:
+            pass
+
+        failed = [result for result in results if result['status'] != 200]
+        report = json.dumps({'results': results, 'skipped': skipped}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        self.stdout.write(report)
+        if failed:
+            raise CommandError(f'{len(failed)} requests did not return 200.')
@@ -0,0 +1,21 @@
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from students.staticfiles import PrecompressedManifestStorage
+
+
+class Command(collectstatic.Command):
+    help = (
+        'Collect static files into STATIC_ROOT minified, with content hashes in their '
+        'names and gzip/brotli copies, whatever STORAGES selects. Takes the collectstatic options.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = PrecompressedManifestStorage()
+
+    def handle(self, **options):
+        summary = super().handle(**options)
+        if summary is None:
+            return None
+        compressed = getattr(self.storage, 'compressed', [])
+        return f'{summary}\n{len(compressed)} precompressed files written.'
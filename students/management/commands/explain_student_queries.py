@@ -0,0 +1,115 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Max, Value
+
+from students.models import Student
+from students.search import SORT_ORDERINGS
+from students.stats import cgpa_histogram, enrollment_by_month, latest_update
+
+# Plan fragments that mean the whole table is read row by row
+FULL_SCAN_MARKERS = {
+    'sqlite': ('SCAN students_student',),
+    'postgresql': ('Seq Scan on students_student',),
+}
+
+# Plan fragments that mean the rows are sorted after they are read,
+# instead of being read in index order
+SORT_MARKERS = {
+    'sqlite': ('USE TEMP B-TREE FOR ORDER BY',),
+    'postgresql': ('Sort Key:',),
+}
+
+# Range filters read their matches from the range's index, then sort them
+# for the page; only the matching rows are sorted
+RANGE_PLANS = {'student_list (cgpa range)', 'student_list (semester range)', 'student_list (age range)'}
+
+
+def view_querysets():
+    """The querysets the student views run, keyed by a short description"""
+    active = Student.objects.filter(is_active=True)
+    sample = active.values('department', 'year', 'gender').first() or {
+        'department': 'CS', 'year': 1, 'gender': 'M',
+    }
+    page = active.for_list()
+    querysets = {
+        'student_list': page[:10],
+        'student_list (department)': page.filter(department=sample['department'])[:10],
+        'student_list (year)': page.filter(year=sample['year'])[:10],
+        'student_list (gender)': page.filter(gender=sample['gender'])[:10],
+        'student_list (count)': active.order_by().values('pk'),
+        # The ETag and Last-Modified of page-numbered lists, as one row
+        'student_list (freshness)': active.order_by().annotate(row=Value(1)).values('row').annotate(
+            last_modified=Max('updated_at'), count=Count('pk'),
+        ),
+        # The validators of cursor pages and the dashboard
+        'latest update': latest_update()[:1],
+        'student_list (cgpa range)': page.filter(cgpa__gte=3, cgpa__lte=3.5)[:10],
+        'student_list (semester range)': page.filter(semester__gte=5)[:10],
+        'student_list (age range)': page.aged(18, 21)[:10],
+        'student_list (city)': page.in_city('Pune')[:10],
+        'student_list (combined ranges, count)': active.aged(18, 21).in_city('Pune').filter(
+            cgpa__gte=3.5, semester__gte=5,
+        ).order_by().values('pk'),
+        'student_detail': active.filter(pk=1),
+        'dashboard (recent)': active.order_by('-created_at')[:5],
+        'dashboard (top)': active.filter(cgpa__gt=0).order_by('-cgpa')[:5],
+        'chart_data (enrollment)': enrollment_by_month(),
+        'chart_data (cgpa)': cgpa_histogram(),
+    }
+    for sort, ordering in SORT_ORDERINGS.items():
+        querysets[f'student_list (sort={sort})'] = page.order_by(*ordering)[:10]
+        querysets[f'student_list (sort={sort}, desc)'] = page.order_by(*[f'-{name}' for name in ordering])[:10]
+    return querysets
+
+
+def is_full_scan(plan, vendor):
+    for line in plan.splitlines():
+        for marker in FULL_SCAN_MARKERS.get(vendor, ()):
+            # SQLite reports index-driven scans as "SCAN table USING INDEX ..."
+            if marker in line and 'USING' not in line:
+                return True
+    return False
+
+
+def sorts_rows(plan, vendor):
+    return any(marker in plan for marker in SORT_MARKERS.get(vendor, ()))
+
+
+class Command(BaseCommand):
+    help = 'Print the query plans for the queries run by the student views'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Run EXPLAIN ANALYZE (PostgreSQL only).',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        explain_options = {}
+        if options['analyze'] and vendor == 'postgresql':
+            explain_options['analyze'] = True
+
+        full_scans = []
+        sorts = []
+        range_sorts = []
+        for name, queryset in view_querysets().items():
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write('')
+            if is_full_scan(plan, vendor):
+                full_scans.append(name)
+            if sorts_rows(plan, vendor):
+                (range_sorts if name in RANGE_PLANS else sorts).append(name)
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING(f'Full table scans: {", ".join(full_scans)}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans.'))
+        if sorts:
+            self.stdout.write(self.style.WARNING(f'Sorted outside an index: {", ".join(sorts)}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No sorts outside an index.'))
+        if range_sorts:
+            self.stdout.write(f'Range matches sorted for the page: {", ".join(range_sorts)}')
@@ -0,0 +1,45 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.imports import BATCH_SIZE, import_students
+
+
+class Command(BaseCommand):
+    help = 'Bulk import students from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row of field or column names.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without saving.')
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as csv_file:
+                result = import_students(
+                    csv_file, batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            raise CommandError(exc)
+        elapsed = time.perf_counter() - started
+
+        if options['errors'] and result.errors:
+            with open(options['errors'], 'w', newline='') as report:
+                writer = csv.writer(report)
+                writer.writerow(['row', 'field', 'error'])
+                for row_number, errors in result.errors:
+                    for name, messages in errors.items():
+                        for message in messages:
+                            writer.writerow([row_number, name, message])
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} of {result.rows} rows in {elapsed:.1f}s '
+            f'({result.failed} failed).'
+        ))
+        for row_number, errors in result.errors[:20]:
+            for name, messages in errors.items():
+                self.stdout.write(f'  row {row_number}: {name}: {" ".join(messages)}')
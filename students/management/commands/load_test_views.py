@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from students.models import Student
+
+SERVERS = ('wsgi', 'asgi')
+
+
+def _wsgi_get(application, path):
+    url = urlsplit(path)
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': url.path, 'QUERY_STRING': url.query, 'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+    response = application(environ, lambda code, headers, exc_info=None: status.append(int(code[:3])))
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return status[0]
+
+
+async def _asgi_get(application, path):
+    url = urlsplit(path)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url.path,
+        'raw_path': url.path.encode(),
+        'query_string': url.query.encode(),
+        'headers': [(b'host', b'127.0.0.1')],
+        'client': ('127.0.0.1', 0),
+        'server': ('127.0.0.1', 80),
+    }
+    requested = False
+    disconnected = asyncio.Event()
+    status = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client stays connected until the response is sent
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif not message.get('more_body'):
+            disconnected.set()
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def _summary(server, timings, failures, elapsed):
+    timings.sort()
+    return {
+        'server': server,
+        'requests': len(timings),
+        'failures': failures,
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1] * 1000, 2),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare WSGI and ASGI throughput of the read views on the current database. '
+        'Each server runs in its own process, calling Django\'s handler directly: '
+        'WSGI with a thread per concurrent request and the sync views, '
+        'ASGI on one event loop with the async views.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Paths to request in turn; the read views by default.')
+        parser.add_argument('--requests', type=int, default=500, help='Timed requests per server.')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+        parser.add_argument('--worker', choices=SERVERS, help=argparse.SUPPRESS)
+
+    def default_paths(self):
+        pk = Student.objects.filter(is_active=True).values_list('pk', flat=True).first()
+        if pk is None:
+            raise CommandError('There are no active students to request.')
+        return ['/', '/list/', '/list/?page=2', f'/{pk}/']
+
+    def requested_paths(self, options):
+        paths = options['paths'] or self.default_paths()
+        count = options['warmup'] + options['requests']
+        return [paths[index % len(paths)] for index in range(count)]
+
+    def run_wsgi(self, paths, options):
+        application = get_wsgi_application()
+        warmup = options['warmup']
+
+        def timed_get(path):
+            started = time.perf_counter()
+            status = _wsgi_get(application, path)
+            return time.perf_counter() - started, status
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(timed_get, paths[:warmup]))
+            started = time.perf_counter()
+            results = list(pool.map(timed_get, paths[warmup:]))
+            elapsed = time.perf_counter() - started
+        return results, elapsed
+
+    def run_asgi(self, paths, options):
+        application = get_asgi_application()
+        warmup = options['warmup']
+
+        async def timed_get(path):
+            started = time.perf_counter()
+            status = await _asgi_get(application, path)
+            return time.perf_counter() - started, status
+
+        async def run(paths):
+            pending = iter(paths)
+            results = []
+
+            async def client():
+                for path in pending:
+                    results.append(await timed_get(path))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(options['concurrency'])))
+            return results, time.perf_counter() - started
+
+        asyncio.run(run(paths[:warmup]))
+        return asyncio.run(run(paths[warmup:]))
+
+    def run_worker(self, server, options):
+        paths = self.requested_paths(options)
+        results, elapsed = getattr(self, f'run_{server}')(paths, options)
+        timings = [timing for timing, _ in results]
+        failures = sum(1 for _, status in results if status != 200)
+        self.stdout.write(json.dumps(_summary(server, timings, failures, elapsed)))
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.run_worker(options['worker'], options)
+            return
+
+        paths = options['paths'] or self.default_paths()
+        results = []
+        for server in options['servers']:
+            # Each server gets a fresh process, so the URLconf picks its views
+            command = [
+                sys.executable, '-m', 'django', 'load_test_views', *paths, '--worker', server,
+                '--requests', str(options['requests']),
+                '--concurrency', str(options['concurrency']),
+                '--warmup', str(options['warmup']),
+            ]
+            env = {**os.environ, 'STUDENT_ASYNC_VIEWS': str(server == 'asgi')}
+            completed = subprocess.run(
+                command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            if completed.returncode:
+                raise CommandError(f'The {server} run failed:\n{completed.stderr}')
+            results.append(json.loads(completed.stdout.splitlines()[-1]))
+            self.stderr.write(f'Measured {server}')
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from students.images import has_current_variants, process_profile_picture
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Re-encode profile pictures and write their thumbnails where that has not happened yet'
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        students = (
+            Student.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .only('pk', 'profile_picture', 'picture_variants')
+        )
+        for student in students.iterator():
+            if has_current_variants(student):
+                continue
+            try:
+                process_profile_picture(student.pk, student.profile_picture.name)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f'Student {student.pk}: {exc}'))
+            else:
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} profile pictures, {failed} failed.'))
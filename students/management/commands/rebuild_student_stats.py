@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from students.stats import rebuild_student_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the StudentStats counters from the Student table'
+
+    def handle(self, *args, **options):
+        buckets = rebuild_student_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} student statistics buckets.'))
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from students.jobs import claim_next_job, mark_job_failed, run_export_job
+from students.worker import init_worker, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run pending export jobs in a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=min(4, os.cpu_count() or 1),
+            help='Worker processes; 0 runs jobs in this process.',
+        )
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no jobs are pending or running.',
+        )
+
+    def report(self, job_id, error=None):
+        if error is None:
+            self.stdout.write(self.style.SUCCESS(f'Export job {job_id} completed.'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Export job {job_id} failed: {error}'))
+
+    def run_inline(self, options):
+        while True:
+            job_id = claim_next_job()
+            if job_id is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            try:
+                run_export_job(job_id)
+            except Exception as exc:
+                self.report(job_id, exc)
+            else:
+                self.report(job_id)
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes <= 0:
+            self.run_inline(options)
+            return
+
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(processes, mp_context=context, initializer=init_worker) as pool:
+            running = {}
+            while True:
+                while len(running) < processes:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    running[pool.submit(run_job, job_id)] = job_id
+                # Don't hold a connection open while waiting on the pool
+                connections.close_all()
+
+                if not running:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        mark_job_failed(job_id, error)
+                    self.report(job_id, error)
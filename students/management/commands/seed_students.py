@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from students.synthetic import seed_students
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert generated students across every department, year and gender. '
+        'The same --seed and --start always give the same rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--start', type=int,
+            help='Number of the first generated student; continues after the existing rows by default.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = seed_students(
+            options['count'], seed=options['seed'], start=options['start'], batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {count} students in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s).'
+        ))
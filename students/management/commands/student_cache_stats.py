@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from students.caching import cache_counters, reset_cache_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hit and miss counters of the student cache. With the locmem '
+        'backend each process has its own counters, so use the file or redis '
+        'backend to read them from here.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the counters as JSON.')
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them.')
+
+    def handle(self, *args, **options):
+        counters = cache_counters()
+        if options['json']:
+            self.stdout.write(json.dumps(counters, indent=2))
+        else:
+            for name, counts in counters.items():
+                ratio = '-' if counts['hit_ratio'] is None else f"{counts['hit_ratio']:.1%}"
+                self.stdout.write(f"{name:<16} hits {counts['hits']:>8}  misses {counts['misses']:>8}  hit ratio {ratio}")
+        if options['reset']:
+            reset_cache_counters()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
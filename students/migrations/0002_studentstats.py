@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:19
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_student_stats(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    StudentStats = apps.get_model('students', 'StudentStats')
+    rows = (
+        Student.objects.order_by()
+        .values('department', 'year', 'gender', 'is_active')
+        .annotate(
+            count=Count('pk'),
+            graded_count=Count('pk', filter=Q(cgpa__gt=0)),
+            cgpa_total=Sum('cgpa', filter=Q(cgpa__gt=0)),
+        )
+    )
+    StudentStats.objects.bulk_create([
+        StudentStats(
+            department=row['department'],
+            year=row['year'],
+            gender=row['gender'],
+            is_active=row['is_active'],
+            count=row['count'],
+            graded_count=row['graded_count'],
+            cgpa_total=row['cgpa_total'] or 0,
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(choices=[('CS', 'Computer Science'), ('IT', 'Information Technology'), ('EE', 'Electrical Engineering'), ('ME', 'Mechanical Engineering'), ('CE', 'Civil Engineering'), ('BT', 'Biotechnology'), ('CH', 'Chemical Engineering'), ('PH', 'Physics'), ('MA', 'Mathematics'), ('EN', 'English'), ('HI', 'History'), ('EC', 'Economics')], max_length=2, verbose_name='Department')),
+                ('year', models.IntegerField(choices=[(1, 'First Year'), (2, 'Second Year'), (3, 'Third Year'), (4, 'Fourth Year')], verbose_name='Year')),
+                ('gender', models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('O', 'Other')], max_length=1, verbose_name='Gender')),
+                ('is_active', models.BooleanField(verbose_name='Active Status')),
+                ('count', models.IntegerField(default=0, verbose_name='Students')),
+                ('graded_count', models.IntegerField(default=0, verbose_name='Students with CGPA')),
+                ('cgpa_total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='CGPA Total')),
+            ],
+            options={
+                'verbose_name': 'Student Statistics',
+                'verbose_name_plural': 'Student Statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentstats',
+            constraint=models.UniqueConstraint(fields=('department', 'year', 'gender', 'is_active'), name='unique_student_stats_bucket'),
+        ),
+        migrations.RunPython(populate_student_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+FTS_TABLE = 'students_student_fts'
+
+PG_VECTOR_SQL = (
+    "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') "
+    "|| ' ' || coalesce(student_id, '') || ' ' || coalesce(email, ''))"
+)
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        first_name, last_name, student_id, email,
+        content='students_student', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER students_student_fts_insert AFTER INSERT ON students_student BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, student_id, email)
+        VALUES (new.id, new.first_name, new.last_name, new.student_id, new.email);
+    END""",
+    f"""CREATE TRIGGER students_student_fts_delete AFTER DELETE ON students_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, student_id, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.student_id, old.email);
+    END""",
+    # Only re-index when a searched column changes, not on soft deletes
+    f"""CREATE TRIGGER students_student_fts_update
+        AFTER UPDATE OF first_name, last_name, student_id, email ON students_student BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, student_id, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.student_id, old.email);
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, student_id, email)
+        VALUES (new.id, new.first_name, new.last_name, new.student_id, new.email);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS students_student_fts_update',
+    'DROP TRIGGER IF EXISTS students_student_fts_delete',
+    'DROP TRIGGER IF EXISTS students_student_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS student_search_vector_idx ON students_student USING gin ({PG_VECTOR_SQL})',
+    'CREATE INDEX IF NOT EXISTS student_id_trgm_idx ON students_student USING gin (student_id gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS student_email_trgm_idx ON students_student USING gin (email gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS student_email_trgm_idx',
+    'DROP INDEX IF EXISTS student_id_trgm_idx',
+    'DROP INDEX IF EXISTS student_search_vector_idx',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for statement in vendor_statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:55
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('students.migrations.0004_student_search')
+
+# SQLite adds the column by rebuilding students_student, which drops the
+# full-text search triggers; put them back (rowids are kept, so the
+# rebuild only re-reads the table)
+SQLITE_TRIGGERS = [statement for statement in search.SQLITE_FORWARD if not statement.startswith('CREATE VIRTUAL')]
+RESTORE_SEARCH_TRIGGERS = search.SQLITE_REVERSE[:3] + SQLITE_TRIGGERS
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            search.run_for_vendor({'sqlite': RESTORE_SEARCH_TRIGGERS}),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Picture Variants'),
+        ),
+        migrations.RunPython(
+            search.run_for_vendor({'sqlite': RESTORE_SEARCH_TRIGGERS}),
+            migrations.RunPython.noop,
+        ),
+    ]
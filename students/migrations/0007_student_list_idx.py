@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_student_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student_id', 'email', 'phone', 'department', 'year', 'semester', 'cgpa', 'city', 'state', 'profile_picture', 'picture_variants', 'is_active', 'first_name', 'last_name', 'date_of_birth'], name='student_list_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_student_list_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_active_recent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_active_cgpa_idx',
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['first_name', 'last_name', 'student_id'], name='student_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'student_id'], name='student_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['cgpa', 'student_id'], name='student_active_cgpa_id_idx'),
+        ),
+    ]
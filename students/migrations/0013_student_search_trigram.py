@@ -0,0 +1,39 @@
+import sqlite3
+
+from django.db import migrations
+
+FTS_TABLE = 'students_student_fts'
+
+FTS_COLUMNS = 'first_name, last_name, student_id, email'
+
+
+def _recreate(schema_editor, tokenize):
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"{FTS_COLUMNS}, content='students_student', content_rowid='id'{tokenize})"
+    )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def use_trigrams(apps, schema_editor):
+    # The trigram tokenizer arrived in SQLite 3.34; older versions keep
+    # the word index, which SQLiteFTSSearchBackend detects
+    if schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34):
+        _recreate(schema_editor, ", tokenize='trigram'")
+
+
+def use_words(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        _recreate(schema_editor, '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_exportjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_trigrams, use_words),
+    ]
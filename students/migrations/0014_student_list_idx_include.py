@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0013_student_search_trigram'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_active_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_list_idx',
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student_id'], include=('email', 'phone', 'department', 'year', 'semester', 'cgpa', 'city', 'state', 'first_name', 'last_name', 'date_of_birth'), name='student_list_idx'),
+        ),
+    ]
@@ -1,6 +1,80 @@
 from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Concat, ExtractYear, Lower
 from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import date
+import copy
+import uuid
+
+# The columns student_list renders
+LIST_FIELDS = [
+    'student_id', 'email', 'phone', 'department', 'year', 'semester', 'cgpa',
+    'city', 'state', 'profile_picture', 'picture_variants', 'is_active',
+]
+# The list page's scalar columns, and those its full_name and age are
+# computed from, kept in the leaf entries of student_list_idx where the
+# database supports INCLUDE. The picture columns and is_active (implied by
+# the index's condition) are left to the rows.
+LIST_INCLUDE_FIELDS = [
+    'email', 'phone', 'department', 'year', 'semester', 'cgpa', 'city', 'state',
+    'first_name', 'last_name', 'date_of_birth',
+]
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a year without one
+        return day.replace(year=day.year - years, day=28)
+
+class StudentQuerySet(models.QuerySet):
+    def aged(self, minimum=None, maximum=None):
+        """Students whose age (as Student.age computes it) is within the inclusive bounds
+        
+        The bounds become a date_of_birth range, so the database can use
+        an index instead of computing every student's age.
+        """
+        today = date.today()
+        queryset = self
+        if minimum is not None:
+            queryset = queryset.filter(date_of_birth__lte=_years_before(today, minimum))
+        if maximum is not None:
+            queryset = queryset.filter(date_of_birth__gt=_years_before(today, maximum + 1))
+        return queryset
+    
+    def in_city(self, city):
+        """Students in ``city``, ignoring case, through the lower-cased city index"""
+        return self.alias(city_key=Lower('city')).filter(city_key=city.strip().lower())
+    
+    def for_list(self, *fields):
+        """Only the list page's columns (and ``fields``), with full_name and age computed by the database"""
+        today = date.today()
+        birthday_ahead = (
+            models.Q(date_of_birth__month__gt=today.month)
+            | models.Q(date_of_birth__month=today.month, date_of_birth__day__gt=today.day)
+        )
+        return self.only(*LIST_FIELDS, *fields).annotate(
+            list_full_name=Concat('first_name', models.Value(' '), 'last_name', output_field=models.CharField()),
+            list_age=models.ExpressionWrapper(
+                today.year - ExtractYear('date_of_birth')
+                - models.Case(models.When(birthday_ahead, then=1), default=0),
+                output_field=models.IntegerField(),
+            ),
+        )
+
+def _tracked_value(value):
+    """A copy of a field value that later changes to the instance cannot alter"""
+    if isinstance(value, FieldFile):
+        return value.name
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+def _is_changed(value, loaded):
+    # An assigned upload is only written to storage by save()
+    if not getattr(value, '_committed', True):
+        return True
+    return _tracked_value(value) != loaded
 
 class Student(models.Model):
     GENDER_CHOICES = [
@@ -69,6 +143,8 @@ class Student(models.Model):
         null=True,
         verbose_name="Profile Picture"
     )
+    # Thumbnails of profile_picture, written in the background by images.py
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Picture Variants")
     emergency_contact = models.CharField(max_length=15, verbose_name="Emergency Contact")
     emergency_contact_name = models.CharField(max_length=100, verbose_name="Emergency Contact Name")
     
@@ -79,20 +155,104 @@ class Student(models.Model):
     # Status
     is_active = models.BooleanField(default=True, verbose_name="Active Status")
     
+    objects = StudentQuerySet.as_manager()
+    
+    # Field values as last read from or written to the database, by attname
+    _loaded_values = None
+    
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
         ordering = ['student_id']
+        indexes = [
+            # student_list: active students ordered by student_id, optionally
+            # narrowed to one department, year or gender
+            models.Index(
+                fields=['student_id'], include=LIST_INCLUDE_FIELDS,
+                condition=models.Q(is_active=True), name='student_list_idx',
+            ),
+            models.Index(fields=['department', 'student_id'], condition=models.Q(is_active=True), name='student_active_dept_idx'),
+            models.Index(fields=['year', 'student_id'], condition=models.Q(is_active=True), name='student_active_year_idx'),
+            models.Index(fields=['gender', 'student_id'], condition=models.Q(is_active=True), name='student_active_gender_idx'),
+            # ...or sorted by name, and (read backwards too) by date added and
+            # CGPA, which is also how the dashboard lists recent and top students
+            models.Index(fields=['first_name', 'last_name', 'student_id'], condition=models.Q(is_active=True), name='student_active_name_idx'),
+            models.Index(fields=['created_at', 'student_id'], condition=models.Q(is_active=True), name='student_active_created_idx'),
+            models.Index(fields=['cgpa', 'student_id'], condition=models.Q(is_active=True), name='student_active_cgpa_id_idx'),
+            # the list page's range filters; age is searched as a date_of_birth range
+            models.Index(fields=['semester'], condition=models.Q(is_active=True), name='student_active_semester_idx'),
+            models.Index(fields=['date_of_birth'], condition=models.Q(is_active=True), name='student_active_dob_idx'),
+            models.Index(Lower('city'), 'student_id', condition=models.Q(is_active=True), name='student_active_city_idx'),
+            # the list's validators: MAX(updated_at) and COUNT, read from the
+            # index alone (SQLite only covers columns the index holds)
+            models.Index(fields=['updated_at', 'is_active'], condition=models.Q(is_active=True), name='student_active_updated_idx'),
+            # the admin's date hierarchy, across both statuses
+            models.Index(fields=['created_at'], name='student_created_idx'),
+            # rebuild_student_stats groups by these columns across both statuses
+            models.Index(fields=['is_active', 'department', 'year', 'gender'], name='student_status_groups_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student_id} - {self.first_name} {self.last_name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._loaded_values = {**(self._loaded_values or {}), **self._tracked_values(fields)}
+    
+    def _tracked_values(self, names=None):
+        loaded = self.__dict__
+        return {
+            field.attname: _tracked_value(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in loaded
+            and (names is None or field.name in names or field.attname in names)
+        }
+    
+    def changed_fields(self):
+        """Names of the fields assigned a different value since the student was read or saved
+        
+        Deferred fields that were never loaded are left out; ones assigned
+        without being loaded count as changed.
+        """
+        loaded = self._loaded_values or {}
+        return [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in self.__dict__
+            and (field.attname not in loaded or _is_changed(getattr(self, field.attname), loaded[field.attname]))
+        ]
+    
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """Save a student read from the database with an UPDATE of its changed
+        columns and updated_at only, or no query at all if nothing changed"""
+        tracked = (
+            self._loaded_values is not None and not self._state.adding and not force_insert
+            and update_fields is None and using in (None, self._state.db)
+        )
+        if tracked:
+            update_fields = self.changed_fields()
+            if not update_fields:
+                return
+            if 'updated_at' not in update_fields:
+                update_fields.append('updated_at')
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+        self._loaded_values = {**(self._loaded_values or {}), **self._tracked_values(update_fields)}
+    
     @property
     def full_name(self):
+        if 'list_full_name' in self.__dict__:
+            return self.list_full_name
         return f"{self.first_name} {self.last_name}"
     
     @property
     def age(self):
+        if 'list_age' in self.__dict__:
+            return self.list_age
         today = date.today()
         return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
     
@@ -101,3 +261,78 @@ class Student(models.Model):
     
     def get_year_display_name(self):
         return dict(self.YEAR_CHOICES)[self.year]
+
+
+class StudentStats(models.Model):
+    """Materialized student counters per department, year, gender and status"""
+    department = models.CharField(max_length=2, choices=Student.DEPARTMENT_CHOICES, verbose_name="Department")
+    year = models.IntegerField(choices=Student.YEAR_CHOICES, verbose_name="Year")
+    gender = models.CharField(max_length=1, choices=Student.GENDER_CHOICES, verbose_name="Gender")
+    is_active = models.BooleanField(verbose_name="Active Status")
+    
+    count = models.IntegerField(default=0, verbose_name="Students")
+    graded_count = models.IntegerField(default=0, verbose_name="Students with CGPA")
+    cgpa_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="CGPA Total")
+    
+    class Meta:
+        verbose_name = "Student Statistics"
+        verbose_name_plural = "Student Statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['department', 'year', 'gender', 'is_active'],
+                name='unique_student_stats_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.department}/{self.year}/{self.gender}/{'active' if self.is_active else 'inactive'}: {self.count}"
+
+
+class ExportJob(models.Model):
+    """A student export written to MEDIA_ROOT by the export worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name="Token")
+    format = models.CharField(max_length=10, verbose_name="Format")
+    options = models.JSONField(default=dict, verbose_name="Options")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    total_rows = models.IntegerField(null=True, blank=True, verbose_name="Total Rows")
+    processed_rows = models.IntegerField(default=0, verbose_name="Processed Rows")
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="File")
+    error = models.TextField(blank=True, verbose_name="Error")
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started At")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished At")
+    # Refreshed with each written chunk, so a job whose worker died can be told apart
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Heartbeat At")
+    attempts = models.IntegerField(default=0, verbose_name="Attempts")
+    
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Export {self.token} ({self.status})"
+    
+    @property
+    def progress(self):
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, int(self.processed_rows * 100 / self.total_rows))
@@ -0,0 +1,227 @@
+import base64
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# How long an approximate list total is reused before it is recounted
+TOTAL_CACHE_TIMEOUT = 60
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that keeps the microseconds of times
+
+    DjangoJSONEncoder cuts them to milliseconds, and a cursor must hold the
+    exact value its keyset filter compares against.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'v': values, 'd': direction}, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload['v'], payload['d']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(token)
+    if not isinstance(values, list) or direction not in ('next', 'prev'):
+        raise InvalidCursor(token)
+    return values, direction
+
+
+def _count_key(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'students:count:{digest}'
+
+
+def cached_count(queryset, timeout=TOTAL_CACHE_TIMEOUT):
+    """Count a queryset, reusing the result for the same query for ``timeout`` seconds"""
+    return cache.get_or_set(_count_key(queryset), queryset.count, timeout)
+
+
+async def acached_count(queryset, timeout=TOTAL_CACHE_TIMEOUT):
+    """cached_count() through the async ORM and cache API"""
+    key = _count_key(queryset)
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, timeout)
+    return count
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination over a queryset ordered by ``ordering``
+
+    Each page is fetched with a WHERE on the last/first row's ordering
+    values instead of an OFFSET, so every page costs the same. The
+    ordering must end in a unique field (the primary key is appended
+    otherwise) so rows are never skipped or repeated.
+
+    An ordering on a computed column, such as search relevance, has no
+    index to seek into; its cursors carry the offset of the page instead.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        ordering = list(ordering or queryset.model._meta.ordering)
+        model_fields = {field.name: field for field in queryset.model._meta.fields}
+        unique_fields = {name for name, field in model_fields.items() if field.unique}
+        if ordering[-1].lstrip('-') not in unique_fields:
+            ordering.append('pk')
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.keyset = all(name == 'pk' or name in model_fields for name in self.fields)
+
+    def values(self, *fields):
+        """Page over dicts of ``fields`` (plus the ordering fields) instead of model instances"""
+        self.queryset = self.queryset.values(*dict.fromkeys([*fields, *self.fields]))
+        return self
+
+    @property
+    def count(self):
+        """Approximate total: cached for a short time rather than counted per page"""
+        return cached_count(self.queryset)
+
+    async def acount(self):
+        """count through the async ORM"""
+        return await acached_count(self.queryset)
+
+    def _keyset_filter(self, values, reverse):
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            field = self.fields[position]
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[position]})
+            for previous in range(position):
+                step &= Q(**{self.fields[previous]: values[previous]})
+            condition |= step
+        # A plain range bound on the leading column lets the database seek
+        # into its index before applying the tie-breaking OR terms.
+        leading = 'lte' if self.ordering[0].startswith('-') != reverse else 'gte'
+        return Q(**{f'{self.fields[0]}__{leading}': values[0]}) & condition
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def _to_python(self, values):
+        if not self.keyset:
+            if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+                raise InvalidCursor(values)
+            return values
+        model = self.queryset.model
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        try:
+            return [
+                (model._meta.pk if name == 'pk' else model._meta.get_field(name)).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidCursor(values)
+
+    def _values(self, obj):
+        if isinstance(obj, dict):
+            return [obj[name] for name in self.fields]
+        return [getattr(obj, name) for name in self.fields]
+
+    def _page_query(self, cursor):
+        values, direction = None, 'next'
+        if cursor:
+            try:
+                values, direction = decode_cursor(cursor)
+                values = self._to_python(values)
+            except InvalidCursor:
+                values, direction = None, 'next'
+
+        if not self.keyset:
+            offset = values[0] if values is not None else 0
+            return self.queryset.order_by(*self.ordering)[offset:offset + self.per_page + 1], values, False
+
+        backwards = direction == 'prev'
+        queryset = self.queryset.order_by(
+            *(self._reversed_ordering() if backwards else self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, backwards))
+        return queryset[:self.per_page + 1], values, backwards
+
+    def _page(self, rows, values, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not self.keyset:
+            offset = values[0] if values is not None else 0
+            next_cursor = encode_cursor([offset + self.per_page], 'next') if has_more else None
+            previous_cursor = encode_cursor([max(offset - self.per_page, 0)], 'next') if offset else None
+            return CursorPage(rows, self, next_cursor, previous_cursor)
+
+        next_cursor = previous_cursor = None
+        if rows:
+            first, last = self._values(rows[0]), self._values(rows[-1])
+            if backwards:
+                next_cursor = encode_cursor(last, 'next')
+                previous_cursor = encode_cursor(first, 'prev') if has_more else None
+            else:
+                next_cursor = encode_cursor(last, 'next') if has_more else None
+                previous_cursor = encode_cursor(first, 'prev') if values is not None else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def get_page(self, cursor=None):
+        """Return the page after (or before) ``cursor``; invalid cursors give the first page"""
+        queryset, values, backwards = self._page_query(cursor)
+        return self._page(list(queryset), values, backwards)
+
+    async def aget_page(self, cursor=None):
+        """get_page() through the async ORM"""
+        queryset, values, backwards = self._page_query(cursor)
+        return self._page([row async for row in queryset], values, backwards)
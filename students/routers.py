@@ -0,0 +1,137 @@
+"""Read replicas for student data
+
+StudentReplicaRouter sends reads of Student and StudentStats to one of
+the STUDENT_DATABASE_REPLICAS aliases and every write to the primary.
+Reads stay on the primary:
+
+- inside a transaction on the primary, where a replica would miss the
+  transaction's own writes;
+- after a write to student data, for the rest of the request or task;
+- for a while after a client's last POST: ReplicaPinningMiddleware sets
+  a cookie for STUDENT_REPLICA_PIN_SECONDS so the redirect that follows
+  a form shows what was just saved.
+
+Other clients may read a lagging replica in that window. Export jobs and
+the apps outside students are not routed; they always use the primary.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Models whose reads may be served by a replica
+REPLICATED_MODELS = {'student', 'studentstats'}
+
+PIN_COOKIE = 'students_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_pinned = contextvars.ContextVar('student_primary_pinned', default=False)
+# The replica picked for this request, so its queries agree with each other
+_replica = contextvars.ContextVar('student_replica', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'STUDENT_DATABASE_REPLICAS', []))
+
+
+def _pin_seconds():
+    return getattr(settings, 'STUDENT_REPLICA_PIN_SECONDS', 5)
+
+
+@contextmanager
+def use_primary():
+    """Read student data from the primary inside this block"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def _is_replicated(model):
+    return model._meta.app_label == 'students' and model._meta.model_name in REPLICATED_MODELS
+
+
+class StudentReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _is_replicated(model):
+            return None
+        replicas = replica_aliases()
+        if not replicas or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if _replica.get() not in replicas:
+            _replica.set(random.choice(replicas))
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        if not _is_replicated(model):
+            return None
+        # Later reads in this request or task see what was written
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Route a request's student reads to the primary if it writes, or if
+    the client wrote within STUDENT_REPLICA_PIN_SECONDS; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.reset(tokens)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # Context variables follow the async ORM into its worker threads
+        tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.reset(tokens)
+        return self.finish(request, response)
+
+    def start(self, request):
+        pinned = request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+        return _pinned.set(pinned), _replica.set(None)
+
+    def reset(self, tokens):
+        pinned, replica = tokens
+        _pinned.reset(pinned)
+        _replica.reset(replica)
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(PIN_COOKIE, '1', max_age=_pin_seconds(), httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,200 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'students_student_fts'
+
+# Columns covered by the search box: name, student ID and email
+SEARCH_COLUMNS = ('first_name', 'last_name', 'student_id', 'email')
+
+PG_VECTOR_SQL = (
+    "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') "
+    "|| ' ' || coalesce(student_id, '') || ' ' || coalesce(email, ''))"
+)
+
+_TERM_RE = re.compile(r'\w+')
+
+# Orderings of the list page's sort keys. Each ends in the unique
+# student_id, so ties fall the same way on every page, and each has a
+# partial index over the active students (see Student.Meta.indexes).
+SORT_ORDERINGS = {
+    'name': ['first_name', 'last_name', 'student_id'],
+    'cgpa': ['cgpa', 'student_id'],
+    'year': ['year', 'student_id'],
+    'department': ['department', 'student_id'],
+    'created_at': ['created_at', 'student_id'],
+}
+
+# Unsorted search results: best matches first, ties by student_id
+RANKED_ORDERING = ['-search_rank', 'student_id']
+
+# Tokenizer of the FTS table, or None without one, per database alias
+# (checked once per process)
+_fts_tokenizers = {}
+
+
+def search_terms(query):
+    """Split a search string into lowercase word terms"""
+    return _TERM_RE.findall(query.lower())
+
+
+class IcontainsSearchBackend:
+    """Substring search over every column; works on any database but cannot use indexes"""
+
+    def search(self, queryset, query):
+        condition = Q()
+        for column in SEARCH_COLUMNS:
+            condition |= Q(**{f'{column}__icontains': query})
+        return queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class SQLiteFTSSearchBackend:
+    """Search through the students_student_fts FTS5 table, ranked by bm25
+
+    The table is indexed by trigrams (see migration 0013), so each term
+    matches anywhere in a name, student ID or email, as with icontains.
+    Trigrams need SQLite 3.34; with ``trigram=False`` (older SQLite keeps
+    the word index) terms only match the start of a word, so "0042" does
+    not find S0000042.
+    """
+
+    # Trigram indexes cannot look up shorter terms
+    MIN_TRIGRAM_TERM = 3
+
+    def __init__(self, trigram=True):
+        self.trigram = trigram
+
+    def match_expression(self, query):
+        if not self.trigram:
+            return ' '.join(f'"{term}"*' for term in search_terms(query))
+        terms = query.split()
+        if any(len(term) < self.MIN_TRIGRAM_TERM for term in terms):
+            return ''
+        return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return IcontainsSearchBackend().search(queryset, query)
+        # Join the FTS table directly: a correlated rank subquery would
+        # re-run the MATCH once per matching student.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = students_student.id', f'{FTS_TABLE} MATCH %s'],
+            params=[expression],
+            # FTS5 rank is bm25(), which is lower for better matches
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+        )
+
+
+class PostgresSearchBackend:
+    """tsvector prefix search on names plus trigram-indexed substring search on ID and email"""
+
+    def tsquery(self, query):
+        return ' & '.join(f'{term}:*' for term in search_terms(query))
+
+    def search(self, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return IcontainsSearchBackend().search(queryset, query)
+        matches = RawSQL(
+            f"SELECT id FROM students_student WHERE {PG_VECTOR_SQL} @@ to_tsquery('simple', %s)",
+            (tsquery,),
+        )
+        rank = RawSQL(
+            f"ts_rank({PG_VECTOR_SQL}, to_tsquery('simple', %s)) "
+            "+ greatest(similarity(student_id, %s), similarity(email, %s))",
+            (tsquery, query, query),
+            output_field=FloatField(),
+        )
+        return queryset.filter(
+            Q(pk__in=matches) | Q(student_id__icontains=query) | Q(email__icontains=query)
+        ).annotate(search_rank=rank)
+
+
+def fts_tokenizer(connection):
+    """'trigram' or 'unicode61' for the FTS table's tokenizer, or None if there is no table"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return 'trigram' if 'trigram' in row[0] else 'unicode61'
+
+
+def get_search_backend(using='default'):
+    """Return the backend named by STUDENT_SEARCH_BACKEND, or pick one for the database"""
+    path = getattr(settings, 'STUDENT_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        if using not in _fts_tokenizers:
+            _fts_tokenizers[using] = fts_tokenizer(connection)
+        if _fts_tokenizers[using]:
+            return SQLiteFTSSearchBackend(trigram=_fts_tokenizers[using] == 'trigram')
+    return IcontainsSearchBackend()
+
+
+def search_students(queryset, query):
+    """Filter a Student queryset by the search box text, best matches first"""
+    backend = get_search_backend(queryset.db)
+    return backend.search(queryset, query).order_by(*RANKED_ORDERING)
+
+
+def student_ordering(cleaned_data):
+    """order_by() fields for the search form's sort and order, or None for the default"""
+    sort = cleaned_data.get('sort')
+    if not sort:
+        return None
+    # Descending on every column, so the index is read backwards
+    if cleaned_data.get('order') == 'desc':
+        return [f'-{name}' for name in SORT_ORDERINGS[sort]]
+    return list(SORT_ORDERINGS[sort])
+
+
+def page_ordering(cleaned_data):
+    """The ordering pages of filtered students follow: the chosen sort,
+    relevance for an unsorted search, or None for the default"""
+    ordering = student_ordering(cleaned_data)
+    if ordering is None and cleaned_data.get('search'):
+        return list(RANKED_ORDERING)
+    return ordering
+
+
+def filter_students(queryset, cleaned_data):
+    """Apply the filters and sort of the list page's search form"""
+    for name in ('department', 'year', 'gender'):
+        value = cleaned_data.get(name)
+        if value:
+            queryset = queryset.filter(**{name: value})
+
+    # Each range is read from its own index (see Student.Meta.indexes)
+    for name in ('cgpa', 'semester'):
+        minimum, maximum = cleaned_data.get(f'min_{name}'), cleaned_data.get(f'max_{name}')
+        if minimum is not None:
+            queryset = queryset.filter(**{f'{name}__gte': minimum})
+        if maximum is not None:
+            queryset = queryset.filter(**{f'{name}__lte': maximum})
+    if cleaned_data.get('min_age') is not None or cleaned_data.get('max_age') is not None:
+        queryset = queryset.aged(cleaned_data.get('min_age'), cleaned_data.get('max_age'))
+    if cleaned_data.get('city'):
+        queryset = queryset.in_city(cleaned_data['city'])
+
+    search = cleaned_data.get('search')
+    if search:
+        queryset = search_students(queryset, search)
+
+    # A chosen sort replaces the search ranking
+    ordering = student_ordering(cleaned_data)
+    if ordering:
+        queryset = queryset.order_by(*ordering)
+    return queryset
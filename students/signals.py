@@ -0,0 +1,77 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import invalidate_student
+from .images import has_current_variants, schedule_picture_processing
+from .models import Student
+from .stats import STATS_FIELDS, apply_stats_delta
+
+
+def _stats_snapshot(instance, fallback=None):
+    """Return the stats-relevant values loaded on the instance
+
+    Deferred fields are taken from ``fallback``; without one, None is
+    returned if any field is deferred.
+    """
+    values = instance.__dict__
+    if fallback is None:
+        if any(name not in values for name in STATS_FIELDS):
+            return None
+        return tuple(values[name] for name in STATS_FIELDS)
+    return tuple(values.get(name, old) for name, old in zip(STATS_FIELDS, fallback))
+
+
+@receiver(post_init, sender=Student, dispatch_uid='student_stats_snapshot')
+def remember_stats_values(sender, instance, **kwargs):
+    """Remember the values a student was loaded with so saves can move it between buckets"""
+    instance._stats_snapshot = _stats_snapshot(instance) if instance.pk else None
+
+
+@receiver(pre_save, sender=Student, dispatch_uid='student_stats_load_previous')
+def load_previous_stats_values(sender, instance, raw=False, **kwargs):
+    """Fetch the stored values when the instance was loaded with deferred fields"""
+    if raw or not instance.pk or instance._stats_snapshot is not None:
+        return
+    previous = Student.objects.filter(pk=instance.pk).values_list(*STATS_FIELDS).first()
+    instance._stats_snapshot = tuple(previous) if previous else None
+
+
+@receiver(post_save, sender=Student, dispatch_uid='student_stats_save')
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep StudentStats in step with creates, soft deletes and field changes"""
+    if raw:
+        return
+    previous = None if created else instance._stats_snapshot
+    current = _stats_snapshot(instance, previous)
+    if current is None or current == previous:
+        return
+    if previous is not None:
+        apply_stats_delta(*previous, sign=-1)
+    apply_stats_delta(*current, sign=1)
+    instance._stats_snapshot = current
+
+
+@receiver(post_delete, sender=Student, dispatch_uid='student_stats_delete')
+def update_stats_on_delete(sender, instance, **kwargs):
+    """Remove a hard-deleted student from its bucket"""
+    snapshot = instance._stats_snapshot or _stats_snapshot(instance)
+    if snapshot is not None:
+        apply_stats_delta(*snapshot, sign=-1)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='student_cache_save')
+@receiver(post_delete, sender=Student, dispatch_uid='student_cache_delete')
+def invalidate_student_cache(sender, instance, raw=False, **kwargs):
+    """Drop the student's cached detail and every cached list that may include it"""
+    if not raw:
+        invalidate_student(instance.pk)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='student_picture_save')
+def process_profile_picture_on_save(sender, instance, raw=False, **kwargs):
+    """Queue thumbnails for a profile picture they were not made from yet"""
+    loaded = instance.__dict__
+    if raw or 'profile_picture' not in loaded or 'picture_variants' not in loaded:
+        return
+    if instance.profile_picture and not has_current_variants(instance):
+        schedule_picture_processing(instance)
@@ -0,0 +1,266 @@
+"""Minified, fingerprinted and precompressed static assets
+
+PrecompressedManifestStorage is ManifestStaticFilesStorage that minifies
+CSS and JavaScript before they are hashed, and writes a gzip copy (and a
+brotli one, if the brotli package is installed) next to each hashed text
+asset. build_static_assets runs collectstatic with it.
+
+serve_static answers STATIC_URL from STATIC_ROOT with the smallest copy
+the client accepts. Hashed names never change content, so they are sent
+with a year-long immutable Cache-Control and browsers do not ask again.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Extensions worth compressing; images and fonts already are
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml')
+
+# (Accept-Encoding token, file suffix), best first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# ManifestStaticFilesStorage inserts the first 12 hex digits of the MD5
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+WHITESPACE = ' \t\r\n\f\v'
+
+# Characters after which a / in JavaScript starts a regular expression
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = re.compile(r'(?:^|[^\w$])(?:return|typeof|case|do|else|in|of|void|delete|throw|new|instanceof)$')
+
+
+def _is_word(char):
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+
+def _skip_string(source, start):
+    """Index just past the string literal that starts at ``start``"""
+    quote = source[start]
+    index = start + 1
+    while index < len(source):
+        if source[index] == '\\':
+            index += 2
+            continue
+        if source[index] == quote:
+            return index + 1
+        index += 1
+    raise ValueError(f'Unterminated string at offset {start}')
+
+
+def _skip_regex(source, start):
+    """Index just past the regular expression literal that starts at ``start``"""
+    index = start + 1
+    in_class = False
+    while index < len(source):
+        char = source[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '\n':
+            break
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            return index + 1
+        index += 1
+    raise ValueError(f'Unterminated regular expression at offset {start}')
+
+
+def minify_js(source):
+    """Drop comments and collapse whitespace, keeping strings, template
+    literals and regular expressions as written
+
+    Line breaks are kept (one per run) so automatic semicolon insertion
+    reads the code the same way.
+    """
+    output = []
+    pending = ''
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char in WHITESPACE:
+            pending = '\n' if char == '\n' or pending == '\n' else ' '
+            index += 1
+            continue
+        if source.startswith('//', index):
+            end = source.find('\n', index)
+            index = len(source) if end == -1 else end
+            continue
+        if source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            if end == -1:
+                raise ValueError(f'Unterminated comment at offset {index}')
+            pending = '\n' if '\n' in source[index:end] or pending == '\n' else ' '
+            index = end + 2
+            continue
+
+        previous = output[-1][-1] if output else ''
+        if pending and previous:
+            if pending == '\n':
+                output.append('\n')
+            elif (_is_word(previous) and _is_word(char)) or (previous in '+-' and char == previous):
+                output.append(' ')
+        pending = ''
+
+        if char in '\'"`':
+            end = _skip_string(source, index)
+        elif char == '/' and (
+            not previous or previous in JS_REGEX_PRECEDERS
+            or JS_REGEX_KEYWORDS.search(''.join(output[-12:]))
+        ):
+            end = _skip_regex(source, index)
+        else:
+            end = index + 1
+        output.append(source[index:end])
+        index = end
+    return ''.join(output).strip() + '\n'
+
+
+def minify_css(source):
+    """Drop comments and whitespace that does not separate tokens, keeping strings as written"""
+    output = []
+    pending = False
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char in WHITESPACE:
+            pending = True
+            index += 1
+            continue
+        if source.startswith('/*', index):
+            end = source.find('*/', index + 2)
+            if end == -1:
+                raise ValueError(f'Unterminated comment at offset {index}')
+            pending = True
+            index = end + 2
+            continue
+
+        previous = output[-1][-1] if output else ''
+        if char == '}' and output and output[-1] == ';':
+            output.pop()
+        elif pending and previous and previous not in '{};,>:' and char not in '{};,>!':
+            output.append(' ')
+        pending = False
+
+        end = _skip_string(source, index) if char in '\'"' else index + 1
+        output.append(source[index:end])
+        index = end
+    return ''.join(output) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _minifier(name):
+    if '.min.' in os.path.basename(name):
+        return None
+    return MINIFIERS.get(os.path.splitext(name)[1])
+
+
+class PrecompressedManifestStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        self.compressed = []
+        if not dry_run:
+            # Hash the minified copies in STATIC_ROOT rather than the sources
+            paths = {name: (self, name) if self.minify(name) else found for name, found in paths.items()}
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            for name in set(self.hashed_files.values()):
+                self.compress(name)
+
+    def minify(self, name):
+        """Replace the collected copy of a CSS or JavaScript file with a minified one
+
+        Returns False for other files. A copy left from an earlier run is
+        already minified and is kept as it is.
+        """
+        minifier = _minifier(name)
+        if minifier is None:
+            return False
+        with self.open(name) as original:
+            source = original.read().decode()
+        minified = minifier(source)
+        if len(minified) < len(source):
+            self.delete(name)
+            self._save(name, ContentFile(minified.encode()))
+        return True
+
+    def compress(self, name):
+        """Write name.gz and name.br if they are smaller than the file itself"""
+        if not name.endswith(COMPRESSED_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        for suffix, compressed in variants.items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            if len(compressed) < len(content):
+                self._save(name + suffix, ContentFile(compressed))
+                self.compressed.append(name + suffix)
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        token, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def serve_static(request, path):
+    """A file from STATIC_ROOT, precompressed if the client accepts it"""
+    fullpath = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404('Static file not found')
+
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    served, encoding = fullpath, None
+    if path.endswith(COMPRESSED_EXTENSIONS):
+        for token, suffix in ENCODINGS:
+            if token in accepted and os.path.isfile(fullpath + suffix):
+                served, encoding = fullpath + suffix, token
+                break
+
+    response = FileResponse(open(served, 'rb'), content_type=content_type)
+    # FileResponse names the file in Content-Disposition; a stylesheet needs no name
+    del response['Content-Disposition']
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if HASHED_NAME.search(path):
+        response['Cache-Control'] = IMMUTABLE
+    else:
+        response['Cache-Control'] = 'public, max-age=60'
+    if path.endswith(COMPRESSED_EXTENSIONS):
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,296 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Cast, Floor, Least, TruncMonth
+
+from .caching import invalidate_student_lists
+from .models import Student, StudentStats
+
+# Fields that decide which StudentStats bucket a student is counted in
+BUCKET_FIELDS = ('department', 'year', 'gender', 'is_active')
+STATS_FIELDS = (*BUCKET_FIELDS, 'cgpa')
+
+# Bins of the dashboard's CGPA histogram; a CGPA of 4.00 counts in the last
+CGPA_BIN_WIDTH = Decimal('0.5')
+CGPA_BINS = 8
+
+
+@dataclass
+class DashboardStats:
+    """Aggregated counts shown on the dashboard"""
+    total_students: int = 0
+    average_cgpa: Decimal = None
+    department_stats: dict = field(default_factory=dict)
+    year_stats: dict = field(default_factory=dict)
+    gender_stats: dict = field(default_factory=dict)
+
+
+def _count_key(prefix, code):
+    return f'{prefix}_{code}'
+
+
+def _breakdown(row, prefix, choices):
+    """Map display names to non-zero counts, keeping the choice order"""
+    stats = {}
+    for code, name in choices:
+        count = row[_count_key(prefix, code)]
+        if count > 0:
+            stats[name] = count
+    return stats
+
+
+def aggregate_dashboard_stats(queryset=None):
+    """Compute every dashboard breakdown from Student rows in a single aggregate query"""
+    if queryset is None:
+        queryset = Student.objects.filter(is_active=True)
+
+    aggregates = {
+        'total': Count('pk'),
+        'average_cgpa': Avg('cgpa', filter=Q(cgpa__gt=0)),
+    }
+    for code, _ in Student.DEPARTMENT_CHOICES:
+        aggregates[_count_key('department', code)] = Count('pk', filter=Q(department=code))
+    for code, _ in Student.YEAR_CHOICES:
+        aggregates[_count_key('year', code)] = Count('pk', filter=Q(year=code))
+    for code, _ in Student.GENDER_CHOICES:
+        aggregates[_count_key('gender', code)] = Count('pk', filter=Q(gender=code))
+
+    row = queryset.order_by().aggregate(**aggregates)
+
+    average_cgpa = row['average_cgpa']
+    if average_cgpa is not None:
+        average_cgpa = Decimal(average_cgpa).quantize(Decimal('0.01'))
+
+    return DashboardStats(
+        total_students=row['total'],
+        average_cgpa=average_cgpa,
+        department_stats=_breakdown(row, 'department', Student.DEPARTMENT_CHOICES),
+        year_stats=_breakdown(row, 'year', Student.YEAR_CHOICES),
+        gender_stats=_breakdown(row, 'gender', Student.GENDER_CHOICES),
+    )
+
+
+def _stats_buckets():
+    return StudentStats.objects.filter(is_active=True, count__gt=0).values_list(
+        'department', 'year', 'gender', 'count', 'graded_count', 'cgpa_total'
+    )
+
+
+def _stats_from_buckets(buckets):
+    stats = DashboardStats()
+    department_counts = {}
+    year_counts = {}
+    gender_counts = {}
+    graded_count = 0
+    cgpa_total = Decimal('0')
+
+    for department, year, gender, count, graded, total in buckets:
+        stats.total_students += count
+        department_counts[department] = department_counts.get(department, 0) + count
+        year_counts[year] = year_counts.get(year, 0) + count
+        gender_counts[gender] = gender_counts.get(gender, 0) + count
+        graded_count += graded
+        cgpa_total += total
+
+    if graded_count:
+        stats.average_cgpa = (cgpa_total / graded_count).quantize(Decimal('0.01'))
+    stats.department_stats = _counts_by_name(department_counts, Student.DEPARTMENT_CHOICES)
+    stats.year_stats = _counts_by_name(year_counts, Student.YEAR_CHOICES)
+    stats.gender_stats = _counts_by_name(gender_counts, Student.GENDER_CHOICES)
+    return stats
+
+
+def get_dashboard_stats():
+    """Read the dashboard breakdowns from the StudentStats counters
+
+    The counter table holds at most one row per department, year and
+    gender, so this costs the same however many students there are.
+    """
+    return _stats_from_buckets(_stats_buckets())
+
+
+async def aget_dashboard_stats():
+    """get_dashboard_stats() through the async ORM"""
+    return _stats_from_buckets([bucket async for bucket in _stats_buckets()])
+
+
+def latest_update():
+    """updated_at of the most recently written active student, read from
+    the end of student_active_updated_idx"""
+    return Student.objects.filter(is_active=True).order_by('-updated_at').values_list('updated_at', flat=True)
+
+
+def _active_buckets():
+    return StudentStats.objects.filter(is_active=True)
+
+
+def students_freshness():
+    """Latest updated_at and number of the active students
+
+    Neither reads the student rows: the first is one index entry and the
+    second is summed from the StudentStats counters. Writes through any
+    worker change one or the other, unlike the per-process cache versions.
+    """
+    total = _active_buckets().aggregate(total=Sum('count'))
+    return {'last_modified': latest_update().first(), 'count': total['total'] or 0}
+
+
+async def astudents_freshness():
+    """students_freshness() through the async ORM"""
+    total = await _active_buckets().aaggregate(total=Sum('count'))
+    return {'last_modified': await latest_update().afirst(), 'count': total['total'] or 0}
+
+
+def enrollment_by_month():
+    """Students created in each month, grouped and truncated by the database
+
+    Every student is counted, including those deactivated since.
+    """
+    return (
+        Student.objects.order_by()
+        .annotate(month=TruncMonth('created_at'))
+        .values('month')
+        .annotate(count=Count('pk'))
+        .order_by('month')
+    )
+
+
+def cgpa_histogram():
+    """Active students with a CGPA per CGPA_BIN_WIDTH wide bin, counted by the database"""
+    bin_number = Cast(Floor(F('cgpa') / CGPA_BIN_WIDTH), IntegerField())
+    return (
+        Student.objects.filter(is_active=True, cgpa__gt=0)
+        .order_by()
+        .annotate(bin=Least(bin_number, Value(CGPA_BINS - 1)))
+        .values('bin')
+        .annotate(count=Count('pk'))
+    )
+
+
+def _series(pairs):
+    return [{'label': label, 'count': count} for label, count in pairs]
+
+
+def build_chart_data():
+    """Every series the dashboard charts plot, ready for JsonResponse
+
+    The distributions come from the StudentStats counters; the enrollment
+    and CGPA series take one grouped query each.
+    """
+    stats = get_dashboard_stats()
+    months = [(row['month'].strftime('%Y-%m'), row['count']) for row in enrollment_by_month()]
+    bins = dict(cgpa_histogram().values_list('bin', 'count'))
+    return {
+        'department': _series(stats.department_stats.items()),
+        'year': _series(stats.year_stats.items()),
+        'gender': _series(stats.gender_stats.items()),
+        'enrollment': _series(months),
+        'cgpa': _series(
+            (f'{CGPA_BIN_WIDTH * number:.1f}-{CGPA_BIN_WIDTH * (number + 1):.1f}', bins.get(number, 0))
+            for number in range(CGPA_BINS)
+        ),
+    }
+
+
+def count_students(**filters):
+    """Students matching equality ``filters`` on BUCKET_FIELDS, read from the counters"""
+    return StudentStats.objects.filter(**filters).aggregate(total=Sum('count'))['total'] or 0
+
+
+def _counts_by_name(counts, choices):
+    return {name: counts[code] for code, name in choices if counts.get(code)}
+
+
+def _update_bucket(department, year, gender, is_active, count, graded_count, cgpa_total):
+    bucket = StudentStats.objects.filter(
+        department=department, year=year, gender=gender, is_active=is_active
+    )
+    changes = {
+        'count': F('count') + count,
+        'graded_count': F('graded_count') + graded_count,
+        'cgpa_total': F('cgpa_total') + cgpa_total,
+    }
+    with transaction.atomic():
+        if not bucket.update(**changes):
+            StudentStats.objects.get_or_create(
+                department=department, year=year, gender=gender, is_active=is_active
+            )
+            bucket.update(**changes)
+
+
+def apply_stats_delta(department, year, gender, is_active, cgpa, sign=1):
+    """Add (sign=1) or remove (sign=-1) one student from its StudentStats bucket"""
+    cgpa = Decimal(str(cgpa or 0))
+    graded = 1 if cgpa > 0 else 0
+    _update_bucket(department, year, gender, is_active, sign, sign * graded, sign * cgpa * graded)
+
+
+def apply_bulk_stats_delta(students, sign=1):
+    """Add or remove many students at once, with one UPDATE per bucket touched
+
+    Used after bulk_create, bulk_update and queryset updates, which do not
+    send the post_save signals that keep StudentStats current for single
+    saves. ``students`` only need the STATS_FIELDS attributes.
+    """
+    buckets = {}
+    for student in students:
+        key = (student.department, int(student.year), student.gender, student.is_active)
+        count, graded, total = buckets.get(key, (0, 0, Decimal('0')))
+        cgpa = Decimal(str(student.cgpa or 0))
+        if cgpa > 0:
+            graded += 1
+            total += cgpa
+        buckets[key] = (count + 1, graded, total)
+    for key, (count, graded, total) in buckets.items():
+        _update_bucket(*key, sign * count, sign * graded, sign * total)
+
+
+def bucket_totals(queryset, *extra_fields):
+    """Per-bucket count, graded count and CGPA total of ``queryset``, in one GROUP BY query
+
+    ``extra_fields`` split the buckets further, for callers that move rows
+    between buckets depending on another column.
+    """
+    return (
+        queryset.order_by()
+        .values(*BUCKET_FIELDS, *extra_fields)
+        .annotate(
+            count=Count('pk'),
+            graded_count=Count('pk', filter=Q(cgpa__gt=0)),
+            cgpa_total=Sum('cgpa', filter=Q(cgpa__gt=0)),
+        )
+    )
+
+
+def apply_bucket_delta(rows, sign=1):
+    """Add or remove bucket_totals() rows, e.g. before and after a queryset update"""
+    for row in rows:
+        _update_bucket(
+            *(row[name] for name in BUCKET_FIELDS),
+            sign * row['count'],
+            sign * row['graded_count'],
+            sign * (row['cgpa_total'] or 0),
+        )
+
+
+def rebuild_student_stats():
+    """Recompute every StudentStats bucket from the Student table"""
+    buckets = [
+        StudentStats(
+            department=row['department'],
+            year=row['year'],
+            gender=row['gender'],
+            is_active=row['is_active'],
+            count=row['count'],
+            graded_count=row['graded_count'],
+            cgpa_total=row['cgpa_total'] or 0,
+        )
+        for row in bucket_totals(Student.objects.all())
+    ]
+    with transaction.atomic():
+        StudentStats.objects.all().delete()
+        StudentStats.objects.bulk_create(buckets)
+        invalidate_student_lists()
+    return len(buckets)
@@ -0,0 +1,76 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+
+from .caching import invalidate_student_lists
+from .models import Student
+from .stats import apply_bulk_stats_delta
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kabir', 'Kavya', 'Meera', 'Nikhil',
+    'Priya', 'Rahul', 'Riya', 'Rohan', 'Saanvi', 'Sahil', 'Sneha', 'Tanvi', 'Varun', 'Zara',
+]
+LAST_NAMES = [
+    'Agarwal', 'Bhat', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan', 'Kumar',
+    'Mehta', 'Menon', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma',
+]
+CITIES = [
+    ('Mumbai', 'Maharashtra'), ('Pune', 'Maharashtra'), ('Delhi', 'Delhi'),
+    ('Bengaluru', 'Karnataka'), ('Chennai', 'Tamil Nadu'), ('Hyderabad', 'Telangana'),
+    ('Kolkata', 'West Bengal'), ('Ahmedabad', 'Gujarat'), ('Jaipur', 'Rajasthan'),
+    ('Lucknow', 'Uttar Pradesh'),
+]
+
+
+def generate_students(count, seed=0, start=0):
+    """Yield ``count`` unsaved, deterministic Student rows numbered from ``start``"""
+    rng = random.Random(f'{seed}:{start}')
+    departments = [code for code, _ in Student.DEPARTMENT_CHOICES]
+    genders = [code for code, _ in Student.GENDER_CHOICES]
+    today = date.today()
+
+    for number in range(start, start + count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        city, state = rng.choice(CITIES)
+        year = rng.randint(1, 4)
+        yield Student(
+            student_id=f'S{number:08d}',
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{first_name.lower()}.{last_name.lower()}.{number}@example.edu',
+            phone=f'9{rng.randint(100000000, 999999999)}',
+            date_of_birth=today - timedelta(days=rng.randint(17 * 365, 26 * 365)),
+            gender=rng.choice(genders),
+            department=rng.choice(departments),
+            year=year,
+            semester=year * 2 - rng.randint(0, 1),
+            cgpa=Decimal(rng.randint(0, 400)) / 100,
+            address=f'{rng.randint(1, 999)}, {rng.choice(LAST_NAMES)} Nagar',
+            city=city,
+            state=state,
+            postal_code=f'{rng.randint(110000, 859999)}',
+            emergency_contact=f'9{rng.randint(100000000, 999999999)}',
+            emergency_contact_name=f'{rng.choice(FIRST_NAMES)} {last_name}',
+            is_active=rng.random() > 0.05,
+        )
+
+
+def seed_students(count, seed=0, start=None, batch_size=5000):
+    """Insert ``count`` generated students with one bulk_create per ``batch_size`` rows
+
+    Numbering continues after the existing rows unless ``start`` is
+    given. The StudentStats counters are updated batch by batch.
+    """
+    if start is None:
+        start = Student.objects.count()
+    rows = generate_students(count, seed=seed, start=start)
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            Student.objects.bulk_create(batch)
+            apply_bulk_stats_delta(batch)
+        invalidate_student_lists()
+    return count
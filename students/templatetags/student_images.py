@@ -0,0 +1,35 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..images import has_current_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def student_photo(student, size, css_class='', lazy=True):
+    """<img> of a student's profile picture, displayed ``size`` CSS pixels square
+
+    Once the thumbnails exist the browser picks one for the screen's pixel
+    density from srcset; before that the upload itself is shown.
+    """
+    picture = student.profile_picture
+    attrs = {
+        'src': picture.url,
+        'alt': student.full_name,
+        'width': size,
+        'height': size,
+        'class': css_class,
+        'style': 'object-fit: cover;',
+        'decoding': 'async',
+    }
+    if lazy:
+        attrs['loading'] = 'lazy'
+    if has_current_variants(student):
+        widths = sorted((int(width), name) for width, name in student.picture_variants['widths'].items())
+        url = picture.storage.url
+        attrs['src'] = url(next((name for width, name in widths if width >= size), widths[-1][1]))
+        attrs['srcset'] = ', '.join(f'{url(name)} {width}w' for width, name in widths)
+        attrs['sizes'] = f'{size}px'
+    return format_html('<img{}>', flatatt(attrs))
@@ -1,3 +1,1572 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import contextvars
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max, Min
+from django.http import Http404, HttpResponse
+from django.template import Context, Template
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import async_views
+from .admin import ChangeListQuerySet, StudentAdmin
+from .caching import cache_counters
+from .bulk import promote_students, reactivate_students
+from .forms import StudentForm, StudentImportForm
+from .images import IMAGE_FORMAT, VARIANT_WIDTHS, process_profile_picture
+from .imports import import_students
+from .instrumentation import RequestMetrics, metrics_snapshot, reset_metrics
+from .jobs import claim_next_job, run_export_job
+from .management.commands.explain_student_queries import is_full_scan, view_querysets
+from .models import ExportJob, Student, StudentStats
+from .pagination import CursorPaginator
+from .routers import PIN_COOKIE, ReplicaPinningMiddleware, StudentReplicaRouter, use_primary
+from .staticfiles import IMMUTABLE, minify_css, minify_js
+from .search import (
+    RANKED_ORDERING, IcontainsSearchBackend, SQLiteFTSSearchBackend, get_search_backend, search_students,
+)
+from .stats import aggregate_dashboard_stats, get_dashboard_stats
+from .synthetic import seed_students
+
+
+def make_student(index, **overrides):
+    data = {
+        'student_id': f'STU{index:05d}',
+        'first_name': f'First{index}',
+        'last_name': f'Last{index}',
+        'email': f'student{index}@example.com',
+        'phone': '9876543210',
+        'date_of_birth': date(2003, 1, 1),
+        'gender': 'M',
+        'department': 'CS',
+        'year': 1,
+        'semester': 1,
+        'cgpa': Decimal('3.00'),
+        'address': '1 College Road',
+        'city': 'Pune',
+        'state': 'Maharashtra',
+        'postal_code': '411001',
+        'emergency_contact': '9876543211',
+        'emergency_contact_name': 'Parent',
+    }
+    data.update(overrides)
+    return Student.objects.create(**data)
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        make_student(1, department='CS', year=1, gender='M', cgpa=Decimal('3.50'))
+        make_student(2, department='CS', year=2, gender='F', cgpa=Decimal('2.50'))
+        make_student(3, department='EE', year=2, gender='F', cgpa=Decimal('0.00'))
+        make_student(4, department='ME', year=4, gender='O', is_active=False)
+
+    def test_breakdowns_only_count_active_students(self):
+        stats = get_dashboard_stats()
+
+        self.assertEqual(stats.total_students, 3)
+        self.assertEqual(stats.department_stats, {
+            'Computer Science': 2,
+            'Electrical Engineering': 1,
+        })
+        self.assertEqual(stats.year_stats, {'First Year': 1, 'Second Year': 2})
+        self.assertEqual(stats.gender_stats, {'Male': 1, 'Female': 2})
+        self.assertEqual(stats.average_cgpa, Decimal('3.00'))
+
+    def test_stats_use_a_single_query(self):
+        with self.assertNumQueries(1):
+            get_dashboard_stats()
+
+    def test_dashboard_query_count_is_bounded(self):
+        for index in range(10, 40):
+            make_student(index, department=Student.DEPARTMENT_CHOICES[index % 12][0])
+
+        # The two validator queries, one StudentStats query plus the recent
+        # and top student lists
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('students:dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_students'], 33)
+
+    def test_chart_data_is_grouped_by_the_database_and_cached(self):
+        cache.clear()
+        url = reverse('students:chart_data')
+        # One StudentStats query, then the enrollment and CGPA groupings
+        with self.assertNumQueries(3):
+            data = self.client.get(url).json()
+        self.assertEqual(data['department'], [
+            {'label': 'Computer Science', 'count': 2},
+            {'label': 'Electrical Engineering', 'count': 1},
+        ])
+        self.assertEqual(data['gender'], [{'label': 'Male', 'count': 1}, {'label': 'Female', 'count': 2}])
+        month = timezone.now().strftime('%Y-%m')
+        self.assertEqual(data['enrollment'], [{'label': month, 'count': 4}])
+        self.assertEqual(len(data['cgpa']), 8)
+        self.assertEqual(data['cgpa'][5], {'label': '2.5-3.0', 'count': 1})
+        self.assertEqual(data['cgpa'][7], {'label': '3.5-4.0', 'count': 1})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), data)
+
+        make_student(5, cgpa=Decimal('4.00'))
+        data = self.client.get(url).json()
+        self.assertEqual(data['enrollment'], [{'label': month, 'count': 5}])
+        self.assertEqual(data['cgpa'][7], {'label': '3.5-4.0', 'count': 2})
+
+
+class StudentStatsSignalTests(TestCase):
+    def setUp(self):
+        self.student = make_student(1, department='CS', year=1, gender='M', cgpa=Decimal('3.50'))
+        make_student(2, department='CS', year=1, gender='M', cgpa=Decimal('2.50'))
+
+    def bucket(self, department='CS', year=1, gender='M', is_active=True):
+        return StudentStats.objects.get(
+            department=department, year=year, gender=gender, is_active=is_active
+        )
+
+    def test_create_increments_bucket(self):
+        bucket = self.bucket()
+        self.assertEqual(bucket.count, 2)
+        self.assertEqual(bucket.graded_count, 2)
+        self.assertEqual(bucket.cgpa_total, Decimal('6.00'))
+
+    def test_soft_delete_view_moves_student_to_inactive_bucket(self):
+        self.client.post(reverse('students:student_delete', args=[self.student.pk]))
+        self.client.post(reverse('students:student_delete_ajax', args=[self.student.pk]))
+
+        self.assertEqual(self.bucket().count, 1)
+        self.assertEqual(self.bucket(is_active=False).count, 1)
+        self.assertEqual(get_dashboard_stats().total_students, 1)
+
+    def test_form_update_moves_student_between_buckets(self):
+        student = Student.objects.get(pk=self.student.pk)
+        data = {
+            name: getattr(student, name)
+            for name in StudentForm.Meta.fields if name != 'profile_picture'
+        }
+        data.update(department='EE', year=3)
+        form = StudentForm(data, instance=student)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.assertEqual(self.bucket().count, 1)
+        self.assertEqual(self.bucket(department='EE', year=3).count, 1)
+
+    def test_deferred_instance_save_uses_stored_values(self):
+        student = Student.objects.only('pk', 'is_active').get(pk=self.student.pk)
+        student.is_active = False
+        student.save()
+
+        self.assertEqual(self.bucket().count, 1)
+        self.assertEqual(self.bucket(is_active=False).cgpa_total, Decimal('3.50'))
+
+    def test_hard_delete_decrements_bucket(self):
+        Student.objects.get(pk=self.student.pk).delete()
+        self.assertEqual(self.bucket().count, 1)
+
+    def test_rebuild_command_matches_student_table(self):
+        StudentStats.objects.all().delete()
+        make_student(3, department='ME', year=4, gender='F', is_active=False)
+        StudentStats.objects.update(count=99)
+
+        call_command('rebuild_student_stats', stdout=StringIO())
+
+        self.assertEqual(get_dashboard_stats(), aggregate_dashboard_stats())
+        self.assertEqual(self.bucket(department='ME', year=4, gender='F', is_active=False).count, 1)
+
+
+class ChangeTrackingTests(TestCase):
+    def setUp(self):
+        self.student = Student.objects.get(pk=make_student(1).pk)
+
+    def form_data(self, student, **overrides):
+        data = {name: getattr(student, name) for name in StudentForm.Meta.fields if name != 'profile_picture'}
+        data.update(overrides)
+        return data
+
+    def test_save_updates_only_changed_columns(self):
+        self.student.city = 'Mumbai'
+        with CaptureQueriesContext(connection) as queries:
+            self.student.save()
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "students_student"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"city"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"address"', updates[0])
+        self.assertEqual(Student.objects.get(pk=self.student.pk).city, 'Mumbai')
+
+    def test_unchanged_save_writes_nothing(self):
+        self.student.city = 'Pune'
+        with self.assertNumQueries(0):
+            self.student.save()
+
+    def test_changes_are_compared_with_the_last_save(self):
+        self.student.cgpa = Decimal('3.90')
+        self.student.save()
+        self.assertEqual(self.student.changed_fields(), [])
+
+        self.student.picture_variants['widths'] = {'48': 'thumb.webp'}
+        self.assertEqual(self.student.changed_fields(), ['picture_variants'])
+
+    def test_deferred_field_assigned_without_loading_is_saved(self):
+        student = Student.objects.only('pk').get(pk=self.student.pk)
+        student.city = 'Nagpur'
+        self.assertEqual(student.changed_fields(), ['city'])
+        student.save()
+        self.assertEqual(Student.objects.get(pk=self.student.pk).city, 'Nagpur')
+
+    def test_unchanged_form_submission_writes_nothing(self):
+        form = StudentForm(self.form_data(self.student), instance=self.student)
+        self.assertTrue(form.is_valid(), form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            form.save()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_form_checks_both_unique_fields_in_one_query(self):
+        other = make_student(2)
+        data = self.form_data(self.student, student_id=other.student_id, email=other.email)
+        form = StudentForm(data, instance=self.student)
+        with self.assertNumQueries(1):
+            self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['student_id'], ['Student ID already exists.'])
+        self.assertEqual(form.errors['email'], ['Email already exists.'])
+
+        # is_valid() assigned the submitted values to the instance
+        student = Student.objects.get(pk=self.student.pk)
+        form = StudentForm(self.form_data(student, email=other.email), instance=student)
+        self.assertEqual(list(form.errors), ['email'])
+
+
+class StudentIndexTests(TestCase):
+    def test_view_queries_avoid_full_table_scans(self):
+        make_student(1)
+        out = StringIO()
+        call_command('explain_student_queries', stdout=out)
+        self.assertIn('No full table scans.', out.getvalue())
+
+    def test_list_page_is_read_in_index_order(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite query plan')
+        make_student(1)
+        plan = Student.objects.filter(is_active=True).for_list()[:10].explain()
+        self.assertIn('USING INDEX student_list_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_list_validators_are_read_from_an_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite query plan')
+        make_student(1)
+        querysets = view_querysets()
+        self.assertIn('COVERING INDEX student_active_updated_idx', querysets['student_list (freshness)'].explain())
+        self.assertIn('COVERING INDEX student_active_updated_idx', querysets['latest update'].explain())
+
+
+class ListProjectionTests(TestCase):
+    def test_loads_only_the_list_columns(self):
+        make_student(1, first_name='Priya', last_name='Sharma', date_of_birth=date(2000, 1, 1))
+        student = Student.objects.for_list().get()
+        self.assertIn('address', student.get_deferred_fields())
+        self.assertIn('first_name', student.get_deferred_fields())
+        expected_age = Student.objects.get().age
+        with self.assertNumQueries(0):
+            self.assertEqual(student.full_name, 'Priya Sharma')
+            self.assertEqual(student.age, expected_age)
+            student.get_department_display_name()
+            student.get_year_display_name()
+
+    def test_age_matches_the_python_calculation(self):
+        today = date.today()
+        # 2000 was a leap year, so today's month and day always exist
+        for index, birthday in enumerate([date(2000, today.month, today.day), date(2000, 1, 1), date(2000, 12, 31)]):
+            make_student(index, date_of_birth=birthday)
+        for student in Student.objects.for_list():
+            self.assertEqual(student.age, Student.objects.get(pk=student.pk).age)
+
+    def test_student_list_renders_from_the_projection(self):
+        make_student(1, first_name='Priya', last_name='Sharma')
+        response = self.client.get(reverse('students:student_list'))
+        student = response.context['page_obj'][0]
+        self.assertIn('address', student.get_deferred_fields())
+        self.assertContains(response, 'Priya Sharma')
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.priya = make_student(1, first_name='Priya', last_name='Sharma', email='priya@example.com')
+        self.rahul = make_student(2, first_name='Rahul', last_name='Sharma', email='rahul.sharma@example.com')
+        self.kavya = make_student(3, first_name='Kavya', last_name='Iyer', email='kavya@example.com')
+
+    def search(self, query):
+        return list(search_students(Student.objects.filter(is_active=True), query))
+
+    def test_sqlite_uses_fts_backend(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_matches_word_prefixes_across_columns(self):
+        self.assertEqual(self.search('shar'), [self.rahul, self.priya])
+        self.assertEqual(self.search('priya shar'), [self.priya])
+        self.assertEqual(self.search('STU00002'), [self.rahul])
+
+    def test_matches_substrings_of_ids_and_emails(self):
+        self.assertEqual(self.search('00002'), [self.rahul])
+        self.assertEqual(self.search('ul.shar'), [self.rahul])
+        self.assertCountEqual(self.search('example.com'), [self.priya, self.rahul, self.kavya])
+        # Terms too short for the trigram index are matched by icontains
+        self.assertEqual(SQLiteFTSSearchBackend().match_expression('Priya S'), '')
+        self.assertEqual(self.search('ya'), [self.priya, self.kavya])
+
+    def test_word_index_matches_word_prefixes(self):
+        backend = SQLiteFTSSearchBackend(trigram=False)
+        self.assertEqual(backend.match_expression('Priya sha'), '"priya"* "sha"*')
+
+    def test_index_follows_updates(self):
+        self.rahul.last_name = 'Verma'
+        self.rahul.email = 'rahul.verma@example.com'
+        self.rahul.save()
+        self.assertEqual(self.search('verma'), [self.rahul])
+        self.assertEqual(self.search('sharma'), [self.priya])
+
+    def test_fallback_backend_keeps_substring_matching(self):
+        with self.settings(STUDENT_SEARCH_BACKEND='students.search.IcontainsSearchBackend'):
+            self.assertIsInstance(get_search_backend(), IcontainsSearchBackend)
+            self.assertEqual(self.search('arm'), [self.priya, self.rahul])
+
+    def test_student_list_filters_by_search(self):
+        response = self.client.get(reverse('students:student_list'), {'search': 'kavya'})
+        self.assertEqual(response.context['total_students'], 1)
+
+    def test_live_search_fragment_is_one_query_without_the_layout(self):
+        get_search_backend()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('students:student_list'), {'search': 'shar', 'fragment': 'results'})
+        self.assertTemplateUsed(response, 'students/partials/student_list_results.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'Showing the first 2 matching students')
+        self.assertContains(response, 'Priya Sharma')
+        self.assertNotContains(response, 'Kavya')
+        self.assertNotContains(response, 'fragment=')
+
+    def test_cursor_pages_keep_the_ranking(self):
+        url = reverse('students:student_list')
+        response = self.client.get(url, {'search': 'shar', 'paginate': 'cursor'})
+        self.assertEqual([student.pk for student in response.context['page_obj']], [self.rahul.pk, self.priya.pk])
+
+        paginator = CursorPaginator(search_students(Student.objects.all(), 'shar'), 1, RANKED_ORDERING)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(list(first) + list(second), [self.rahul, self.priya])
+        self.assertIsNone(second.next_cursor)
+        self.assertEqual(list(paginator.get_page(second.previous_cursor)), list(first))
+
+        body = self.client.get(reverse('students:api_student_list'), {
+            'search': 'shar', 'fields': 'student_id', 'page_size': 1,
+        }).json()
+        self.assertEqual(body['results'], [{'student_id': 'STU00002'}])
+        body = self.client.get(body['next']).json()
+        self.assertEqual(body['results'], [{'student_id': 'STU00001'}])
+        self.assertIsNone(body['next'])
+
+    def test_live_search_fragment_keeps_the_ranking_of_the_full_page(self):
+        url = reverse('students:student_list')
+        full_page = self.client.get(url, {'search': 'shar'}).context['page_obj']
+        fragment = self.client.get(url, {'search': 'shar', 'fragment': 'results'}).context['page_obj']
+        self.assertEqual([student.pk for student in fragment], [student.pk for student in full_page])
+        self.assertEqual([student.pk for student in fragment], [self.rahul.pk, self.priya.pk])
+
+    def test_full_page_includes_the_results_fragment(self):
+        response = self.client.get(reverse('students:student_list'))
+        self.assertTemplateUsed(response, 'students/partials/student_list_results.html')
+        self.assertContains(response, 'id="studentListResults"')
+        self.assertContains(response, 'of 3 students')
+
+
+class StudentRangeFilterTests(TestCase):
+    def setUp(self):
+        self.url = reverse('students:student_list')
+
+    def listed(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(student.student_id for student in response.context['page_obj'])
+
+    def test_age_bounds_match_the_age_property(self):
+        today = date.today()
+        # Turning 18 today, turning 22 tomorrow, and 40
+        births = [
+            date(today.year - 18, today.month, 28 if (today.month, today.day) == (2, 29) else today.day),
+            date(today.year - 22, today.month, today.day) + timedelta(days=1),
+            date(today.year - 40, 1, 1),
+        ]
+        for index, born in enumerate(births, start=1):
+            make_student(index, date_of_birth=born)
+        for minimum, maximum in [(18, 21), (19, 22), (None, 30), (22, None)]:
+            expected = {
+                student.pk for student in Student.objects.all()
+                if (minimum is None or student.age >= minimum) and (maximum is None or student.age <= maximum)
+            }
+            aged = Student.objects.aged(minimum, maximum)
+            self.assertEqual(set(aged.values_list('pk', flat=True)), expected, (minimum, maximum))
+
+    def test_list_combines_range_and_city_filters(self):
+        make_student(1, cgpa=Decimal('3.60'), semester=5, city='Pune')
+        make_student(2, cgpa=Decimal('3.20'), semester=6, city='Pune')
+        make_student(3, cgpa=Decimal('3.80'), semester=3, city='Pune')
+        make_student(4, cgpa=Decimal('3.90'), semester=7, city='Mumbai')
+        make_student(5, cgpa=Decimal('3.70'), semester=8, city='Pune', is_active=False)
+
+        self.assertEqual(self.listed(min_cgpa='3.5'), ['STU00001', 'STU00003', 'STU00004'])
+        self.assertEqual(self.listed(min_semester='5', max_semester='6'), ['STU00001', 'STU00002'])
+        self.assertEqual(self.listed(city=' pUNE '), ['STU00001', 'STU00002', 'STU00003'])
+        self.assertEqual(self.listed(min_cgpa='3.5', min_semester='5', city='pune'), ['STU00001'])
+
+    def test_inverted_range_is_reported_and_ignored(self):
+        make_student(1, cgpa=Decimal('3.60'))
+        make_student(2, cgpa=Decimal('2.00'))
+        response = self.client.get(self.url, {'min_cgpa': '3.5', 'max_cgpa': '3.0'})
+        self.assertContains(response, 'Maximum cgpa must not be below the minimum.')
+        self.assertEqual(len(response.context['page_obj']), 2)
+
+    def test_range_filters_are_read_from_indexes(self):
+        make_student(1)
+        queryset = Student.objects.filter(is_active=True).aged(18, 21).in_city('Pune').filter(
+            cgpa__gte=3.5, semester__gte=5,
+        )
+        self.assertFalse(is_full_scan(queryset.explain(), connection.vendor))
+
+    def test_export_job_keeps_the_range_filters(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        make_student(1, cgpa=Decimal('3.60'))
+        make_student(2, cgpa=Decimal('2.00'))
+        response = self.client.post(reverse('students:export_job_create'), {'format': 'csv', 'min_cgpa': '3.5'})
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.options['min_cgpa'], '3.5')
+        run_export_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.total_rows, 1)
+
+
+class StudentSortTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for index in range(1, 26):
+            make_student(index, cgpa=Decimal(index % 4), first_name=f'Name{26 - index:02d}')
+        self.list_url = reverse('students:student_list')
+
+    def walk(self, params, backwards=False):
+        pages = []
+        response = self.client.get(self.list_url, {**params, 'paginate': 'cursor'})
+        while True:
+            page = response.context['page_obj']
+            pages.append([student.student_id for student in page])
+            self.assertLessEqual(len(pages), Student.objects.count(), 'The cursors do not advance')
+            if not page.has_next():
+                break
+            response = self.client.get(self.list_url, {**params, 'cursor': page.next_cursor})
+        if backwards:
+            # Come back from the last page through the previous cursors
+            pages = [pages[-1]]
+            while page.has_previous():
+                response = self.client.get(self.list_url, {**params, 'cursor': page.previous_cursor})
+                page = response.context['page_obj']
+                pages.insert(0, [student.student_id for student in page])
+                self.assertLessEqual(len(pages), Student.objects.count(), 'The cursors do not advance')
+        return [student_id for page in pages for student_id in page]
+
+    def pages(self, params):
+        ids = []
+        for number in (1, 2, 3):
+            response = self.client.get(self.list_url, {**params, 'page': number})
+            ids.extend(student.student_id for student in response.context['page_obj'])
+        return ids
+
+    def test_sorts_with_student_id_tie_breaker(self):
+        by_cgpa = list(Student.objects.order_by('cgpa', 'student_id').values_list('student_id', flat=True))
+        self.assertEqual(self.pages({'sort': 'cgpa'}), by_cgpa)
+        self.assertEqual(self.walk({'sort': 'cgpa'}), by_cgpa)
+        self.assertEqual(self.pages({'sort': 'cgpa', 'order': 'desc'}), by_cgpa[::-1])
+        self.assertEqual(self.walk({'sort': 'cgpa', 'order': 'desc'}), by_cgpa[::-1])
+
+    def test_sorts_by_name(self):
+        by_name = list(Student.objects.order_by('-student_id').values_list('student_id', flat=True))
+        self.assertEqual(self.walk({'sort': 'name'}), by_name)
+
+    def test_created_at_pages_hold_every_student_once(self):
+        # Rows a few microseconds apart share the millisecond
+        created = datetime(2025, 1, 1, 10, tzinfo=dt_timezone.utc)
+        for index, student in enumerate(Student.objects.order_by('pk')):
+            Student.objects.filter(pk=student.pk).update(created_at=created + timedelta(microseconds=index % 7))
+        by_created = list(Student.objects.order_by('created_at', 'student_id').values_list('student_id', flat=True))
+        for backwards in (False, True):
+            self.assertEqual(self.walk({'sort': 'created_at'}, backwards), by_created)
+            self.assertEqual(self.walk({'sort': 'created_at', 'order': 'desc'}, backwards), by_created[::-1])
+
+    def test_marks_the_sorted_column(self):
+        response = self.client.get(self.list_url, {'sort': 'cgpa', 'order': 'desc'})
+        self.assertContains(response, '<th data-sort="cgpa" data-order="desc" class="sort-desc">CGPA</th>', html=True)
+        self.assertContains(response, '<input type="hidden" name="sort" value="cgpa" id="id_sort">', html=True)
+
+    def test_unknown_sort_key_is_rejected(self):
+        response = self.client.get(self.list_url, {'sort': 'address'})
+        self.assertEqual(response.context['page_obj'][0].student_id, 'STU00001')
+        self.assertTrue(response.context['search_form'].errors)
+
+    def test_api_pages_in_sort_order(self):
+        by_cgpa = list(Student.objects.order_by('-cgpa', '-student_id').values_list('student_id', flat=True))
+        response = self.client.get(reverse('students:api_student_list'), {'sort': 'cgpa', 'order': 'desc', 'fields': 'student_id'})
+        self.assertEqual([row['student_id'] for row in response.json()['results']], by_cgpa[:len(response.json()['results'])])
+
+    def test_sort_keys_are_read_in_index_order(self):
+        out = StringIO()
+        call_command('explain_student_queries', stdout=out)
+        self.assertIn('No sorts outside an index.', out.getvalue())
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for index in range(1, 26):
+            make_student(index, cgpa=Decimal(index % 4))
+
+    def walk(self, paginator):
+        seen = []
+        page = paginator.get_page()
+        seen.extend(page)
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            seen.extend(page)
+        return seen
+
+    def test_walks_every_row_once_in_order(self):
+        queryset = Student.objects.filter(is_active=True)
+        self.assertEqual(self.walk(CursorPaginator(queryset, 10)), list(queryset))
+
+    def test_non_unique_ordering_gets_pk_tie_breaker(self):
+        queryset = Student.objects.all()
+        paginator = CursorPaginator(queryset, 4, ordering=['-cgpa'])
+        self.assertEqual(paginator.ordering, ['-cgpa', 'pk'])
+        self.assertEqual(self.walk(paginator), list(queryset.order_by('-cgpa', 'pk')))
+
+    def test_previous_cursor_returns_preceding_page(self):
+        paginator = CursorPaginator(Student.objects.all(), 10)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(list(paginator.get_page(second.previous_cursor)), list(first))
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(Student.objects.all(), 10)
+        self.assertEqual(list(paginator.get_page('not-a-cursor')), list(paginator.get_page()))
+
+    def test_deep_pages_cost_one_query(self):
+        paginator = CursorPaginator(Student.objects.all(), 5)
+        page = paginator.get_page(paginator.get_page().next_cursor)
+        with self.assertNumQueries(1):
+            paginator.get_page(page.next_cursor)
+
+    def test_student_list_cursor_mode(self):
+        url = reverse('students:student_list')
+        response = self.client.get(url, {'paginate': 'cursor'})
+        self.assertTrue(response.context['cursor_pagination'])
+        self.assertEqual(response.context['total_students'], 25)
+        next_cursor = response.context['page_obj'].next_cursor
+
+        # The total is served from the cache on later pages, leaving the
+        # page and the two validator queries
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'cursor': next_cursor})
+        self.assertEqual(response.context['page_obj'][0].student_id, 'STU00011')
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        make_student(1, department='CS', first_name='Priya')
+        make_student(2, department='EE', first_name='Rahul')
+        make_student(3, department='CS', first_name='Kavya', is_active=False)
+        self.url = reverse('students:export_download')
+
+    def test_csv_streams_selected_groups_and_filters(self):
+        response = self.client.post(self.url, {
+            'format': 'csv', 'fields': ['basic'], 'department': 'CS', 'status': 'all',
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ['Student ID', 'First Name', 'Last Name'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Priya', 'Kavya'])
+        self.assertEqual(len(rows[0]), 7)
+
+    def test_get_uses_list_filters_and_active_default(self):
+        response = self.client.get(self.url, {'search': 'rahul', 'fields': ['academic']})
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows, [['Department', 'Year', 'Semester', 'CGPA'],
+                                ['Electrical Engineering', 'First Year', '1', '3.00']])
+
+    def test_excel_export_is_a_valid_workbook(self):
+        response = self.client.post(self.url, {'format': 'excel', 'fields': ['basic', 'system']})
+        self.assertTrue(response['Content-Disposition'].endswith('.xlsx"'))
+        workbook = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('Priya', sheet)
+        self.assertIn('Active', sheet)
+
+    def test_export_only_fetches_selected_columns(self):
+        response = self.client.post(self.url, {'format': 'csv', 'fields': ['emergency']})
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(response.streaming_content)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"address"', queries[0]['sql'])
+
+    async def test_asgi_streams_chunks_as_they_are_produced(self):
+        response = await self.async_client.post(self.url, {'format': 'csv', 'fields': ['basic'], 'status': 'all'})
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        rows = list(csv.reader(StringIO(b''.join(chunks).decode())))
+        self.assertEqual([row[1] for row in rows[1:]], ['Priya', 'Rahul', 'Kavya'])
+
+    def test_invalid_options_are_rejected(self):
+        response = self.client.post(self.url, {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        for index in range(1, 6):
+            make_student(index, department='CS' if index % 2 else 'EE')
+
+    def create_job(self, **data):
+        data.setdefault('format', 'csv')
+        response = self.client.post(reverse('students:export_job_create'), data)
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_job_is_queued_until_a_worker_runs_it(self):
+        payload = self.create_job(department='CS')
+        self.assertEqual(payload['status'], 'pending')
+        self.assertEqual(self.client.get(payload['status_url']).json()['progress'], 0)
+
+        job_id = claim_next_job()
+        self.assertIsNone(claim_next_job())
+        run_export_job(job_id)
+
+        status = self.client.get(payload['status_url']).json()
+        self.assertEqual(status['status'], 'completed')
+        self.assertEqual(status['progress'], 100)
+        self.assertEqual((status['total_rows'], status['processed_rows']), (3, 3))
+
+        response = self.client.get(status['download_url'])
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 4)
+
+    def test_worker_command_runs_pending_jobs_inline(self):
+        self.create_job(format='excel', fields=['basic', 'address'])
+        self.create_job()
+        out = StringIO()
+        call_command('run_export_worker', processes=0, once=True, stdout=out)
+
+        self.assertEqual(out.getvalue().count('completed'), 2)
+        self.assertFalse(ExportJob.objects.exclude(status=ExportJob.STATUS_COMPLETED).exists())
+
+    def test_stale_running_job_is_requeued(self):
+        payload = self.create_job()
+        job_id = claim_next_job()
+        with self.settings(STUDENT_EXPORT_JOB_TIMEOUT=60):
+            self.assertIsNone(claim_next_job())
+            ExportJob.objects.filter(pk=job_id).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+            self.assertEqual(claim_next_job(), job_id)
+        self.assertEqual(ExportJob.objects.get(pk=job_id).attempts, 2)
+        run_export_job(job_id)
+        self.assertEqual(self.client.get(payload['status_url']).json()['status'], 'completed')
+
+    def test_job_is_failed_after_its_last_attempt(self):
+        payload = self.create_job()
+        job_id = claim_next_job()
+        ExportJob.objects.filter(pk=job_id).update(attempts=3, heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertIsNone(claim_next_job())
+        status = self.client.get(payload['status_url']).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('stopped responding', status['error'])
+
+    async def test_asgi_download_is_streamed(self):
+        payload = await sync_to_async(self.create_job)()
+        await sync_to_async(run_export_job)(await sync_to_async(claim_next_job)())
+        response = await self.async_client.get(reverse('students:export_job_download', args=[payload['token']]))
+        self.assertTrue(response.is_async)
+        rows = list(csv.reader(StringIO(b''.join([chunk async for chunk in response.streaming_content]).decode())))
+        self.assertEqual(len(rows), 6)
+
+    def test_download_requires_a_finished_job(self):
+        payload = self.create_job()
+        response = self.client.get(reverse('students:export_job_download', args=[payload['token']]))
+        self.assertEqual(response.status_code, 404)
+
+
+IMPORT_HEADER = (
+    'student_id,first_name,last_name,email,phone,date_of_birth,gender,department,year,'
+    'semester,cgpa,address,city,state,postal_code,emergency_contact,emergency_contact_name\n'
+)
+
+
+def import_row(index, **overrides):
+    values = {
+        'student_id': f'IMP{index:05d}',
+        'email': f'import{index}@example.com',
+        'gender': 'F',
+        'department': 'EE',
+        'year': '2',
+        'cgpa': '3.50',
+        'date_of_birth': '2003-01-01',
+    }
+    values.update(overrides)
+    return (
+        f"{values['student_id']},First{index},Last{index},{values['email']},9876543210,"
+        f"{values['date_of_birth']},{values['gender']},{values['department']},{values['year']},"
+        f"3,{values['cgpa']},1 College Road,Pune,Maharashtra,411001,9876543211,Parent\n"
+    )
+
+
+class StudentImportTests(TestCase):
+    def test_valid_rows_are_created_and_counted(self):
+        csv_file = StringIO(IMPORT_HEADER + ''.join(import_row(index) for index in range(1, 6)))
+        result = import_students(csv_file, batch_size=2)
+
+        self.assertEqual((result.rows, result.created, result.failed), (5, 5, 0))
+        self.assertEqual(Student.objects.filter(department='EE', year=2).count(), 5)
+        stats = get_dashboard_stats()
+        self.assertEqual(stats.total_students, 5)
+        self.assertEqual(stats.average_cgpa, Decimal('3.50'))
+
+    def test_invalid_and_duplicate_rows_are_reported(self):
+        make_student(1, email='taken@example.com')
+        csv_file = StringIO(IMPORT_HEADER + ''.join([
+            import_row(1),
+            import_row(2, email='taken@example.com'),
+            import_row(3, student_id='STU00001'),
+            import_row(4, cgpa='5.00'),
+            import_row(5, email='import1@example.com'),
+        ]))
+        result = import_students(csv_file)
+
+        self.assertEqual((result.created, result.failed), (1, 4))
+        errors = dict(result.errors)
+        self.assertIn('email', errors[3])
+        self.assertIn('student_id', errors[4])
+        self.assertIn('cgpa', errors[5])
+        self.assertIn('email', errors[6])
+        self.assertEqual(Student.objects.count(), 2)
+
+    def test_export_headers_and_labels_are_accepted(self):
+        make_student(1)
+        response = self.client.post(reverse('students:export_download'), {
+            'format': 'csv', 'fields': ['basic', 'academic', 'address', 'emergency'],
+        })
+        exported = b''.join(response.streaming_content).decode()
+        Student.objects.all().delete()
+
+        result = import_students(StringIO(exported))
+        self.assertEqual((result.created, result.failed), (1, 0))
+        student = Student.objects.get()
+        self.assertEqual((student.gender, student.department, student.year), ('M', 'CS', 1))
+
+    def test_row_forms_share_their_fields(self):
+        first, second = StudentImportForm(data={'cgpa': '5.00'}), StudentImportForm(data={'cgpa': '3.00'})
+        self.assertIs(first.fields['department'], second.fields['department'])
+        self.assertIn('cgpa', first.errors)
+        self.assertNotIn('cgpa', second.errors)
+        # The edit form keeps copies of its own
+        self.assertIsNot(StudentForm().fields['department'], StudentForm().fields['department'])
+
+    def test_dry_run_saves_nothing(self):
+        result = import_students(StringIO(IMPORT_HEADER + import_row(1)), dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Student.objects.exists())
+
+    def test_upload_view_and_command(self):
+        upload = SimpleUploadedFile('students.csv', (IMPORT_HEADER + import_row(1)).encode())
+        response = self.client.post(reverse('students:student_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(IMPORT_HEADER + import_row(1) + import_row(2))
+        self.addCleanup(os.remove, csv_file.name)
+        out = StringIO()
+        call_command('import_students', csv_file.name, stdout=out)
+        self.assertIn('Imported 1 of 2 rows', out.getvalue())
+        self.assertEqual(Student.objects.count(), 2)
+
+    def test_malformed_csv_is_a_form_error(self):
+        oversized = IMPORT_HEADER + import_row(1, gender='x' * (csv.field_size_limit() + 1))
+        upload = SimpleUploadedFile('students.csv', oversized.encode())
+        response = self.client.post(reverse('students:student_import'), {'file': upload})
+        self.assertContains(response, 'The file is not valid CSV: field larger than field limit')
+        self.assertFalse(response.context['form'].is_valid())
+        self.assertEqual(Student.objects.count(), 0)
+
+
+class StudentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = make_student(1, cgpa=Decimal('3.80'))
+
+    def test_detail_is_rendered_once_until_the_student_changes(self):
+        url = reverse('students:student_detail', args=[self.student.pk])
+        self.assertContains(self.client.get(url), 'First1 Last1')
+        # Only the Last-Modified lookup reaches the database
+        with self.assertNumQueries(1):
+            self.assertContains(self.client.get(url), 'First1 Last1')
+
+        self.student.first_name = 'Renamed'
+        self.student.save()
+        self.assertContains(self.client.get(url), 'Renamed Last1')
+        self.assertEqual(cache_counters()['student_detail'], {'hits': 1, 'misses': 2, 'hit_ratio': 0.333})
+
+    def test_soft_deleted_student_is_not_served_from_cache(self):
+        url = reverse('students:student_detail', args=[self.student.pk])
+        self.client.get(url)
+        self.client.post(reverse('students:student_delete', args=[self.student.pk]))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_dashboard_lists_are_cached_and_invalidated(self):
+        url = reverse('students:dashboard')
+        self.client.get(url)
+        # Only the validators are queried
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.context['total_students'], 1)
+
+        make_student(2, cgpa=Decimal('3.90'))
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_students'], 2)
+        self.assertEqual(response.context['top_students'][0].student_id, 'STU00002')
+        self.assertEqual(cache_counters()['dashboard_stats']['hits'], 1)
+
+    def test_bulk_import_invalidates_dashboard(self):
+        self.client.get(reverse('students:dashboard'))
+        csv_file = StringIO(IMPORT_HEADER + import_row(1))
+        import_students(csv_file)
+        response = self.client.get(reverse('students:dashboard'))
+        self.assertEqual(response.context['total_students'], 2)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = make_student(1)
+
+    def test_dashboard_polling_reads_only_the_validators(self):
+        url = reverse('students:dashboard')
+        etag = self.client.get(url)['ETag']
+        for _ in range(3):
+            with self.assertNumQueries(2):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+        make_student(2)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_is_scoped_to_filters(self):
+        make_student(2, department='EE')
+        url = reverse('students:student_list')
+        cs = self.client.get(url, {'department': 'CS'})
+        ee = self.client.get(url, {'department': 'EE'})
+        self.assertNotEqual(cs['ETag'], ee['ETag'])
+        self.assertEqual(
+            self.client.get(url, {'department': 'CS'}, HTTP_IF_NONE_MATCH=cs['ETag']).status_code, 304
+        )
+
+        student = Student.objects.filter(department='EE').get()
+        student.city = 'Nashik'
+        student.save()
+        self.assertEqual(
+            self.client.get(url, {'department': 'CS'}, HTTP_IF_NONE_MATCH=cs['ETag']).status_code, 304
+        )
+        self.assertEqual(
+            self.client.get(url, {'department': 'EE'}, HTTP_IF_NONE_MATCH=ee['ETag']).status_code, 200
+        )
+
+    def test_cursor_pages_are_validated_by_the_active_students(self):
+        url = reverse('students:student_list')
+        etag = self.client.get(url, {'paginate': 'cursor'})['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'paginate': 'cursor'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make_student(2)
+        response = self.client.get(url, {'paginate': 'cursor'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_validators_follow_writes_the_cache_did_not_see(self):
+        # As a write served by another worker, with its own cache versions
+        urls = [reverse('students:dashboard'), f"{reverse('students:student_list')}?paginate=cursor"]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        Student.objects.filter(pk=self.student.pk).update(city='Nashik', updated_at=timezone.now())
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pages_with_flash_messages_are_rendered(self):
+        url = reverse('students:student_list')
+        etag = self.client.get(url, {'search': 'First1'})['ETag']
+        self.assertEqual(self.client.get(url, {'search': 'First1'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        other = reverse('students:student_detail', args=[make_student(2).pk])
+        etag = self.client.get(other)['ETag']
+        self.client.post(reverse('students:student_delete', args=[self.student.pk]))
+        response = self.client.get(other, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'deleted successfully')
+        self.assertEqual(self.client.get(other, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_detail_uses_updated_at(self):
+        url = reverse('students:student_detail', args=[self.student.pk])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 404)
+
+
+class StudentApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for index in range(1, 8):
+            make_student(index, department='CS' if index % 2 else 'EE')
+
+    def api_data(self, index, **overrides):
+        data = {
+            'student_id': f'API{index:05d}',
+            'first_name': f'Api{index}',
+            'last_name': 'Student',
+            'email': f'api{index}@example.com',
+            'phone': '9876543210',
+            'date_of_birth': '2003-01-01',
+            'gender': 'F',
+            'department': 'ME',
+            'year': 2,
+            'semester': 3,
+            'cgpa': '3.20',
+            'address': '1 College Road',
+            'city': 'Pune',
+            'state': 'Maharashtra',
+            'postal_code': '411001',
+            'emergency_contact': '9876543211',
+            'emergency_contact_name': 'Parent',
+        }
+        data.update(overrides)
+        return data
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def test_list_fetches_only_requested_fields(self):
+        url = reverse('students:api_student_list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'student_id,email', 'department': 'CS', 'page_size': 2})
+        body = response.json()
+        self.assertEqual(body['results'], [
+            {'student_id': 'STU00001', 'email': 'student1@example.com'},
+            {'student_id': 'STU00003', 'email': 'student3@example.com'},
+        ])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('first_name', queries[0]['sql'])
+
+        body = self.client.get(body['next']).json()
+        self.assertEqual([row['student_id'] for row in body['results']], ['STU00005', 'STU00007'])
+        self.assertIsNone(body['next'])
+
+    def test_list_search_and_invalid_parameters(self):
+        url = reverse('students:api_student_list')
+        self.assertEqual(
+            self.client.get(url, {'search': 'First3', 'fields': 'email'}).json()['results'],
+            [{'email': 'student3@example.com'}],
+        )
+        self.assertEqual(self.client.get(url, {'fields': 'password'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'department': 'XX'}).status_code, 400)
+
+    def test_create_update_and_soft_delete(self):
+        response = self.send('post', reverse('students:api_student_list'), self.api_data(1))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['country'], 'India')
+        url = reverse('students:api_student_detail', args=[response.json()['id']])
+
+        response = self.send('patch', url, {'cgpa': '3.90'})
+        self.assertEqual(response.json()['cgpa'], '3.90')
+        self.assertEqual(response.json()['first_name'], 'Api1')
+        self.assertEqual(self.send('put', url, {'cgpa': '3.90'}).status_code, 400)
+        self.assertEqual(self.send('patch', url, {'email': 'student1@example.com'}).status_code, 400)
+
+        self.assertEqual(self.client.get(url, {'fields': 'cgpa'}).json(), {'cgpa': '3.90'})
+        self.assertTrue(self.client.delete(url).json()['success'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(get_dashboard_stats().total_students, 7)
+
+    def test_bulk_create_reports_errors_by_index(self):
+        rows = [self.api_data(1), self.api_data(2, email='student1@example.com'), self.api_data(3, year=9)]
+        response = self.send('post', reverse('students:api_student_bulk'), rows)
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (1, 2))
+        self.assertEqual([error['index'] for error in body['errors']], [1, 2])
+        self.assertEqual(get_dashboard_stats().department_stats['Mechanical Engineering'], 1)
+
+    def test_bulk_update_is_one_statement(self):
+        students = list(Student.objects.order_by('pk')[:3])
+        rows = [
+            {'id': students[0].pk, 'department': 'ME'},
+            {'id': students[1].pk, 'cgpa': '3.95', 'email': 'changed@example.com'},
+            {'id': students[2].pk, 'email': 'changed@example.com'},
+            {'id': 999999, 'department': 'ME'},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            body = self.send('patch', reverse('students:api_student_bulk'), rows).json()
+        self.assertEqual((body['updated'], body['failed']), (2, 2))
+        self.assertEqual({error['index'] for error in body['errors']}, {2, 3})
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "students_student"') for query in queries), 1)
+
+        students[0].refresh_from_db()
+        self.assertEqual(students[0].department, 'ME')
+        self.assertGreater(students[0].updated_at, students[2].updated_at)
+        stats = get_dashboard_stats()
+        self.assertEqual(stats.department_stats, aggregate_dashboard_stats().department_stats)
+
+    def test_bulk_soft_delete(self):
+        ids = list(Student.objects.filter(department='EE').values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            body = self.send('delete', reverse('students:api_student_bulk'), {'ids': ids + [999999]}).json()
+        self.assertEqual(body['deleted'], 3)
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "students_student"') for query in queries), 1)
+        self.assertEqual(Student.objects.filter(is_active=True).count(), 4)
+        self.assertEqual(get_dashboard_stats().total_students, 4)
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.students = [
+            make_student(1, year=1, semester=1),
+            make_student(2, year=1, semester=2),
+            make_student(3, year=4, semester=8),
+            make_student(4, year=2, semester=3, department='EE'),
+        ]
+
+    def assert_stats_consistent(self):
+        self.assertEqual(get_dashboard_stats(), aggregate_dashboard_stats())
+
+    def post_action(self, **data):
+        return self.client.post(reverse('students:student_bulk_action'), data, follow=True)
+
+    def student_updates(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('UPDATE "students_student"')]
+
+    def test_deactivate_checked_students_in_one_update(self):
+        ids = [self.students[0].pk, self.students[1].pk]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_action(action='deactivate', ids=ids)
+        self.assertContains(response, '2 students deactivated.')
+        self.assertEqual(len(self.student_updates(queries)), 1)
+        self.assertEqual(Student.objects.filter(is_active=True).count(), 2)
+        self.assert_stats_consistent()
+
+        self.assertEqual(reactivate_students(Student.objects.all()), 2)
+        self.assert_stats_consistent()
+
+    def test_select_all_uses_the_current_filters(self):
+        response = self.post_action(action='set_year_semester', select_all='on', department='CS', new_year=3)
+        self.assertContains(response, '3 students moved.')
+        self.assertRedirects(response, reverse('students:student_list') + '?department=CS')
+        self.assertEqual(Student.objects.filter(year=3).count(), 3)
+        self.assertEqual(Student.objects.get(department='EE').year, 2)
+        self.assert_stats_consistent()
+
+    def test_select_all_with_invalid_filters_changes_nothing(self):
+        for filters in ({'min_cgpa': '3.5', 'max_cgpa': '2.0'}, {'year': '9'}, {'sort': 'address'}):
+            with self.subTest(filters=filters):
+                response = self.post_action(action='deactivate', select_all='on', **filters)
+                self.assertNotContains(response, 'deactivated.')
+                self.assertEqual(len(response.context['messages']), 1)
+                self.assertEqual(Student.objects.filter(is_active=True).count(), 4)
+
+    def test_promote_moves_to_next_semester_and_year(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(promote_students(Student.objects.all()), 3)
+        self.assertEqual(len(self.student_updates(queries)), 1)
+        self.assertEqual(
+            list(Student.objects.order_by('student_id').values_list('year', 'semester')),
+            [(1, 2), (2, 3), (4, 8), (2, 4)],
+        )
+        self.assert_stats_consistent()
+
+    def test_bulk_update_invalidates_cached_details(self):
+        url = reverse('students:student_detail', args=[self.students[0].pk])
+        self.assertContains(self.client.get(url), 'Semester')
+        self.post_action(action='deactivate', ids=[self.students[0].pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_small_updates_keep_other_students_cached(self):
+        details = [reverse('students:student_detail', args=[student.pk]) for student in self.students]
+        self.client.get(details[1])
+        self.client.post(reverse('students:student_delete', args=[self.students[0].pk]))
+        self.client.get(details[1])
+        self.assertEqual(cache_counters()['student_detail']['hits'], 1)
+
+        with mock.patch('students.bulk.MAX_TRACKED_UPDATES', 1):
+            self.post_action(action='promote', select_all='on')
+        self.client.get(details[1])
+        self.assertEqual(cache_counters()['student_detail']['misses'], 2)
+
+    def test_invalid_selection_is_reported(self):
+        self.assertContains(self.post_action(action='promote'), 'Select at least one student.')
+        self.assertContains(
+            self.post_action(action='reactivate', ids=[self.students[0].pk]), 'not one of the available choices'
+        )
+        response = self.post_action(action='set_year_semester', ids=[self.students[0].pk])
+        self.assertContains(response, 'Choose a year or semester')
+
+    def test_admin_actions(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.post(reverse('admin:students_student_changelist'), {
+            'action': 'change_year_semester',
+            '_selected_action': [self.students[0].pk],
+            'new_semester': 5,
+        }, follow=True)
+        self.assertContains(response, '1 student moved.')
+        self.assertEqual(Student.objects.get(pk=self.students[0].pk).semester, 5)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.students = [make_student(index, cgpa=Decimal('3.50') + Decimal(index) / 100) for index in range(1, 13)]
+
+    async def test_list_matches_the_sync_view(self):
+        sync = await self.async_client.get('/list/', {'page': 2})
+        response = await async_views.student_list(self.factory.get('/list/', {'page': 2}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], sync['ETag'])
+        self.assertContains(response, 'First11 Last11')
+        self.assertNotContains(response, 'First1 Last1<')
+
+        response = await async_views.student_list(
+            self.factory.get('/list/', {'page': 2}, headers={'If-None-Match': sync['ETag']})
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_chart_data_matches_the_sync_view(self):
+        sync = await self.async_client.get('/charts/')
+        response = await async_views.chart_data(self.factory.get('/charts/'))
+        self.assertEqual(json.loads(response.content), sync.json())
+        response = await async_views.chart_data(self.factory.post('/charts/'))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_list_cursor_pages(self):
+        response = await async_views.student_list(self.factory.get('/list/', {'paginate': 'cursor'}))
+        self.assertContains(response, 'First1 Last1<')
+        self.assertNotContains(response, 'First11 Last11')
+
+    async def test_list_fragment(self):
+        response = await async_views.student_list(self.factory.get('/list/', {'fragment': 'results'}))
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, 'Showing the first 10 matching students')
+        self.assertNotContains(response, '<html')
+
+    async def test_detail_and_missing_student(self):
+        student = self.students[0]
+        response = await async_views.student_detail(self.factory.get(f'/{student.pk}/'), student.pk)
+        self.assertContains(response, student.full_name)
+        self.assertIn('Last-Modified', response)
+        with self.assertRaises(Http404):
+            await async_views.student_detail(self.factory.get('/0/'), 0)
+
+    async def test_dashboard_matches_the_sync_view(self):
+        sync = await self.async_client.get('/')
+        response = await async_views.dashboard(self.factory.get('/'))
+        self.assertEqual(response['ETag'], sync['ETag'])
+        self.assertContains(response, 'First12 Last12')
+        self.assertEqual(response.content, sync.content)
+
+    async def test_delete_ajax(self):
+        student = self.students[0]
+        response = await async_views.student_delete_ajax(self.factory.get('/'), student.pk)
+        self.assertEqual(response.status_code, 405)
+
+        response = await async_views.student_delete_ajax(self.factory.post('/'), student.pk)
+        self.assertTrue(json.loads(response.content)['success'])
+        self.assertFalse(await Student.objects.filter(pk=student.pk, is_active=True).aexists())
+        self.assertEqual((await StudentStats.objects.filter(is_active=True).aget()).count, 11)
+
+        response = await async_views.student_delete_ajax(self.factory.post('/'), student.pk)
+        self.assertEqual(response.status_code, 400)
+
+
+def photo_upload(name='photo.jpg', size=(800, 600)):
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'
+    output = BytesIO()
+    Image.new('RGB', size, 'red').save(output, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/jpeg')
+
+
+class ProfilePictureTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, STUDENT_IMAGE_WORKERS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def render_photo(self, student):
+        return Template('{% load student_images %}{% student_photo student 48 %}').render(Context({'student': student}))
+
+    def test_upload_is_reencoded_with_thumbnails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = make_student(1, profile_picture=photo_upload())
+        upload = student.profile_picture.name
+        student.refresh_from_db()
+
+        self.assertNotEqual(student.profile_picture.name, upload)
+        self.assertFalse(default_storage.exists(upload))
+        with Image.open(student.profile_picture.path) as image:
+            self.assertEqual(image.format, IMAGE_FORMAT)
+            self.assertEqual(image.size, (800, 600))
+            self.assertFalse(image.getexif())
+        widths = student.picture_variants['widths']
+        self.assertEqual(sorted(map(int, widths)), list(VARIANT_WIDTHS))
+        with Image.open(default_storage.path(widths['64'])) as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 64))
+
+    def test_photo_tag_uses_thumbnails_once_processed(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            student = make_student(1, profile_picture=photo_upload())
+        html = self.render_photo(student)
+        self.assertIn(f'src="{student.profile_picture.url}"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertNotIn('srcset', html)
+
+        self.assertTrue(process_profile_picture(student.pk, student.profile_picture.name))
+        student.refresh_from_db()
+        html = self.render_photo(student)
+        self.assertIn('sizes="48px"', html)
+        self.assertIn(f'src="{default_storage.url(student.picture_variants["widths"]["64"])}"', html)
+        self.assertEqual(html.count('w, ') + 1, len(VARIANT_WIDTHS))
+
+    def test_replaced_upload_discards_the_older_result(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            student = make_student(1, profile_picture=photo_upload('first.jpg'))
+        first = student.profile_picture.name
+        student.profile_picture = photo_upload('second.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            student.save()
+
+        self.assertFalse(process_profile_picture(student.pk, first))
+        student.refresh_from_db()
+        self.assertIn('second', student.profile_picture.name)
+        self.assertEqual(student.picture_variants['source'], student.profile_picture.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'student_photos', 'thumbs'))), len(VARIANT_WIDTHS))
+
+
+@override_settings(STUDENT_INSTRUMENTATION=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        make_student(1)
+
+    def test_server_timing_and_stats_endpoint(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('students:student_list'))
+        query_count = len(queries)
+        self.assertIn(f'desc="{query_count} queries"', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+
+        url = reverse('students:instrumentation_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        stats = self.client.get(url).json()
+        self.assertTrue(stats['enabled'])
+        student_list = stats['views']['student_list']
+        self.assertEqual(student_list['requests'], 1)
+        self.assertEqual(student_list['queries']['max'], query_count)
+        self.assertGreater(student_list['template_ms']['max'], 0)
+        self.assertEqual(sum(student_list['latency_ms']['histogram'].values()), 1)
+        self.assertTrue(student_list['slowest_queries'][0]['sql'].startswith('SELECT'))
+        self.assertNotIn('instrumentation_stats', stats['views'])
+
+    def test_streaming_response_is_recorded_once_sent(self):
+        response = self.client.get(reverse('students:export_download'), {'format': 'csv'})
+        self.assertEqual(metrics_snapshot(), {})
+        b''.join(response.streaming_content)
+        response.close()
+        export = metrics_snapshot()['export_download']
+        self.assertEqual(export['requests'], 1)
+        self.assertEqual(export['queries']['max'], 1)
+
+    async def test_async_streaming_response_is_recorded_once_sent(self):
+        # ASGIHandler sends request_started from the thread that runs the
+        # queries, AsyncClient from another one; a sync request stands in
+        await sync_to_async(self.client.get)(reverse('students:student_list'))
+        response = await self.async_client.get(reverse('students:export_download'), {'format': 'csv'})
+        b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(metrics_snapshot()['export_download']['queries']['max'], 1)
+
+    def test_other_apps_are_not_measured(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        with mock.patch.object(RequestMetrics, 'add_query') as add_query:
+            response = self.client.get(reverse('admin:index'))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('Server-Timing', response)
+            self.assertFalse(add_query.called)
+
+            self.client.get(reverse('students:student_list'))
+            self.assertTrue(add_query.called)
+
+    @override_settings(STUDENT_INSTRUMENTATION=False)
+    def test_disabled_by_setting(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('students:student_list')))
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_is_deterministic_and_keeps_counters(self):
+        seed_students(300, seed=7, batch_size=50)
+        first = list(Student.objects.order_by('pk').values_list('student_id', 'email', 'department', 'cgpa'))
+        self.assertEqual(get_dashboard_stats(), aggregate_dashboard_stats())
+        self.assertEqual(len(get_dashboard_stats().gender_stats), len(Student.GENDER_CHOICES))
+
+        Student.objects.all().delete()
+        seed_students(300, seed=7, start=0)
+        self.assertEqual(list(Student.objects.order_by('pk').values_list('student_id', 'email', 'department', 'cgpa')), first)
+
+    def test_benchmark_views_reports_every_reading_view(self):
+        make_student(1)
+        cache.set('unrelated', 'kept')
+        output = StringIO()
+        call_command('benchmark_views', sizes=[30], repeat=1, stdout=output, stderr=StringIO())
+        self.assertEqual(cache.get('unrelated'), 'kept')
+        report = json.loads(output.getvalue())
+        self.assertTrue(all(result['status'] == 200 for result in report['results']))
+        self.assertIn('student_detail', {result['view'] for result in report['results']})
+        self.assertEqual(Student.objects.count(), 1)
+
+
+@override_settings(STUDENT_DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = StudentReplicaRouter()
+
+    def read_database(self):
+        return self.router.db_for_read(Student)
+
+    def test_reads_go_to_a_replica_and_writes_to_the_primary(self):
+        self.assertIn(contextvars.Context().run(self.read_database), ['replica1', 'replica2'])
+        self.assertIsNone(self.router.db_for_read(ExportJob))
+        self.assertFalse(self.router.allow_migrate('replica1', 'students'))
+        self.assertIsNone(self.router.allow_migrate('default', 'students'))
+
+    def test_reads_follow_writes_to_the_primary(self):
+        def write_then_read():
+            self.assertEqual(self.router.db_for_write(Student), 'default')
+            return self.read_database()
+        self.assertEqual(contextvars.Context().run(write_then_read), 'default')
+
+        with use_primary():
+            self.assertEqual(self.read_database(), 'default')
+
+    @override_settings(STUDENT_DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.read_database(), 'default')
+
+    def test_middleware_pins_clients_after_a_post(self):
+        contextvars.Context().run(self.check_middleware_pins)
+
+    def check_middleware_pins(self):
+        databases = []
+        middleware = ReplicaPinningMiddleware(lambda request: databases.append(self.read_database()) or HttpResponse())
+        factory = RequestFactory()
+
+        response = middleware(factory.post('/1/edit/'))
+        self.assertEqual(databases.pop(), 'default')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+        pinned = factory.get('/1/')
+        pinned.COOKIES[PIN_COOKIE] = '1'
+        middleware(pinned)
+        self.assertEqual(databases.pop(), 'default')
+
+        self.assertNotIn(PIN_COOKIE, middleware(factory.get('/1/')).cookies)
+        self.assertIn(databases.pop(), ['replica1', 'replica2'])
+
+
+class StudentAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.url = reverse('admin:students_student_changelist')
+        self.students = [make_student(index, department='CS' if index % 2 else 'IT') for index in range(1, 7)]
+
+    def test_changelist_queries_stay_small_and_indexed(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'department__exact': 'CS', 'is_active__exact': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        student_queries = [query['sql'] for query in queries if 'FROM "students_student"' in query['sql']]
+        self.assertLessEqual(len(student_queries), 6)
+        # Counted from StudentStats
+        self.assertFalse(any('COUNT(' in sql for sql in student_queries))
+        with connection.cursor() as cursor:
+            for sql in student_queries:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+                self.assertFalse(is_full_scan(plan, connection.vendor), sql)
+
+    def test_other_filters_are_counted_up_to_the_limit(self):
+        with self.settings(STUDENT_ADMIN_COUNT_LIMIT=4):
+            response = self.client.get(self.url, {'semester': '1'})
+        self.assertEqual(response.context['cl'].result_count, 4)
+        response = self.client.get(self.url, {'q': 'first3'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.students[2]])
+
+    def test_date_hierarchy_seeks_the_same_dates(self):
+        for student, created in zip(self.students, ['2023-05-02', '2023-05-02', '2023-07-09', '2025-01-31', '2025-01-31', '2025-12-01']):
+            Student.objects.filter(pk=student.pk).update(created_at=datetime.fromisoformat(created).replace(hour=10, tzinfo=dt_timezone.utc))
+        queryset = ChangeListQuerySet(Student)
+        for kind in ('year', 'month', 'day'):
+            self.assertEqual(queryset.datetimes('created_at', kind), list(Student.objects.datetimes('created_at', kind)))
+        self.assertEqual(
+            queryset.aggregate(first=Min('created_at'), last=Max('created_at')),
+            Student.objects.aggregate(first=Min('created_at'), last=Max('created_at')),
+        )
+        response = self.client.get(self.url)
+        self.assertContains(response, '?created_at__year=2025')
+
+    def test_list_editable_changes_are_saved_in_bulk(self):
+        data = {'form-TOTAL_FORMS': 2, 'form-INITIAL_FORMS': 2, '_save': 'Save'}
+        for number, student in enumerate(self.students[:2]):
+            data[f'form-{number}-id'] = student.pk
+        # The first student is deactivated, the second left active
+        data['form-1-is_active'] = 'on'
+        response = self.client.post(self.url, data)
+        self.assertRedirects(response, self.url)
+        self.assertEqual(list(Student.objects.filter(is_active=False)), [self.students[0]])
+        self.assertEqual(get_dashboard_stats(), aggregate_dashboard_stats())
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.object_id, str(self.students[0].pk))
+        self.assertEqual(entry.get_change_message(), 'Changed Active Status.')
+
+    def test_other_editable_columns_are_saved_row_by_row(self):
+        data = {'form-TOTAL_FORMS': 1, 'form-INITIAL_FORMS': 1, '_save': 'Save'}
+        data.update({'form-0-id': self.students[0].pk, 'form-0-is_active': 'on', 'form-0-semester': 3})
+        with mock.patch.object(StudentAdmin, 'list_editable', ['semester', 'is_active']):
+            response = self.client.post(self.url, data)
+        self.assertRedirects(response, self.url)
+        self.assertEqual(Student.objects.get(pk=self.students[0].pk).semester, 3)
+        self.assertEqual(LogEntry.objects.get().get_change_message(), 'Changed Semester.')
+
+
+class StaticAssetTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        override = override_settings(STATIC_ROOT=cls.static_root)
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        call_command('build_static_assets', interactive=False, verbosity=0)
+        with open(os.path.join(cls.static_root, 'staticfiles.json')) as manifest:
+            cls.paths = json.load(manifest)['paths']
+
+    def read(self, name):
+        with open(os.path.join(self.static_root, name), 'rb') as built:
+            return built.read()
+
+    def test_minifiers_keep_strings_and_regular_expressions(self):
+        script = (
+            '// comment\nconst url = "http://x/ */";  /* block */\n'
+            'const re = /[/]+\\//g;\nlet n = a + +b;\nreturn `a  ${b}`\n'
+        )
+        self.assertEqual(
+            minify_js(script),
+            'const url="http://x/ */";\nconst re=/[/]+\\//g;\nlet n=a+ +b;\nreturn`a  ${b}`\n',
+        )
+        self.assertEqual(
+            minify_css('/* x */\na:hover ,\nb > i {\n  content: " ; ";\n  color: red !important;\n}\n'),
+            'a:hover,b>i{content:" ; ";color:red!important}\n',
+        )
+
+    def test_build_writes_minified_hashed_and_compressed_assets(self):
+        for name in ['css/style.css', 'js/main.js']:
+            hashed = self.paths[name]
+            self.assertRegex(hashed, r'\.[0-9a-f]{12}\.(css|js)$')
+            content = self.read(hashed)
+            with open(os.path.join(settings.BASE_DIR, 'static', name), 'rb') as source:
+                self.assertLess(len(content), len(source.read()))
+            self.assertEqual(gzip.decompress(self.read(hashed + '.gz')), content)
+
+    def test_hashed_asset_is_served_precompressed_and_immutable(self):
+        hashed = self.paths['css/style.css']
+        response = self.client.get(f'/static/{hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(b''.join(response.streaming_content), self.read(hashed + '.gz'))
+
+        response = self.client.get(f'/static/{hashed}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.read(hashed))
+
+    def test_unhashed_and_missing_files(self):
+        response = self.client.get('/static/css/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Cache-Control'], IMMUTABLE)
+        response.close()
+        self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 400)
+
+    def test_templates_link_hashed_names(self):
+        storages = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'students.staticfiles.PrecompressedManifestStorage'},
+        }
+        with override_settings(STORAGES=storages):
+            rendered = Template("{% load static %}{% static 'js/main.js' %}").render(Context())
+        self.assertEqual(rendered, f'/static/{self.paths["js/main.js"]}')
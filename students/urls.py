@@ -1,15 +1,30 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, async_views, views
 
 app_name = 'students'
 
+# Under ASGI the read views and the AJAX delete use the async ORM (see asgi.py)
+read_views = async_views if getattr(settings, 'STUDENT_ASYNC_VIEWS', False) else views
+
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
-    path('list/', views.student_list, name='student_list'),
+    path('', read_views.dashboard, name='dashboard'),
+    path('charts/', read_views.chart_data, name='chart_data'),
+    path('list/', read_views.student_list, name='student_list'),
     path('create/', views.student_create, name='student_create'),
-    path('<int:pk>/', views.student_detail, name='student_detail'),
+    path('<int:pk>/', read_views.student_detail, name='student_detail'),
     path('<int:pk>/edit/', views.student_update, name='student_update'),
     path('<int:pk>/delete/', views.student_delete, name='student_delete'),
-    path('<int:pk>/delete-ajax/', views.student_delete_ajax, name='student_delete_ajax'),
+    path('<int:pk>/delete-ajax/', read_views.student_delete_ajax, name='student_delete_ajax'),
+    path('bulk-action/', views.student_bulk_action, name='student_bulk_action'),
+    path('import/', views.student_import, name='student_import'),
     path('export/', views.export_students, name='export_students'),
-]
\ No newline at end of file
+    path('export/download/', views.export_download, name='export_download'),
+    path('export/jobs/', views.export_job_create, name='export_job_create'),
+    path('export/jobs/<uuid:token>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/<uuid:token>/download/', views.export_job_download, name='export_job_download'),
+    path('metrics/', views.instrumentation_stats, name='instrumentation_stats'),
+    path('api/students/', api.student_collection, name='api_student_list'),
+    path('api/students/bulk/', api.student_bulk, name='api_student_bulk'),
+    path('api/students/<int:pk>/', api.student_resource, name='api_student_detail'),
+]
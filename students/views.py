@@ -1,64 +1,231 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Q
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django.views.decorators.csrf import csrf_exempt
-from .models import Student
-from .forms import StudentForm, StudentSearchForm
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.template.defaultfilters import pluralize
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition, require_GET, require_POST, require_http_methods
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from .models import ExportJob, Student
+from . import caching, exports
+from .bulk import deactivate_students, promote_students, set_year_semester
+from .forms import (
+    StudentBulkActionForm, StudentExportForm, StudentForm, StudentImportUploadForm, StudentSearchForm,
+)
+from .imports import import_students
+from .instrumentation import metrics_snapshot
+from .pagination import CursorPaginator
+from .search import filter_students, page_ordering, student_ordering
+from .stats import build_chart_data, get_dashboard_stats, students_freshness
+import csv
+import hashlib
+import io
 import json
+import os
 
-def student_list(request):
-    """Display list of all students with search and filter functionality"""
+def _filtered_students(data):
+    """Active students narrowed by the list page's search and filter parameters"""
     students = Student.objects.filter(is_active=True)
-    search_form = StudentSearchForm(request.GET)
+    search_form = StudentSearchForm(data)
     
     # Apply search filters
     if search_form.is_valid():
-        search = search_form.cleaned_data.get('search')
-        department = search_form.cleaned_data.get('department')
-        year = search_form.cleaned_data.get('year')
-        gender = search_form.cleaned_data.get('gender')
-        
-        if search:
-            students = students.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(student_id__icontains=search) |
-                Q(email__icontains=search)
-            )
-        
-        if department:
-            students = students.filter(department=department)
-        
-        if year:
-            students = students.filter(year=year)
-        
-        if gender:
-            students = students.filter(gender=gender)
-    
-    # Pagination
-    paginator = Paginator(students, 10)  # Show 10 students per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        students = filter_students(students, search_form.cleaned_data)
     
-    context = {
+    return students, search_form
+
+def _list_page_students(students, search_form):
+    """The list page's projection of ``students``, and the ordering its pages follow"""
+    if not search_form.is_valid():
+        return students.for_list(), None
+    sort_fields = [name.lstrip('-') for name in student_ordering(search_form.cleaned_data) or ()]
+    return students.for_list(*sort_fields), page_ordering(search_form.cleaned_data)
+
+def _is_fragment(request):
+    """Whether live search asked for the results alone (see main.js performSearch)"""
+    return request.GET.get('fragment') == 'results'
+
+def _list_template(request):
+    if _is_fragment(request):
+        return 'students/partials/student_list_results.html'
+    return 'students/student_list.html'
+
+def _has_messages(request):
+    # len() loads pending messages without marking them as shown
+    return bool(len(messages.get_messages(request)))
+
+def _freshness(request, queryset):
+    """Latest updated_at and row count of ``queryset``, queried once per request"""
+    if not hasattr(request, '_student_freshness'):
+        request._student_freshness = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk')
+        )
+    return request._student_freshness
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+def _is_cursor_page(request):
+    return _is_fragment(request) or request.GET.get('paginate') == 'cursor' or 'cursor' in request.GET
+
+def _students_freshness(request):
+    """students_freshness(), queried once per request"""
+    if not hasattr(request, '_students_freshness'):
+        request._students_freshness = students_freshness()
+    return request._students_freshness
+
+def _list_freshness(request):
+    # Cursor pages show the cached total, so they are validated by the
+    # active students as a whole rather than by counting the filtered ones
+    if _is_cursor_page(request):
+        return _students_freshness(request)
+    return _freshness(request, _filtered_students(request.GET)[0])
+
+def _list_etag(request):
+    # Fragments skip the count the validators are built from
+    if _is_fragment(request) or _has_messages(request):
+        return None
+    freshness = _list_freshness(request)
+    return _etag(freshness['last_modified'], freshness['count'], request.get_full_path())
+
+def _list_last_modified(request):
+    if _is_fragment(request) or _has_messages(request):
+        return None
+    return _list_freshness(request)['last_modified']
+
+@condition(etag_func=_list_etag, last_modified_func=_list_last_modified)
+@ensure_csrf_cookie
+def student_list(request):
+    """Display list of all students with search and filter functionality"""
+    students, search_form = _filtered_students(request.GET)
+    
+    # Pagination: keyset cursors on request, page numbers otherwise
+    # Cursor pages take the total from the cache; page numbers were already
+    # counted alongside the ETag; live search fragments show the first rows
+    # only and do not count at all
+    cursor_pagination = _is_cursor_page(request)
+    page_students, ordering = _list_page_students(students, search_form)
+    if cursor_pagination:
+        paginator = CursorPaginator(page_students, 10, ordering)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+        total_students = None if _is_fragment(request) else paginator.count
+    else:
+        total_students = _freshness(request, students)['count']
+        paginator = Paginator(page_students, 10)  # Show 10 students per page
+        paginator.count = total_students
+        page_obj = paginator.get_page(request.GET.get('page'))
+    
+    context = _list_context(request, page_obj, search_form, total_students, cursor_pagination)
+    return render(request, _list_template(request), context)
+
+def _list_context(request, page_obj, search_form, total_students, cursor_pagination):
+    pagination_params = request.GET.copy()
+    for param in ('page', 'cursor', 'paginate', 'fragment'):
+        pagination_params.pop(param, None)
+    
+    return {
         'page_obj': page_obj,
         'search_form': search_form,
-        'total_students': students.count(),
+        'total_students': total_students,
+        'cursor_pagination': cursor_pagination,
+        'pagination_query': pagination_params.urlencode(),
+        'sort': search_form['sort'].value(),
+        'order': search_form['order'].value() or 'asc',
+        'bulk_form': StudentBulkActionForm(),
+        # Carried by the bulk action form so "all matching" means the same students
+        'filter_params': [
+            (name, request.GET[name]) for name in StudentSearchForm.base_fields if request.GET.get(name)
+        ],
     }
+
+# Bulk actions of the student list, and the verb used to report them
+BULK_ACTIONS = {
+    'deactivate': (lambda students, data: deactivate_students(students), 'deactivated'),
+    'set_year_semester': (
+        lambda students, data: set_year_semester(students, data['new_year'], data['new_semester']),
+        'moved',
+    ),
+    'promote': (lambda students, data: promote_students(students), 'promoted'),
+}
+
+@require_POST
+def student_bulk_action(request):
+    """Apply a bulk action to the checked students, or to every student matching the filters"""
+    filters = {name: request.POST[name] for name in StudentSearchForm.base_fields if request.POST.get(name)}
+    list_url = reverse('students:student_list')
+    if filters:
+        list_url = f'{list_url}?{urlencode(filters)}'
+    
+    form = StudentBulkActionForm(request.POST)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            messages.error(request, ' '.join(errors))
+        return redirect(list_url)
     
-    return render(request, 'students/student_list.html', context)
+    if form.cleaned_data['select_all']:
+        students, search_form = _filtered_students(filters)
+        # The list ignores invalid filters; here they would select every student
+        if not search_form.is_valid():
+            for errors in search_form.errors.values():
+                messages.error(request, ' '.join(errors))
+            return redirect(list_url)
+    else:
+        students = Student.objects.filter(pk__in=form.cleaned_data['ids'])
+    # Each action is a single UPDATE over the whole selection
+    run, verb = BULK_ACTIONS[form.cleaned_data['action']]
+    count = run(students, form.cleaned_data)
+    messages.success(request, f'{count} student{pluralize(count)} {verb}.')
+    return redirect(list_url)
+
+def _render_student_detail(pk):
+    return _student_detail_fragment(get_object_or_404(Student, pk=pk, is_active=True))
+
+def _student_detail_fragment(student):
+    return {
+        'student_name': student.full_name,
+        'detail_html': render_to_string('students/partials/student_detail_content.html', {'student': student}),
+    }
+
+def _detail_last_modified(request, pk):
+    if _has_messages(request):
+        return None
+    if not hasattr(request, '_student_freshness'):
+        request._student_freshness = (
+            Student.objects.filter(pk=pk, is_active=True)
+            .order_by('pk').values_list('updated_at', flat=True).first()
+        )
+    return request._student_freshness
+
+def _detail_etag(request, pk):
+    last_modified = _detail_last_modified(request, pk)
+    return None if last_modified is None else _etag(pk, last_modified)
 
+@condition(etag_func=_detail_etag, last_modified_func=_detail_last_modified)
 def student_detail(request, pk):
     """Display detailed information about a specific student"""
-    student = get_object_or_404(Student, pk=pk, is_active=True)
-    context = {
-        'student': student,
+    # The rendered details are cached until the student is saved again
+    fragment = caching.get_or_set(
+        f'student_detail:{pk}',
+        [caching.student_version(pk), caching.DETAILS],
+        lambda: _render_student_detail(pk),
+    )
+    return render(request, 'students/student_detail.html', _detail_context(fragment))
+
+def _detail_context(fragment):
+    return {
+        'student_name': fragment['student_name'],
+        'detail_html': mark_safe(fragment['detail_html']),
     }
-    return render(request, 'students/student_detail.html', context)
 
 def student_create(request):
     """Create a new student"""
@@ -67,7 +234,7 @@ def student_create(request):
         if form.is_valid():
             student = form.save()
             messages.success(request, f'Student {student.full_name} created successfully!')
-            return redirect('student_detail', pk=student.pk)
+            return redirect('students:student_detail', pk=student.pk)
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
@@ -89,7 +256,7 @@ def student_update(request, pk):
         if form.is_valid():
             student = form.save()
             messages.success(request, f'Student {student.full_name} updated successfully!')
-            return redirect('student_detail', pk=student.pk)
+            return redirect('students:student_detail', pk=student.pk)
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
@@ -108,10 +275,9 @@ def student_delete(request, pk):
     student = get_object_or_404(Student, pk=pk, is_active=True)
     
     if request.method == 'POST':
-        student.is_active = False
-        student.save()
+        deactivate_students(Student.objects.filter(pk=student.pk))
         messages.success(request, f'Student {student.full_name} deleted successfully!')
-        return redirect('student_list')
+        return redirect('students:student_list')
     
     context = {
         'student': student,
@@ -124,8 +290,7 @@ def student_delete_ajax(request, pk):
     """AJAX endpoint for deleting students"""
     try:
         student = get_object_or_404(Student, pk=pk, is_active=True)
-        student.is_active = False
-        student.save()
+        deactivate_students(Student.objects.filter(pk=student.pk))
         return JsonResponse({
             'success': True,
             'message': f'Student {student.full_name} deleted successfully!'
@@ -136,52 +301,153 @@ def student_delete_ajax(request, pk):
             'message': str(e)
         }, status=400)
 
+def _dashboard_etag(request):
+    if _has_messages(request):
+        return None
+    freshness = _students_freshness(request)
+    return _etag('dashboard', freshness['last_modified'], freshness['count'])
+
+def _dashboard_last_modified(request):
+    if _has_messages(request):
+        return None
+    return _students_freshness(request)['last_modified']
+
+@condition(etag_func=_dashboard_etag, last_modified_func=_dashboard_last_modified)
 def dashboard(request):
     """Dashboard with statistics and overview"""
-    total_students = Student.objects.filter(is_active=True).count()
-    department_stats = {}
-    year_stats = {}
-    gender_stats = {}
-    
-    # Department statistics
-    for dept_code, dept_name in Student.DEPARTMENT_CHOICES:
-        count = Student.objects.filter(department=dept_code, is_active=True).count()
-        if count > 0:
-            department_stats[dept_name] = count
-    
-    # Year statistics
-    for year_code, year_name in Student.YEAR_CHOICES:
-        count = Student.objects.filter(year=year_code, is_active=True).count()
-        if count > 0:
-            year_stats[year_name] = count
-    
-    # Gender statistics
-    for gender_code, gender_name in Student.GENDER_CHOICES:
-        count = Student.objects.filter(gender=gender_code, is_active=True).count()
-        if count > 0:
-            gender_stats[gender_name] = count
-    
-    # Recent students
-    recent_students = Student.objects.filter(is_active=True).order_by('-created_at')[:5]
-    
-    # Top performing students (by CGPA)
-    top_students = Student.objects.filter(is_active=True, cgpa__gt=0).order_by('-cgpa')[:5]
+    stats = caching.get_or_set('dashboard_stats', [caching.LISTS], get_dashboard_stats)
     
-    context = {
-        'total_students': total_students,
-        'department_stats': department_stats,
-        'year_stats': year_stats,
-        'gender_stats': gender_stats,
+    recent_students = caching.get_or_set('recent_students', [caching.LISTS], lambda: list(_recent_students()))
+    top_students = caching.get_or_set('top_students', [caching.LISTS], lambda: list(_top_students()))
+    
+    return render(request, 'students/dashboard.html', _dashboard_context(stats, recent_students, top_students))
+
+def _recent_students():
+    return Student.objects.filter(is_active=True).order_by('-created_at')[:5]
+
+def _top_students():
+    """Top performing students (by CGPA)"""
+    return Student.objects.filter(is_active=True, cgpa__gt=0).order_by('-cgpa')[:5]
+
+def _dashboard_context(stats, recent_students, top_students):
+    return {
+        'total_students': stats.total_students,
+        'average_cgpa': stats.average_cgpa,
+        'department_stats': stats.department_stats,
+        'year_stats': stats.year_stats,
+        'gender_stats': stats.gender_stats,
         'recent_students': recent_students,
         'top_students': top_students,
     }
-    
-    return render(request, 'students/dashboard.html', context)
+
+@require_GET
+def chart_data(request):
+    """Distributions, monthly enrollment and CGPA histogram for the dashboard charts"""
+    return JsonResponse(caching.get_or_set('chart_data', [caching.LISTS], build_chart_data))
 
 def export_students(request):
-    """Export students data (placeholder for future implementation)"""
-    students = Student.objects.filter(is_active=True)
+    """Export page with format, field group and filter options"""
     context = {
-        'students': students,
+        'total_students': get_dashboard_stats().total_students,
+        'export_form': StudentExportForm(),
+        'recent_exports': ExportJob.objects.all()[:5],
     }
     return render(request, 'students/export.html', context)
+
+@require_http_methods(['GET', 'POST'])
+def export_download(request):
+    """Stream the selected students as CSV or Excel without loading them all into memory"""
+    form = StudentExportForm(request.POST if request.method == 'POST' else request.GET)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    
+    export_format = form.cleaned_data['format']
+    columns = exports.export_columns(form.cleaned_data['fields'])
+    rows = exports.export_rows(exports.export_queryset(form.cleaned_data), columns)
+    
+    response = StreamingHttpResponse(
+        exports.STREAMERS[export_format](exports.export_headers(columns), rows),
+        content_type=exports.CONTENT_TYPES[export_format],
+    )
+    filename = f'students_export_{timezone.now():%Y%m%d_%H%M%S}.{exports.EXTENSIONS[export_format]}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return _stream(request, response)
+
+def _stream(request, response):
+    """Under ASGI, hand the response's chunks to the server as they are produced
+
+    ASGIHandler reads a sync streaming_content into a list before sending
+    any of it, which would hold a whole export in memory.
+    """
+    if isinstance(request, ASGIRequest):
+        response.streaming_content = exports.async_chunks(response.streaming_content)
+    return response
+
+def _export_job_payload(job):
+    payload = {
+        'token': str(job.token),
+        'status': job.status,
+        'progress': job.progress,
+        'processed_rows': job.processed_rows,
+        'total_rows': job.total_rows,
+        'status_url': reverse('students:export_job_status', args=[job.token]),
+    }
+    if job.status == ExportJob.STATUS_COMPLETED:
+        payload['download_url'] = reverse('students:export_job_download', args=[job.token])
+    if job.status == ExportJob.STATUS_FAILED:
+        payload['error'] = job.error
+    return payload
+
+@require_POST
+def export_job_create(request):
+    """Queue an export for the background worker and return its progress URL"""
+    form = StudentExportForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+    
+    # Decimal range bounds are stored as strings, which the filters accept too
+    options = json.loads(json.dumps(form.cleaned_data, cls=DjangoJSONEncoder))
+    job = ExportJob.objects.create(format=options.pop('format'), options=options)
+    return JsonResponse(_export_job_payload(job), status=202)
+
+def export_job_status(request, token):
+    """JSON progress of an export job, polled by the export page"""
+    job = get_object_or_404(ExportJob, token=token)
+    return JsonResponse(_export_job_payload(job))
+
+def export_job_download(request, token):
+    """Download the file written by a finished export job"""
+    job = get_object_or_404(ExportJob, token=token, status=ExportJob.STATUS_COMPLETED)
+    response = FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+    return _stream(request, response)
+
+def student_import(request):
+    """Bulk import students from an uploaded CSV file"""
+    result = None
+    if request.method == 'POST':
+        form = StudentImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            csv_file = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_students(csv_file)
+            except UnicodeDecodeError:
+                form.add_error('file', 'The file must be UTF-8 encoded CSV.')
+            except csv.Error as exc:
+                form.add_error('file', f'The file is not valid CSV: {exc}.')
+            else:
+                if result.created:
+                    messages.success(request, f'{result.created} students imported successfully!')
+                if result.failed:
+                    messages.error(request, f'{result.failed} rows could not be imported.')
+    else:
+        form = StudentImportUploadForm()
+    
+    return render(request, 'students/student_import.html', {'form': form, 'result': result})
+
+@staff_member_required
+def instrumentation_stats(request):
+    """Rolling per-view latency, query and template figures recorded by the instrumentation middleware"""
+    return JsonResponse({
+        'enabled': getattr(settings, 'STUDENT_INSTRUMENTATION', False),
+        'views': metrics_snapshot(),
+    })
@@ -0,0 +1,15 @@
+"""Process pool entry points for the export worker
+
+Spawned processes unpickle these functions before Django is set up, so
+this module must not import models at import time.
+"""
+import django
+
+
+def init_worker():
+    django.setup()
+
+
+def run_job(job_id):
+    from .jobs import run_export_job
+    return run_export_job(job_id)